@@ -0,0 +1,31 @@
+"""Add stored patient risk_score column and index.
+
+Revision ID: c3d4e5f6g7h8
+Revises: b2c3d4e5f6g7
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+revision = "c3d4e5f6g7h8"
+down_revision = "b2c3d4e5f6g7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        ALTER TABLE patients ADD COLUMN IF NOT EXISTS risk_score INTEGER
+        GENERATED ALWAYS AS (
+            (CASE WHEN jsonb_typeof(chronic_conditions) = 'array'
+                  THEN jsonb_array_length(chronic_conditions) ELSE 0 END) * 2 +
+            (CASE WHEN jsonb_typeof(allergies) = 'array'
+                  THEN jsonb_array_length(allergies) ELSE 0 END)
+        ) STORED
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS ix_patients_risk_score ON patients (risk_score, id)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_patients_risk_score")
+    op.execute("ALTER TABLE patients DROP COLUMN IF EXISTS risk_score")
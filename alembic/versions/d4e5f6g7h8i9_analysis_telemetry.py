@@ -0,0 +1,63 @@
+"""Add analysis_telemetry table and backfill it from analysis_results JSONB.
+
+Revision ID: d4e5f6g7h8i9
+Revises: c3d4e5f6g7h8
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+revision = "d4e5f6g7h8i9"
+down_revision = "c3d4e5f6g7h8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS analysis_telemetry (
+            analysis_id UUID NOT NULL PRIMARY KEY
+                REFERENCES analysis_results(id) ON DELETE CASCADE,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            model VARCHAR(255) NOT NULL,
+            input_tokens INTEGER NOT NULL DEFAULT 0,
+            output_tokens INTEGER NOT NULL DEFAULT 0,
+            vision_ms INTEGER,
+            nlp_ms INTEGER,
+            audio_ms INTEGER,
+            reasoning_ms INTEGER,
+            total_ms INTEGER,
+            used_vision BOOLEAN NOT NULL DEFAULT false,
+            used_text BOOLEAN NOT NULL DEFAULT false,
+            used_audio BOOLEAN NOT NULL DEFAULT false,
+            used_history BOOLEAN NOT NULL DEFAULT false
+        )
+    """)
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_analysis_telemetry_created_at "
+        "ON analysis_telemetry (created_at)"
+    )
+
+    # Historical rows carry no stage timings, so the latency columns stay NULL.
+    op.execute("""
+        INSERT INTO analysis_telemetry (
+            analysis_id, created_at, model, input_tokens, output_tokens,
+            used_vision, used_text, used_audio, used_history
+        )
+        SELECT
+            id,
+            created_at,
+            COALESCE(result->>'model', 'unknown'),
+            COALESCE((result->>'input_tokens')::int, 0),
+            COALESCE((result->>'output_tokens')::int, 0),
+            COALESCE(result->'context_modalities' ? 'vision', false),
+            COALESCE(result->'context_modalities' ? 'text', false),
+            COALESCE(result->'context_modalities' ? 'audio', false),
+            COALESCE(result->'context_modalities' ? 'patient_history', false)
+        FROM analysis_results
+        ON CONFLICT (analysis_id) DO NOTHING
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS analysis_telemetry")
@@ -0,0 +1,109 @@
+"""Add daily analytics rollup tables and change-tracking columns.
+
+Revision ID: e5f6g7h8i9j0
+Revises: d4e5f6g7h8i9
+Create Date: 2026-10-19
+
+The rollups start empty; the first refresh run by the application (no
+watermark yet) builds them from the full history.
+"""
+
+from alembic import op
+
+revision = "e5f6g7h8i9j0"
+down_revision = "d4e5f6g7h8i9"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Change tracking so a refresh can find rows updated since its watermark.
+    for table in ("consultations", "follow_ups"):
+        op.execute(f"""
+            ALTER TABLE {table}
+            ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+        """)
+        op.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_updated_at ON {table} (updated_at)")
+
+    op.execute("CREATE INDEX IF NOT EXISTS ix_consultations_started_at ON consultations (started_at)")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_consultation_inputs_created_at "
+        "ON consultation_inputs (created_at)"
+    )
+
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS consultation_daily_rollup (
+            day DATE NOT NULL,
+            doctor_id UUID NOT NULL,
+            status consultation_status_enum NOT NULL,
+            consultation_count INTEGER NOT NULL DEFAULT 0,
+            duration_seconds_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+            duration_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, doctor_id, status)
+        )
+    """)
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS input_daily_rollup (
+            day DATE NOT NULL,
+            input_type input_type_enum NOT NULL,
+            input_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, input_type)
+        )
+    """)
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS analysis_daily_rollup (
+            day DATE NOT NULL,
+            model VARCHAR(255) NOT NULL,
+            analysis_count INTEGER NOT NULL DEFAULT 0,
+            input_tokens BIGINT NOT NULL DEFAULT 0,
+            output_tokens BIGINT NOT NULL DEFAULT 0,
+            used_vision INTEGER NOT NULL DEFAULT 0,
+            used_text INTEGER NOT NULL DEFAULT 0,
+            used_audio INTEGER NOT NULL DEFAULT 0,
+            used_history INTEGER NOT NULL DEFAULT 0,
+            vision_ms_sum BIGINT NOT NULL DEFAULT 0,
+            vision_ms_count INTEGER NOT NULL DEFAULT 0,
+            nlp_ms_sum BIGINT NOT NULL DEFAULT 0,
+            nlp_ms_count INTEGER NOT NULL DEFAULT 0,
+            audio_ms_sum BIGINT NOT NULL DEFAULT 0,
+            audio_ms_count INTEGER NOT NULL DEFAULT 0,
+            reasoning_ms_sum BIGINT NOT NULL DEFAULT 0,
+            reasoning_ms_count INTEGER NOT NULL DEFAULT 0,
+            total_ms_sum BIGINT NOT NULL DEFAULT 0,
+            total_ms_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, model)
+        )
+    """)
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS follow_up_daily_rollup (
+            day DATE NOT NULL,
+            status follow_up_status_enum NOT NULL,
+            follow_up_type follow_up_type_enum NOT NULL,
+            ai_generated BOOLEAN NOT NULL,
+            follow_up_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, status, follow_up_type, ai_generated)
+        )
+    """)
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS rollup_watermarks (
+            name VARCHAR(100) NOT NULL PRIMARY KEY,
+            watermark TIMESTAMP WITH TIME ZONE NOT NULL
+        )
+    """)
+
+
+def downgrade() -> None:
+    for table in (
+        "rollup_watermarks",
+        "follow_up_daily_rollup",
+        "analysis_daily_rollup",
+        "input_daily_rollup",
+        "consultation_daily_rollup",
+    ):
+        op.execute(f"DROP TABLE IF EXISTS {table}")
+
+    op.execute("DROP INDEX IF EXISTS ix_consultation_inputs_created_at")
+    op.execute("DROP INDEX IF EXISTS ix_consultations_started_at")
+    for table in ("follow_ups", "consultations"):
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_updated_at")
+        op.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS updated_at")
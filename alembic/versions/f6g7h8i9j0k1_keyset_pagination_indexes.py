@@ -0,0 +1,38 @@
+"""Add composite indexes backing keyset pagination of list endpoints.
+
+Revision ID: f6g7h8i9j0k1
+Revises: e5f6g7h8i9j0
+Create Date: 2026-10-19
+
+Each index matches a listing's filter column(s) followed by its sort key
+and the primary key, so any page is one index range scan. Descending
+listings use the same indexes scanned backwards.
+"""
+
+from alembic import op
+
+revision = "f6g7h8i9j0k1"
+down_revision = "e5f6g7h8i9j0"
+branch_labels = None
+depends_on = None
+
+_INDEXES = {
+    "ix_doctors_name_id": "doctors (name, id)",
+    "ix_patients_name_id": "patients (name, id)",
+    "ix_consultations_patient_started": "consultations (patient_id, started_at, id)",
+    "ix_consultations_doctor_started": "consultations (doctor_id, started_at, id)",
+    "ix_medical_records_patient_date": "medical_records (patient_id, record_date, id)",
+    "ix_follow_ups_due_date": "follow_ups (due_date, id)",
+    "ix_follow_ups_doctor_due": "follow_ups (doctor_id, due_date, id)",
+    "ix_follow_ups_patient_due": "follow_ups (patient_id, due_date, id)",
+}
+
+
+def upgrade() -> None:
+    for name, target in _INDEXES.items():
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+
+
+def downgrade() -> None:
+    for name in _INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
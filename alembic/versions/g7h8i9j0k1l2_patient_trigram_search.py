@@ -0,0 +1,35 @@
+"""Add pg_trgm indexes for fuzzy patient search.
+
+Revision ID: g7h8i9j0k1l2
+Revises: f6g7h8i9j0k1
+Create Date: 2026-10-19
+
+GIN trigram indexes serve substring (ILIKE '%q%') and word-similarity
+(q <% name) matches on name and MRN; the text_pattern_ops B-trees serve
+the MRN exact-prefix fast path and queries too short to hold a trigram.
+"""
+
+from alembic import op
+
+revision = "g7h8i9j0k1l2"
+down_revision = "f6g7h8i9j0k1"
+branch_labels = None
+depends_on = None
+
+_INDEXES = {
+    "ix_patients_name_trgm": "patients USING gin (name gin_trgm_ops)",
+    "ix_patients_mrn_trgm": "patients USING gin (medical_record_number gin_trgm_ops)",
+    "ix_patients_mrn_prefix": "patients (medical_record_number text_pattern_ops)",
+    "ix_patients_name_prefix": "patients (lower(name) text_pattern_ops)",
+}
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, target in _INDEXES.items():
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+
+
+def downgrade() -> None:
+    for name in _INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
@@ -0,0 +1,26 @@
+"""Add a (status, due_date) index for the overdue follow-up sweep.
+
+Revision ID: h8i9j0k1l2m3
+Revises: g7h8i9j0k1l2
+Create Date: 2026-10-19
+
+The sweeper selects pending rows past their due date in due-date order;
+this index turns that into a single range scan.
+"""
+
+from alembic import op
+
+revision = "h8i9j0k1l2m3"
+down_revision = "g7h8i9j0k1l2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_follow_ups_status_due ON follow_ups (status, due_date)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_follow_ups_status_due")
@@ -0,0 +1,62 @@
+"""Strip the duplicated embedding out of analysis_results.result.
+
+Revision ID: i9j0k1l2m3n4
+Revises: h8i9j0k1l2m3
+Create Date: 2026-10-19
+
+The vector already lives in analysis_results.embedding; the JSONB copy only
+bloated every row and every read of ``result``. Rows are rewritten in
+primary-key order in batches, each committed on its own, so the migration
+never holds locks on the whole table or rescans rows it already stripped.
+A JSONB embedding is copied into the vector column first wherever that
+column is still empty.
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "i9j0k1l2m3n4"
+down_revision = "h8i9j0k1l2m3"
+branch_labels = None
+depends_on = None
+
+_BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    # Keyset walk over the primary key: each batch starts after the last id
+    # seen, so already-stripped rows are never scanned again.
+    strip = sa.text("""
+        WITH batch AS (
+            SELECT id FROM analysis_results
+            WHERE id > :last_id
+            ORDER BY id
+            LIMIT :batch_size
+        ), stripped AS (
+            UPDATE analysis_results
+            SET embedding = COALESCE(
+                    embedding,
+                    CASE
+                        WHEN jsonb_typeof(result->'embedding') = 'array'
+                         AND jsonb_array_length(result->'embedding') = 768
+                        THEN (result->'embedding')::text::vector
+                    END
+                ),
+                result = result - 'embedding'
+            WHERE id IN (SELECT id FROM batch)
+              AND result ? 'embedding'
+        )
+        SELECT id FROM batch ORDER BY id DESC LIMIT 1
+    """)
+    with op.get_context().autocommit_block():
+        conn = op.get_bind()
+        last_id = "00000000-0000-0000-0000-000000000000"
+        while True:
+            last_id = conn.execute(strip, {"last_id": last_id, "batch_size": _BATCH_SIZE}).scalar()
+            if last_id is None:
+                break
+
+
+def downgrade() -> None:
+    # Nothing to restore: the embedding column still holds every vector.
+    pass
@@ -0,0 +1,37 @@
+"""Add half-precision and binary-quantized HNSW indexes on embeddings.
+
+Revision ID: j0k1l2m3n4o5
+Revises: i9j0k1l2m3n4
+Create Date: 2026-10-19
+
+The full-precision vectors stay where they are; the quantized forms exist
+only inside these expression indexes (see src/db/vectors.py). HNSW builds
+are slow, so the indexes are created concurrently outside a transaction.
+"""
+
+from alembic import op
+
+revision = "j0k1l2m3n4o5"
+down_revision = "i9j0k1l2m3n4"
+branch_labels = None
+depends_on = None
+
+_TABLES = ("analysis_results", "medical_records")
+_INDEXES = {
+    "embedding_half": "USING hnsw ((embedding::halfvec(768)) halfvec_cosine_ops)",
+    "embedding_bits": "USING hnsw ((binary_quantize(embedding)::bit(768)) bit_hamming_ops)",
+}
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table in _TABLES:
+            for suffix, target in _INDEXES.items():
+                op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_{table}_{suffix} ON {table} {target}")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table in _TABLES:
+            for suffix in _INDEXES:
+                op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS ix_{table}_{suffix}")
@@ -0,0 +1,105 @@
+"""Trigger-maintained, weighted search_vector columns on consultations, analyses and records.
+
+Revision ID: k1l2m3n4o5p6
+Revises: j0k1l2m3n4o5
+Create Date: 2026-10-19
+
+consultations.search_vector used to be written by the application, and only
+when a consultation ended with a summary; it is now kept current by a
+BEFORE INSERT/UPDATE trigger, like the new columns on analysis_results and
+medical_records.
+
+Nothing here rewrites a table under an exclusive lock: the columns are
+added nullable (a catalog-only change), the triggers cover every write from
+then on, existing rows are backfilled in primary-key order in batches that
+each commit on their own, and the GIN indexes are built concurrently.
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "k1l2m3n4o5p6"
+down_revision = "j0k1l2m3n4o5"
+branch_labels = None
+depends_on = None
+
+_BATCH_SIZE = 1000
+
+# (weighted tsvector over "{row}"-prefixed columns, columns it reads)
+_SEARCH_VECTORS = {
+    "consultations": (
+        "setweight(to_tsvector('english', coalesce({row}summary, '')), 'A')",
+        "summary",
+    ),
+    "analysis_results": (
+        "setweight(to_tsvector('english', coalesce({row}result->>'response', '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce({row}prompt, '')), 'B')",
+        "result, prompt",
+    ),
+    "medical_records": (
+        "setweight(to_tsvector('english', coalesce({row}title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce({row}description, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce({row}raw_text, '')), 'C')",
+        "title, description, raw_text",
+    ),
+}
+
+
+def upgrade() -> None:
+    for table, (expression, columns) in _SEARCH_VECTORS.items():
+        op.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector")
+        op.execute(f"""
+            CREATE OR REPLACE FUNCTION {table}_search_vector_update() RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector := {expression.format(row="NEW.")};
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+        op.execute(f"""
+            CREATE TRIGGER {table}_search_vector
+            BEFORE INSERT OR UPDATE OF {columns} ON {table}
+            FOR EACH ROW EXECUTE FUNCTION {table}_search_vector_update()
+        """)
+
+    with op.get_context().autocommit_block():
+        conn = op.get_bind()
+        for table, (expression, _) in _SEARCH_VECTORS.items():
+            backfill = sa.text(f"""
+                WITH batch AS (
+                    SELECT id FROM {table}
+                    WHERE id > :last_id
+                    ORDER BY id
+                    LIMIT :batch_size
+                ), filled AS (
+                    UPDATE {table}
+                    SET search_vector = {expression.format(row="")}
+                    WHERE id IN (SELECT id FROM batch)
+                )
+                SELECT id FROM batch ORDER BY id DESC LIMIT 1
+            """)
+            last_id = "00000000-0000-0000-0000-000000000000"
+            while True:
+                last_id = conn.execute(backfill, {"last_id": last_id, "batch_size": _BATCH_SIZE}).scalar()
+                if last_id is None:
+                    break
+
+        for table in _SEARCH_VECTORS:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_{table}_search ON {table} USING gin (search_vector)"
+            )
+
+
+def downgrade() -> None:
+    for table in _SEARCH_VECTORS:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_search_vector ON {table}")
+        op.execute(f"DROP FUNCTION IF EXISTS {table}_search_vector_update()")
+    with op.get_context().autocommit_block():
+        for table in ("analysis_results", "medical_records"):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS ix_{table}_search")
+            op.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector")
+        # Back to the application-maintained, unweighted summary vector.
+        op.execute("""
+            UPDATE consultations
+            SET search_vector = CASE WHEN summary IS NOT NULL THEN to_tsvector('english', summary) END
+        """)
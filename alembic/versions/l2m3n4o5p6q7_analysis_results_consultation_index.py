@@ -0,0 +1,30 @@
+"""Index analysis_results by consultation for filtered semantic search.
+
+Revision ID: l2m3n4o5p6q7
+Revises: k1l2m3n4o5p6
+Create Date: 2026-10-19
+
+Patient- and doctor-scoped searches resolve to a set of consultations; this
+index turns that set (and an optional date range) into analysis rows without
+scanning the table, which is what makes the exact strategy cheap.
+"""
+
+from alembic import op
+
+revision = "l2m3n4o5p6q7"
+down_revision = "k1l2m3n4o5p6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_analysis_results_consultation_created "
+            "ON analysis_results (consultation_id, created_at)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_analysis_results_consultation_created")
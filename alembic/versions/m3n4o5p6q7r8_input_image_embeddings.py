@@ -0,0 +1,31 @@
+"""Store CXformer embeddings on image inputs for prior-study search.
+
+Revision ID: m3n4o5p6q7r8
+Revises: l2m3n4o5p6q7
+Create Date: 2026-10-19
+
+Existing image inputs get their embedding the next time they are analyzed
+or first used as a similarity query; nothing is re-encoded here.
+"""
+
+from alembic import op
+
+revision = "m3n4o5p6q7r8"
+down_revision = "l2m3n4o5p6q7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE consultation_inputs ADD COLUMN IF NOT EXISTS image_embedding vector(768)")
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_consultation_inputs_image_embedding "
+            "ON consultation_inputs USING hnsw (image_embedding vector_cosine_ops)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_consultation_inputs_image_embedding")
+    op.execute("ALTER TABLE consultation_inputs DROP COLUMN IF EXISTS image_embedding")
@@ -0,0 +1,75 @@
+"""Record rollup days left by deleted or re-dated source rows.
+
+Revision ID: n4o5p6q7r8s9
+Revises: m3n4o5p6q7r8
+Create Date: 2026-10-19
+
+A refresh finds changed rows through their updated_at/created_at, which
+cannot see a row that is gone. An AFTER DELETE OR UPDATE trigger on each
+rollup source writes the day the old row was bucketed on into
+rollup_dirty_days (on delete, or when the bucket timestamp changes), and
+the next refresh rebuilds exactly those days.
+
+Rebuilding a day reads its rows by bucket timestamp, so follow_ups gets
+the created_at index the other sources already have.
+"""
+
+from alembic import op
+
+revision = "n4o5p6q7r8s9"
+down_revision = "m3n4o5p6q7r8"
+branch_labels = None
+depends_on = None
+
+# source table -> (rollup name, bucket column)
+_SOURCES = {
+    "consultations": ("consultations", "started_at"),
+    "consultation_inputs": ("inputs", "created_at"),
+    "analysis_telemetry": ("analyses", "created_at"),
+    "follow_ups": ("follow_ups", "created_at"),
+}
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS rollup_dirty_days (
+            name VARCHAR(100) NOT NULL,
+            day DATE NOT NULL,
+            PRIMARY KEY (name, day)
+        )
+    """)
+    # TG_ARGV: rollup name, bucket column.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION rollup_mark_dirty() RETURNS trigger AS $$
+        DECLARE
+            old_ts timestamptz := (to_jsonb(OLD) ->> TG_ARGV[1])::timestamptz;
+        BEGIN
+            IF old_ts IS NOT NULL AND (
+                TG_OP = 'DELETE'
+                OR old_ts IS DISTINCT FROM (to_jsonb(NEW) ->> TG_ARGV[1])::timestamptz
+            ) THEN
+                INSERT INTO rollup_dirty_days (name, day)
+                VALUES (TG_ARGV[0], (old_ts AT TIME ZONE 'UTC')::date)
+                ON CONFLICT DO NOTHING;
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    for table, (name, bucket) in _SOURCES.items():
+        op.execute(f"""
+            CREATE TRIGGER {table}_rollup_dirty
+            AFTER DELETE OR UPDATE OF {bucket} ON {table}
+            FOR EACH ROW EXECUTE FUNCTION rollup_mark_dirty('{name}', '{bucket}')
+        """)
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_follow_ups_created_at ON follow_ups (created_at)")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_follow_ups_created_at")
+    for table in _SOURCES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_rollup_dirty ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS rollup_mark_dirty()")
+    op.execute("DROP TABLE IF EXISTS rollup_dirty_days")
@@ -3,6 +3,7 @@ import type {
   AnalysisRequest,
   StandaloneAnalysisRequest,
   AnalysisOut,
+  SimilarStudy,
 } from "../types/api";
 
 // ML inference can take minutes (model download on first call + generation)
@@ -20,4 +21,13 @@ export const analysisApi = {
     api
       .post<AnalysisOut>("/api/analyze", data, { timeout: ML_TIMEOUT })
       .then((r) => r.data),
+
+  // May encode the image on first use, hence the ML timeout.
+  similarStudies: (inputId: string, scope: "patient" | "archive" = "patient", limit = 10) =>
+    api
+      .get<SimilarStudy[]>(`/api/inputs/${inputId}/similar`, {
+        params: { scope, limit },
+        timeout: ML_TIMEOUT,
+      })
+      .then((r) => r.data),
 };
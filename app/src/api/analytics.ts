@@ -2,19 +2,24 @@ import { api } from "./client";
 
 export interface ConsultationStats {
   period_days: number;
+  granularity: "hour" | "day" | "week";
   total: number;
   completed: number;
   active: number;
   cancelled: number;
   completion_rate: number;
   avg_duration_minutes: number;
-  by_day: Record<string, number>;
+  by_day?: Record<string, number>;
+  by_hour?: Record<string, number>;
+  by_week?: Record<string, number>;
+  as_of: string | null;
 }
 
 export interface ModalityUsage {
   counts: Record<string, number>;
   total_inputs: number;
   percentages: Record<string, number>;
+  as_of: string | null;
 }
 
 export interface Demographics {
@@ -34,6 +39,8 @@ export interface AiPerformance {
   avg_input_tokens: number;
   avg_output_tokens: number;
   modalities_in_context: Record<string, number>;
+  avg_latency_ms: Record<string, number>;
+  as_of: string | null;
 }
 
 export interface DoctorActivity {
@@ -45,19 +52,31 @@ export interface DoctorActivity {
   total_follow_ups: number;
   pending_follow_ups: number;
   overdue_follow_ups: number;
+  as_of: string | null;
 }
 
+export interface RiskCohortMember {
+  patient_id: string;
+  name: string;
+  chronic_conditions: string[];
+  allergies: string[];
+  risk_score: number;
+}
+
+export type RiskCohortName = "high" | "medium" | "low";
+
 export interface RiskCohorts {
   high_risk_count: number;
   medium_risk_count: number;
   low_risk_count: number;
-  cohorts: Record<string, Array<{
-    patient_id: string;
-    name: string;
-    chronic_conditions: string[];
-    allergies: string[];
-    risk_score: number;
-  }>>;
+  cohorts: Record<RiskCohortName, RiskCohortMember[]>;
+  next_cursors: Record<RiskCohortName, string | null>;
+}
+
+export interface RiskCohortPage {
+  cohort: RiskCohortName;
+  patients: RiskCohortMember[];
+  next_cursor: string | null;
 }
 
 export interface FollowUpStats {
@@ -66,10 +85,44 @@ export interface FollowUpStats {
   by_type: Record<string, number>;
   ai_generated: number;
   manual: number;
+  as_of: string | null;
+}
+
+export type DashboardPanel =
+  | "consultations"
+  | "modalities"
+  | "demographics"
+  | "ai_performance"
+  | "follow_ups"
+  | "risk_cohorts";
+
+export interface Dashboard {
+  panels: {
+    consultations?: ConsultationStats;
+    modalities?: ModalityUsage;
+    demographics?: Demographics;
+    ai_performance?: AiPerformance;
+    follow_ups?: FollowUpStats;
+    risk_cohorts?: RiskCohorts;
+  };
+  errors: Partial<Record<DashboardPanel, string>>;
+  timings_ms: Partial<Record<DashboardPanel, number>>;
+  total_ms: number;
 }
 
 export const analyticsApi = {
-  consultationStats: (params?: { days?: number; doctor_id?: string }) =>
+  dashboard: (params?: { days?: number; doctor_id?: string; panels?: DashboardPanel[] }) =>
+    api
+      .get<Dashboard>("/api/analytics/dashboard", {
+        params: { ...params, panels: params?.panels?.join(",") },
+      })
+      .then((r) => r.data),
+
+  consultationStats: (params?: {
+    days?: number;
+    doctor_id?: string;
+    granularity?: "hour" | "day" | "week";
+  }) =>
     api.get<ConsultationStats>("/api/analytics/consultations", { params }).then((r) => r.data),
 
   modalityUsage: () =>
@@ -84,8 +137,13 @@ export const analyticsApi = {
   doctorActivity: (doctorId: string) =>
     api.get<DoctorActivity>(`/api/analytics/doctors/${doctorId}`).then((r) => r.data),
 
-  riskCohorts: () =>
-    api.get<RiskCohorts>("/api/analytics/risk-cohorts").then((r) => r.data),
+  riskCohorts: (params?: { limit?: number }) =>
+    api.get<RiskCohorts>("/api/analytics/risk-cohorts", { params }).then((r) => r.data),
+
+  riskCohortMembers: (cohort: RiskCohortName, params?: { limit?: number; cursor?: string }) =>
+    api
+      .get<RiskCohortPage>(`/api/analytics/risk-cohorts/${cohort}`, { params })
+      .then((r) => r.data),
 
   followUpStats: () =>
     api.get<FollowUpStats>("/api/analytics/follow-ups").then((r) => r.data),
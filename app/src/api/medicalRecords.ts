@@ -3,7 +3,7 @@ import type {
   MedicalRecord,
   MedicalRecordCreate,
   RecordType,
-  TimelineEntry,
+  TimelinePage,
 } from "../types/api";
 
 export const medicalRecordsApi = {
@@ -42,8 +42,13 @@ export const medicalRecordsApi = {
   delete: (patientId: string, recordId: string) =>
     api.delete(`/api/patients/${patientId}/records/${recordId}`),
 
-  timeline: (patientId: string, params?: { limit?: number }) =>
+  timeline: (patientId: string, params?: { limit?: number; cursor?: string }) =>
     api
-      .get<TimelineEntry[]>(`/api/patients/${patientId}/timeline`, { params })
-      .then((r) => r.data),
+      .get<TimelinePage["entries"]>(`/api/patients/${patientId}/timeline`, { params })
+      .then(
+        (r): TimelinePage => ({
+          entries: r.data,
+          next_cursor: r.headers["x-next-cursor"] ?? null,
+        })
+      ),
 };
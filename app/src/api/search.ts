@@ -3,6 +3,8 @@ import type {
   SearchResult,
   SemanticSearchRequest,
   AnalysisSearchResult,
+  HybridSearchParams,
+  HybridSearchResult,
 } from "../types/api";
 
 export const searchApi = {
@@ -15,4 +17,9 @@ export const searchApi = {
     api
       .post<AnalysisSearchResult[]>("/api/search/semantic", data)
       .then((r) => r.data),
+
+  hybrid: (params: HybridSearchParams) =>
+    api
+      .get<HybridSearchResult[]>("/api/search/hybrid", { params })
+      .then((r) => r.data),
 };
@@ -1,10 +1,14 @@
+import { useEffect } from "react";
 import {
   Timeline,
   Text,
   Badge,
   Group,
   Card,
+  Center,
+  Loader,
 } from "@mantine/core";
+import { useIntersection } from "@mantine/hooks";
 import {
   IconStethoscope,
   IconFileText,
@@ -35,10 +39,19 @@ const STATUS_COLOR: Record<string, string> = {
 
 interface Props {
   entries: TimelineEntry[];
+  hasMore?: boolean;
+  loadingMore?: boolean;
+  onLoadMore?: () => void;
 }
 
-export function PatientTimeline({ entries }: Props) {
+export function PatientTimeline({ entries, hasMore, loadingMore, onLoadMore }: Props) {
   const navigate = useNavigate();
+  // Fetch the next (older) page as the end of the list scrolls into view.
+  const { ref: sentinelRef, entry: sentinel } = useIntersection({ rootMargin: "200px" });
+
+  useEffect(() => {
+    if (sentinel?.isIntersecting && hasMore && !loadingMore) onLoadMore?.();
+  }, [sentinel?.isIntersecting, hasMore, loadingMore, onLoadMore]);
 
   if (entries.length === 0) {
     return (
@@ -52,67 +65,74 @@ export function PatientTimeline({ entries }: Props) {
   }
 
   return (
-    <Timeline active={0} bulletSize={28} lineWidth={2}>
-      {entries.map((entry) => (
-        <Timeline.Item
-          key={`${entry.entry_type}-${entry.id}`}
-          bullet={
-            entry.entry_type === "consultation" ? (
-              <IconStethoscope size={14} />
-            ) : (
-              RECORD_TYPE_ICONS[entry.record_type ?? "other"] ?? (
-                <IconDots size={14} />
+    <>
+      <Timeline active={0} bulletSize={28} lineWidth={2}>
+        {entries.map((entry) => (
+          <Timeline.Item
+            key={`${entry.entry_type}-${entry.id}`}
+            bullet={
+              entry.entry_type === "consultation" ? (
+                <IconStethoscope size={14} />
+              ) : (
+                RECORD_TYPE_ICONS[entry.record_type ?? "other"] ?? (
+                  <IconDots size={14} />
+                )
               )
-            )
-          }
-          title={
-            <Group gap="xs">
-              <Text size="sm" fw={500}>
-                {entry.title}
-              </Text>
-              {entry.entry_type === "consultation" && entry.status && (
-                <Badge
-                  size="xs"
-                  variant="light"
-                  color={STATUS_COLOR[entry.status] ?? "gray"}
-                >
-                  {entry.status}
-                </Badge>
-              )}
-              {entry.entry_type === "medical_record" && entry.record_type && (
-                <Badge size="xs" variant="light" color="indigo">
-                  {entry.record_type.replace(/_/g, " ")}
-                </Badge>
-              )}
-            </Group>
-          }
-        >
-          <Text size="xs" c="dimmed" mt={4}>
-            {dayjs(entry.date).format("MMM D, YYYY [at] h:mm A")}
-          </Text>
-          {entry.entry_type === "consultation" && entry.summary && (
-            <Text size="xs" c="dimmed" mt={4} lineClamp={2}>
-              {entry.summary}
-            </Text>
-          )}
-          {entry.entry_type === "medical_record" && entry.description && (
-            <Text size="xs" c="dimmed" mt={4} lineClamp={2}>
-              {entry.description}
-            </Text>
-          )}
-          {entry.entry_type === "consultation" && (
-            <Text
-              size="xs"
-              c="indigo"
-              mt={4}
-              style={{ cursor: "pointer" }}
-              onClick={() => navigate(`/consultations/${entry.id}`)}
-            >
-              View consultation
+            }
+            title={
+              <Group gap="xs">
+                <Text size="sm" fw={500}>
+                  {entry.title}
+                </Text>
+                {entry.entry_type === "consultation" && entry.status && (
+                  <Badge
+                    size="xs"
+                    variant="light"
+                    color={STATUS_COLOR[entry.status] ?? "gray"}
+                  >
+                    {entry.status}
+                  </Badge>
+                )}
+                {entry.entry_type === "medical_record" && entry.record_type && (
+                  <Badge size="xs" variant="light" color="indigo">
+                    {entry.record_type.replace(/_/g, " ")}
+                  </Badge>
+                )}
+              </Group>
+            }
+          >
+            <Text size="xs" c="dimmed" mt={4}>
+              {dayjs(entry.date).format("MMM D, YYYY [at] h:mm A")}
             </Text>
-          )}
-        </Timeline.Item>
-      ))}
-    </Timeline>
+            {entry.entry_type === "consultation" && entry.summary && (
+              <Text size="xs" c="dimmed" mt={4} lineClamp={2}>
+                {entry.summary}
+              </Text>
+            )}
+            {entry.entry_type === "medical_record" && entry.description && (
+              <Text size="xs" c="dimmed" mt={4} lineClamp={2}>
+                {entry.description}
+              </Text>
+            )}
+            {entry.entry_type === "consultation" && (
+              <Text
+                size="xs"
+                c="indigo"
+                mt={4}
+                style={{ cursor: "pointer" }}
+                onClick={() => navigate(`/consultations/${entry.id}`)}
+              >
+                View consultation
+              </Text>
+            )}
+          </Timeline.Item>
+        ))}
+      </Timeline>
+      {hasMore && (
+        <Center ref={sentinelRef} py="md">
+          {loadingMore && <Loader size="sm" />}
+        </Center>
+      )}
+    </>
   );
 }
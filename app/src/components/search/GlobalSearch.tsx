@@ -9,26 +9,59 @@ import {
   Card,
   Text,
   Badge,
+  Mark,
 } from "@mantine/core";
 import { IconSearch } from "@tabler/icons-react";
 import { useMutation } from "@tanstack/react-query";
 import { searchApi } from "../../api/search";
 import { ConfidenceBadge } from "../consultation/ConfidenceBadge";
 import { EmptyState } from "../shared/EmptyState";
-import type { SearchResult, AnalysisSearchResult } from "../../types/api";
+import type {
+  SearchResult,
+  AnalysisSearchResult,
+  HybridSearchResult,
+} from "../../types/api";
 import dayjs from "dayjs";
 
 interface Props {
   initialQuery?: string;
 }
 
+type SearchMode = "hybrid" | "fulltext" | "semantic";
+
+const KIND_LABELS: Record<HybridSearchResult["kind"], string> = {
+  consultation: "Consultation",
+  analysis: "Analysis",
+  record: "Record",
+};
+
+/** Render a ts_headline snippet, turning its <mark> tags into Mantine marks. */
+function Snippet({ text }: { text: string }) {
+  const parts = text.split(/<\/?mark>/);
+  return (
+    <Text size="sm" lineClamp={3}>
+      {parts.map((part, i) => (i % 2 === 1 ? <Mark key={i}>{part}</Mark> : part))}
+    </Text>
+  );
+}
+
+function hybridTarget(r: HybridSearchResult): string {
+  return r.consultation_id ? `/consultations/${r.consultation_id}` : `/patients/${r.patient_id}`;
+}
+
 export function GlobalSearch({ initialQuery = "" }: Props) {
   const navigate = useNavigate();
   const [query, setQuery] = useState(initialQuery);
-  const [mode, setMode] = useState<"fulltext" | "semantic">("fulltext");
+  const [mode, setMode] = useState<SearchMode>("hybrid");
+  const [hybridResults, setHybridResults] = useState<HybridSearchResult[]>([]);
   const [ftResults, setFtResults] = useState<SearchResult[]>([]);
   const [semResults, setSemResults] = useState<AnalysisSearchResult[]>([]);
 
+  const hybridMutation = useMutation({
+    mutationFn: (q: string) => searchApi.hybrid({ q }),
+    onSuccess: (data) => setHybridResults(data),
+  });
+
   const ftMutation = useMutation({
     mutationFn: (q: string) => searchApi.fulltext(q),
     onSuccess: (data) => setFtResults(data),
@@ -41,11 +74,12 @@ export function GlobalSearch({ initialQuery = "" }: Props) {
 
   const handleSearch = () => {
     if (!query.trim()) return;
-    if (mode === "fulltext") ftMutation.mutate(query.trim());
+    if (mode === "hybrid") hybridMutation.mutate(query.trim());
+    else if (mode === "fulltext") ftMutation.mutate(query.trim());
     else semMutation.mutate(query.trim());
   };
 
-  const isLoading = ftMutation.isPending || semMutation.isPending;
+  const isLoading = hybridMutation.isPending || ftMutation.isPending || semMutation.isPending;
 
   return (
     <Stack gap="md">
@@ -61,13 +95,14 @@ export function GlobalSearch({ initialQuery = "" }: Props) {
           size="md"
         />
         <SegmentedControl
-          aria-label="Search mode: full-text or semantic"
+          aria-label="Search mode: best match, full-text or semantic"
           data={[
+            { label: "Best match", value: "hybrid" },
             { label: "Full-text", value: "fulltext" },
             { label: "Semantic", value: "semantic" },
           ]}
           value={mode}
-          onChange={(v) => setMode(v as "fulltext" | "semantic")}
+          onChange={(v) => setMode(v as SearchMode)}
           size="md"
         />
         <Button onClick={handleSearch} loading={isLoading} size="md" aria-label="Run search">
@@ -75,6 +110,48 @@ export function GlobalSearch({ initialQuery = "" }: Props) {
         </Button>
       </Group>
 
+      {mode === "hybrid" && hybridResults.length > 0 && (
+        <Stack gap="sm">
+          <Text size="sm" c="dimmed">
+            {hybridResults.length} result(s) by relevance
+          </Text>
+          {hybridResults.map((r) => (
+            <Card
+              key={`${r.kind}-${r.id}`}
+              component="div"
+              withBorder
+              padding="sm"
+              tabIndex={0}
+              role="button"
+              onClick={() => navigate(hybridTarget(r))}
+              onKeyDown={(e) => {
+                if (e.key === "Enter" || e.key === " ") {
+                  e.preventDefault();
+                  navigate(hybridTarget(r));
+                }
+              }}
+              style={{ cursor: "pointer" }}
+              aria-label={`${KIND_LABELS[r.kind]} ${r.id.slice(0, 8)}, ${dayjs(r.occurred_at).format("MMM D, YYYY")}`}
+            >
+              <Group justify="space-between" mb={4}>
+                <Group gap="xs">
+                  <Badge size="xs" variant="light">
+                    {KIND_LABELS[r.kind]}
+                  </Badge>
+                  <Text size="sm" fw={500} lineClamp={1}>
+                    {r.title ?? `${KIND_LABELS[r.kind]} ${r.id.slice(0, 8)}`}
+                  </Text>
+                </Group>
+                <Text size="xs" c="dimmed">
+                  {dayjs(r.occurred_at).format("MMM D, YYYY HH:mm")}
+                </Text>
+              </Group>
+              {r.snippet && <Snippet text={r.snippet} />}
+            </Card>
+          ))}
+        </Stack>
+      )}
+
       {mode === "fulltext" && ftResults.length > 0 && (
         <Stack gap="sm">
           <Text size="sm" c="dimmed">
@@ -106,10 +183,14 @@ export function GlobalSearch({ initialQuery = "" }: Props) {
                   {dayjs(r.started_at).format("MMM D, YYYY HH:mm")}
                 </Text>
               </Group>
-              {r.summary && (
-                <Text size="sm" lineClamp={2}>
-                  {r.summary}
-                </Text>
+              {r.snippet ? (
+                <Snippet text={r.snippet} />
+              ) : (
+                r.summary && (
+                  <Text size="sm" lineClamp={2}>
+                    {r.summary}
+                  </Text>
+                )
               )}
             </Card>
           ))}
@@ -161,7 +242,11 @@ export function GlobalSearch({ initialQuery = "" }: Props) {
         </Stack>
       )}
 
-      {!isLoading && ftResults.length === 0 && semResults.length === 0 && query.trim() && (
+      {!isLoading &&
+        hybridResults.length === 0 &&
+        ftResults.length === 0 &&
+        semResults.length === 0 &&
+        query.trim() && (
         <EmptyState
           title="No results found"
           description={`No consultations or analyses matched "${query.trim()}". Try different keywords or search mode.`}
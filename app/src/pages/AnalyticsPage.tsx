@@ -87,35 +87,17 @@ export function AnalyticsPage() {
   useDocumentTitle("Analytics");
   const [days, setDays] = useState("30");
 
-  const { data: consStats, isLoading: loadingCons } = useQuery({
-    queryKey: ["analytics", "consultations", days],
-    queryFn: () => analyticsApi.consultationStats({ days: parseInt(days) }),
+  const { data: dashboard, isLoading: loadingCons } = useQuery({
+    queryKey: ["analytics", "dashboard", days],
+    queryFn: () => analyticsApi.dashboard({ days: parseInt(days) }),
   });
 
-  const { data: modality } = useQuery({
-    queryKey: ["analytics", "modalities"],
-    queryFn: () => analyticsApi.modalityUsage(),
-  });
-
-  const { data: demographics } = useQuery({
-    queryKey: ["analytics", "demographics"],
-    queryFn: () => analyticsApi.demographics(),
-  });
-
-  const { data: aiPerf } = useQuery({
-    queryKey: ["analytics", "ai-performance", days],
-    queryFn: () => analyticsApi.aiPerformance({ days: parseInt(days) }),
-  });
-
-  const { data: riskCohorts } = useQuery({
-    queryKey: ["analytics", "risk-cohorts"],
-    queryFn: () => analyticsApi.riskCohorts(),
-  });
-
-  const { data: fuStats } = useQuery({
-    queryKey: ["analytics", "follow-up-stats"],
-    queryFn: () => analyticsApi.followUpStats(),
-  });
+  const consStats = dashboard?.panels.consultations;
+  const modality = dashboard?.panels.modalities;
+  const demographics = dashboard?.panels.demographics;
+  const aiPerf = dashboard?.panels.ai_performance;
+  const riskCohorts = dashboard?.panels.risk_cohorts;
+  const fuStats = dashboard?.panels.follow_ups;
 
   if (loadingCons) {
     return (
@@ -132,7 +114,7 @@ export function AnalyticsPage() {
   }
 
   const dailyData = consStats
-    ? Object.entries(consStats.by_day).map(([date, count]) => ({
+    ? Object.entries(consStats.by_day ?? {}).map(([date, count]) => ({
         date: date.slice(5),
         consultations: count,
       }))
@@ -28,7 +28,7 @@ import {
   IconBrain,
   IconCalendarDue,
 } from "@tabler/icons-react";
-import { useQuery } from "@tanstack/react-query";
+import { useInfiniteQuery, useQuery } from "@tanstack/react-query";
 import { useDisclosure } from "@mantine/hooks";
 import { patientsApi } from "../api/patients";
 import { consultationsApi } from "../api/consultations";
@@ -83,11 +83,20 @@ export function PatientDetailPage() {
     enabled: !!id,
   });
 
-  const { data: timeline = [] } = useQuery({
+  const {
+    data: timelinePages,
+    fetchNextPage: fetchMoreTimeline,
+    hasNextPage: hasMoreTimeline,
+    isFetchingNextPage: loadingMoreTimeline,
+  } = useInfiniteQuery({
     queryKey: ["timeline", id],
-    queryFn: () => medicalRecordsApi.timeline(id!),
+    queryFn: ({ pageParam }) =>
+      medicalRecordsApi.timeline(id!, { cursor: pageParam }),
+    initialPageParam: undefined as string | undefined,
+    getNextPageParam: (last) => last.next_cursor ?? undefined,
     enabled: !!id,
   });
+  const timeline = timelinePages?.pages.flatMap((p) => p.entries) ?? [];
 
   if (loadingPatient) {
     return <LoadingCard />;
@@ -276,7 +285,12 @@ export function PatientDetailPage() {
         </Tabs.List>
 
         <Tabs.Panel value="timeline" pt="md">
-          <PatientTimeline entries={timeline} />
+          <PatientTimeline
+            entries={timeline}
+            hasMore={hasMoreTimeline}
+            loadingMore={loadingMoreTimeline}
+            onLoadMore={fetchMoreTimeline}
+          />
         </Tabs.Panel>
 
         <Tabs.Panel value="records" pt="md">
@@ -101,6 +101,11 @@ export interface TimelineEntry {
   description?: string | null;
 }
 
+export interface TimelinePage {
+  entries: TimelineEntry[];
+  next_cursor: string | null;
+}
+
 export interface ConsultationCreate {
   doctor_id: string;
   patient_id: string;
@@ -141,6 +146,8 @@ export interface InputOut {
   input_id: string;
   type: string;
   created_at: string;
+  /** Background encoding of an uploaded image/audio file. */
+  features_status?: "pending" | "ready" | "failed" | "skipped" | null;
 }
 
 export interface AnalysisRequest {
@@ -161,14 +168,30 @@ export interface AnalysisOut {
   modalities_used: string[];
 }
 
+export interface SimilarStudy {
+  input_id: string;
+  consultation_id: string;
+  patient_id: string;
+  consultation_started_at: string;
+  created_at: string;
+  similarity: number;
+}
+
 export interface SemanticSearchRequest {
   query: string;
   limit?: number;
+  patient_id?: string;
+  doctor_id?: string;
+  date_from?: string;
+  date_to?: string;
+  modality?: "vision" | "text" | "audio" | "history";
 }
 
 export interface SearchResult {
   consultation_id: string;
   summary: string | null;
+  /** Highlighted excerpt; matched terms are wrapped in <mark></mark>. */
+  snippet: string | null;
   started_at: string;
 }
 
@@ -176,10 +199,34 @@ export interface AnalysisSearchResult {
   analysis_id: string;
   consultation_id: string;
   prompt: string;
-  result: Record<string, unknown>;
+  response: string;
+  model: string | null;
   created_at: string;
 }
 
+export interface HybridSearchParams {
+  q: string;
+  patient_id?: string;
+  doctor_id?: string;
+  date_from?: string;
+  date_to?: string;
+  limit?: number;
+}
+
+export interface HybridSearchResult {
+  kind: "consultation" | "analysis" | "record";
+  id: string;
+  consultation_id: string | null;
+  patient_id: string;
+  title: string | null;
+  /** Highlighted excerpt; matched terms are wrapped in <mark></mark>. */
+  snippet: string;
+  occurred_at: string;
+  score: number;
+  fulltext_rank: number | null;
+  vector_rank: number | null;
+}
+
 export interface TranscriptionResult {
   text: string;
   chunks: Array<{ text: string; timestamp: [number, number] }>;
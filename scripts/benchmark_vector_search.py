@@ -0,0 +1,111 @@
+"""Benchmark quantized vector search against exact search.
+
+Samples stored analysis embeddings as queries and compares each
+quantization in src/db/vectors.py with the full-precision baseline:
+recall@k, p50/p95 latency and the on-disk size of the indexes involved.
+
+    python scripts/benchmark_vector_search.py --queries 200 --k 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import func, select, text  # noqa: E402
+
+from src.db.engine import async_session_factory  # noqa: E402
+from src.db.models import AnalysisResult  # noqa: E402
+from src.db.vectors import nearest  # noqa: E402
+
+_INDEXES = {
+    "halfvec": "ix_analysis_results_embedding_half",
+    "binary": "ix_analysis_results_embedding_bits",
+}
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def _search(session, embedding, k: int, quantization: str, rerank_factor: int):
+    start = time.perf_counter()
+    rows = await nearest(
+        session,
+        AnalysisResult,
+        AnalysisResult.embedding,
+        embedding,
+        limit=k,
+        quantization=quantization,
+        rerank_factor=rerank_factor,
+    )
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    return [row.AnalysisResult.id for row in rows], elapsed_ms
+
+
+async def run(queries: int, k: int, rerank_factor: int) -> None:
+    async with async_session_factory() as session:
+        sample = (
+            await session.scalars(
+                select(AnalysisResult.embedding)
+                .where(AnalysisResult.embedding.isnot(None))
+                .order_by(func.random())
+                .limit(queries)
+            )
+        ).all()
+        if not sample:
+            print("No analysis embeddings stored; nothing to benchmark.")
+            return
+
+        baseline: list[list] = []
+        exact_ms: list[float] = []
+        for embedding in sample:
+            ids, elapsed = await _search(session, list(embedding), k, "none", rerank_factor)
+            baseline.append(ids)
+            exact_ms.append(elapsed)
+
+        print(f"{len(sample)} queries, k={k}, rerank factor={rerank_factor}\n")
+        print(f"{'mode':<10}{'recall@k':>10}{'p50 ms':>10}{'p95 ms':>10}{'index':>12}")
+        table_size = await session.scalar(
+            text("SELECT pg_size_pretty(pg_relation_size('analysis_results'))")
+        )
+        print(
+            f"{'none':<10}{1.0:>10.3f}{statistics.median(exact_ms):>10.1f}"
+            f"{_percentile(exact_ms, 95):>10.1f}{table_size:>12}"
+        )
+
+        for quantization, index in _INDEXES.items():
+            hits, latencies = 0, []
+            for embedding, expected in zip(sample, baseline):
+                ids, elapsed = await _search(session, list(embedding), k, quantization, rerank_factor)
+                hits += len(set(ids) & set(expected))
+                latencies.append(elapsed)
+            recall = hits / sum(len(expected) for expected in baseline)
+            size = await session.scalar(
+                text("SELECT pg_size_pretty(pg_relation_size(to_regclass(:name)))"),
+                {"name": index},
+            )
+            print(
+                f"{quantization:<10}{recall:>10.3f}{statistics.median(latencies):>10.1f}"
+                f"{_percentile(latencies, 95):>10.1f}{size or 'missing':>12}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queries", type=int, default=100, help="Number of sampled query vectors")
+    parser.add_argument("--k", type=int, default=10, help="Neighbours per query")
+    parser.add_argument("--rerank-factor", type=int, default=10, help="Candidates per result to re-rank")
+    args = parser.parse_args()
+    asyncio.run(run(args.queries, args.k, args.rerank_factor))
+
+
+if __name__ == "__main__":
+    main()
@@ -11,13 +11,14 @@ try:
 except Exception:
     pass
 
+import asyncio
 import logging
 import threading
 import time
 from contextlib import asynccontextmanager
 from pathlib import Path
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
@@ -41,6 +42,7 @@ logger = logging.getLogger(__name__)
 _FRONTEND_DIST = Path(__file__).resolve().parents[2] / "app" / "dist"
 
 _CLEANUP_INTERVAL = 60  # seconds between idle-model sweeps
+_PROFILE_ROW_WARNING = 500  # ORM rows loaded by one request before warning
 _cleanup_stop = threading.Event()
 
 
@@ -62,8 +64,22 @@ def _warmup_models() -> None:
 
 
 def _idle_cleanup_loop() -> None:
-    """Periodically unload models that have exceeded their idle TTL."""
+    """Periodically unload idle models and trim the feature store.
+
+    Features from a model or revision other than the configured one are
+    dropped once at startup.
+    """
     from src.api.deps import get_fusion
+    from src.services.feature_store import feature_store
+
+    try:
+        feature_store.invalidate_stale({
+            "vision": (settings.vision_model, settings.vision_model_revision),
+            "pixels": (settings.vision_model, settings.vision_model_revision),
+            "audio": (settings.audio_model, settings.audio_feature_revision),
+        })
+    except Exception:
+        logger.exception("Error invalidating stale features")
 
     fusion = get_fusion()
     while not _cleanup_stop.is_set():
@@ -74,6 +90,46 @@ def _idle_cleanup_loop() -> None:
             fusion.cleanup_idle()
         except Exception:
             logger.exception("Error during idle model cleanup")
+        try:
+            feature_store.evict()
+        except Exception:
+            logger.exception("Error during feature store eviction")
+
+
+async def _rollup_refresh_loop() -> None:
+    """Fold new and changed rows into the analytics rollups on an interval."""
+    from src.db.engine import async_session_factory
+    from src.services.rollups import RollupService
+
+    rollups = RollupService()
+    while True:
+        try:
+            async with async_session_factory() as session:
+                await rollups.refresh(session)
+        except Exception:
+            logger.exception("Error during analytics rollup refresh")
+        await asyncio.sleep(settings.rollup_interval_seconds)
+
+
+async def _overdue_sweep_loop() -> None:
+    """Flip pending follow-ups past their due date to overdue on an interval."""
+    from src.db import repositories as repo
+    from src.db.engine import async_session_factory
+    from src.utils.metrics import metrics
+
+    while True:
+        try:
+            start = time.perf_counter()
+            async with async_session_factory() as session:
+                marked = await repo.mark_overdue_follow_ups(
+                    session, batch_size=settings.overdue_sweep_batch_size
+                )
+            metrics.observe("follow_ups.overdue_sweep_ms", (time.perf_counter() - start) * 1000)
+            metrics.incr("follow_ups.overdue_sweeps")
+            metrics.incr("follow_ups.marked_overdue", marked)
+        except Exception:
+            logger.exception("Error during overdue follow-up sweep")
+        await asyncio.sleep(settings.overdue_sweep_interval_seconds)
 
 
 @asynccontextmanager
@@ -86,9 +142,22 @@ async def lifespan(app: FastAPI):
     cleanup_thread = threading.Thread(target=_idle_cleanup_loop, daemon=True)
     cleanup_thread.start()
 
+    rollup_task = asyncio.create_task(_rollup_refresh_loop())
+    overdue_task = asyncio.create_task(_overdue_sweep_loop())
+
     yield
 
     _cleanup_stop.set()
+    rollup_task.cancel()
+    overdue_task.cancel()
+
+    from src.api.deps import get_precomputer
+
+    get_precomputer().shutdown()
+
+    from src.api.deps import get_fusion
+
+    get_fusion().shutdown()
 
 
 def create_app() -> FastAPI:
@@ -114,6 +183,7 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["ETag", "X-Next-Cursor"],
     )
 
     app.include_router(doctors.router)
@@ -143,6 +213,34 @@ def create_app() -> FastAPI:
             "total_loaded_memory_mb": round(total_mb, 1),
         }
 
+    @app.get("/health/metrics")
+    async def health_metrics():
+        from src.utils.metrics import metrics
+
+        return metrics.snapshot()
+
+    if settings.query_profiling:
+        from src.db.profiling import profile_queries
+        from src.utils.metrics import metrics
+
+        @app.middleware("http")
+        async def profile_request_queries(request: Request, call_next):
+            with profile_queries() as stats:
+                response = await call_next(request)
+            route = request.scope.get("route")
+            endpoint = f"{request.method} {getattr(route, 'path', request.url.path)}"
+            metrics.observe(f"db.queries[{endpoint}]", stats.queries)
+            metrics.observe(f"db.rows[{endpoint}]", stats.rows)
+            repeated = stats.repeated()
+            if repeated or stats.rows > _PROFILE_ROW_WARNING:
+                worst = max(repeated, key=repeated.get) if repeated else None
+                logger.warning(
+                    "%s: %d queries, %d rows loaded; most repeated (%dx): %.120s",
+                    endpoint, stats.queries, stats.rows,
+                    repeated.get(worst, 0), worst or "-",
+                )
+            return response
+
     # -- Production static file serving --
     if _FRONTEND_DIST.is_dir():
         app.mount(
@@ -5,16 +5,25 @@ from __future__ import annotations
 from collections.abc import AsyncGenerator
 from functools import lru_cache
 
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from src.db.engine import get_session
+from src.db.engine import async_session_factory, get_session
+from src.config import settings
 from src.services.consultation import ConsultationService
 from src.services.fusion import FusionOrchestrator
+from src.services.precompute import FeaturePrecomputer
+from src.utils.metrics import metrics
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async for session in get_session():
         yield session
+        metrics.observe("db.transactions_per_request", session.info.get("commits", 0))
+
+
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    """For endpoints that fan out over several concurrent sessions."""
+    return async_session_factory
 
 
 @lru_cache(maxsize=1)
@@ -22,5 +31,15 @@ def get_fusion() -> FusionOrchestrator:
     return FusionOrchestrator()
 
 
+@lru_cache(maxsize=1)
+def get_precomputer() -> FeaturePrecomputer:
+    return FeaturePrecomputer(
+        get_fusion(),
+        async_session_factory,
+        workers=settings.precompute_workers,
+        max_pending=settings.precompute_max_pending,
+    )
+
+
 def get_consultation_service() -> ConsultationService:
-    return ConsultationService(fusion=get_fusion())
+    return ConsultationService(fusion=get_fusion(), precomputer=get_precomputer())
@@ -5,11 +5,13 @@ from __future__ import annotations
 import asyncio
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.api.deps import get_consultation_service, get_db, get_fusion
-from src.api.schemas import AnalysisOut, AnalysisRequest, StandaloneAnalysisRequest
+from src.api.schemas import AnalysisOut, AnalysisRequest, SimilarStudyOut, StandaloneAnalysisRequest
 from src.db import repositories as repo
 from src.services.consultation import ConsultationService
 from src.services.fusion import FusionOrchestrator
@@ -33,26 +35,25 @@ async def analyze_in_consultation(
     Attach images/audio via the /inputs endpoints first, then reference
     them with input_id, or provide clinical_text inline.
     """
-    consultation = await repo.get_consultation(db, consultation_id)
-    if not consultation:
+    patient_id = await repo.get_consultation_patient_id(db, consultation_id)
+    if patient_id is None:
         raise HTTPException(404, "Consultation not found")
 
     image_path = None
     audio_path = None
 
     if body.input_id:
-        for inp in consultation.inputs:
-            if inp.id == body.input_id:
-                if inp.input_type.value == "image":
-                    image_path = inp.file_path
-                elif inp.input_type.value == "audio":
-                    audio_path = inp.file_path
-                break
+        inp = await repo.get_input(db, body.input_id, consultation_id=consultation_id)
+        if inp is not None:
+            if inp.input_type.value == "image":
+                image_path = inp.file_path
+            elif inp.input_type.value == "audio":
+                audio_path = inp.file_path
 
     return await svc.run_analysis(
         db,
         consultation_id=consultation_id,
-        patient_id=consultation.patient_id,
+        patient_id=patient_id,
         prompt=body.prompt,
         image_path=image_path,
         clinical_text=body.clinical_text,
@@ -79,3 +80,23 @@ async def standalone_analysis(
         model=result["model"],
         modalities_used=result.get("context_modalities", []),
     )
+
+
+@router.get("/api/inputs/{input_id}/similar", response_model=list[SimilarStudyOut])
+async def similar_studies(
+    input_id: uuid.UUID,
+    scope: Literal["patient", "archive"] = "patient",
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_db),
+    svc: ConsultationService = Depends(get_consultation_service),
+):
+    """Prior image studies most similar to an image input.
+
+    ``scope=patient`` compares against the same patient's earlier images,
+    ``scope=archive`` against every stored image.
+    """
+    try:
+        studies = await svc.similar_studies(db, input_id, same_patient=scope == "patient", limit=limit)
+    except ValueError as e:
+        raise HTTPException(404, str(e))
+    return [SimilarStudyOut(**s) for s in studies]
@@ -2,13 +2,17 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
 import uuid
+from typing import Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from src.api.deps import get_db
-from src.services.analytics import AnalyticsService
+from src.api.deps import get_db, get_session_factory
+from src.services.analytics import DASHBOARD_PANELS, AnalyticsService
 
 router = APIRouter(prefix="/api/analytics", tags=["analytics"])
 
@@ -17,43 +21,97 @@ def _get_analytics() -> AnalyticsService:
     return AnalyticsService()
 
 
+def _conditional(request: Request, payload: dict, *, etag_source: object = None) -> Response:
+    """JSON response with an ETag; 304 when the client already has this version.
+
+    ``etag_source`` lets volatile fields (e.g. timings) be left out of the tag.
+    """
+    body = json.dumps(jsonable_encoder(payload), separators=(",", ":")).encode()
+    source = body if etag_source is None else json.dumps(
+        jsonable_encoder(etag_source), separators=(",", ":"), sort_keys=True
+    ).encode()
+    etag = f'"{hashlib.sha256(source).hexdigest()[:32]}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if_none_match = request.headers.get("if-none-match", "")
+    candidates = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+    if etag in candidates or "*" in candidates:
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+@router.get("/dashboard")
+async def dashboard(
+    request: Request,
+    panels: str | None = Query(
+        None, description=f"Comma-separated subset of: {', '.join(DASHBOARD_PANELS)}"
+    ),
+    days: int = Query(30, ge=1, le=365),
+    doctor_id: uuid.UUID | None = None,
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_session_factory),
+    svc: AnalyticsService = Depends(_get_analytics),
+):
+    """All dashboard panels in one round-trip, computed concurrently."""
+    selected = (
+        tuple(p.strip() for p in panels.split(",") if p.strip()) if panels else DASHBOARD_PANELS
+    )
+    try:
+        result = await svc.dashboard(
+            session_factory, panels=selected, days=days, doctor_id=doctor_id
+        )
+    except ValueError as e:
+        raise HTTPException(422, str(e))
+    return _conditional(request, result, etag_source=[result["panels"], result["errors"]])
+
+
 @router.get("/consultations")
 async def consultation_stats(
+    request: Request,
     days: int = Query(30, ge=1, le=365),
     doctor_id: uuid.UUID | None = None,
+    granularity: Literal["hour", "day", "week"] = "day",
     db: AsyncSession = Depends(get_db),
     svc: AnalyticsService = Depends(_get_analytics),
 ):
-    return await svc.consultation_stats(db, days=days, doctor_id=doctor_id)
+    if granularity == "hour" and days > 31:
+        raise HTTPException(422, "Hourly granularity is limited to 31 days")
+    result = await svc.consultation_stats(
+        db, days=days, doctor_id=doctor_id, granularity=granularity
+    )
+    return _conditional(request, result)
 
 
 @router.get("/modalities")
 async def modality_usage(
+    request: Request,
     db: AsyncSession = Depends(get_db),
     svc: AnalyticsService = Depends(_get_analytics),
 ):
-    return await svc.modality_usage(db)
+    return _conditional(request, await svc.modality_usage(db))
 
 
 @router.get("/demographics")
 async def patient_demographics(
+    request: Request,
     db: AsyncSession = Depends(get_db),
     svc: AnalyticsService = Depends(_get_analytics),
 ):
-    return await svc.patient_demographics(db)
+    return _conditional(request, await svc.patient_demographics(db))
 
 
 @router.get("/ai-performance")
 async def ai_performance(
+    request: Request,
     days: int = Query(30, ge=1, le=365),
     db: AsyncSession = Depends(get_db),
     svc: AnalyticsService = Depends(_get_analytics),
 ):
-    return await svc.ai_performance(db, days=days)
+    return _conditional(request, await svc.ai_performance(db, days=days))
 
 
 @router.get("/doctors/{doctor_id}")
 async def doctor_activity(
+    request: Request,
     doctor_id: uuid.UUID,
     db: AsyncSession = Depends(get_db),
     svc: AnalyticsService = Depends(_get_analytics),
@@ -61,20 +119,39 @@ async def doctor_activity(
     result = await svc.doctor_activity(db, doctor_id)
     if "error" in result:
         raise HTTPException(404, result["error"])
-    return result
+    return _conditional(request, result)
 
 
 @router.get("/risk-cohorts")
 async def risk_cohorts(
+    request: Request,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+    svc: AnalyticsService = Depends(_get_analytics),
+):
+    return _conditional(request, await svc.risk_cohorts(db, limit=limit))
+
+
+@router.get("/risk-cohorts/{cohort}")
+async def risk_cohort_members(
+    request: Request,
+    cohort: Literal["high", "medium", "low"],
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = None,
     db: AsyncSession = Depends(get_db),
     svc: AnalyticsService = Depends(_get_analytics),
 ):
-    return await svc.risk_cohorts(db)
+    try:
+        result = await svc.risk_cohort_members(db, cohort, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    return _conditional(request, result)
 
 
 @router.get("/follow-ups")
 async def follow_up_stats(
+    request: Request,
     db: AsyncSession = Depends(get_db),
     svc: AnalyticsService = Depends(_get_analytics),
 ):
-    return await svc.follow_up_stats(db)
+    return _conditional(request, await svc.follow_up_stats(db))
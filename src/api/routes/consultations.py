@@ -4,10 +4,10 @@ from __future__ import annotations
 
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, HTTPException, Response, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.api.deps import get_consultation_service, get_db
+from src.api.deps import get_consultation_service, get_db, get_precomputer
 from src.api.schemas import (
     ConsultationCreate,
     ConsultationDetail,
@@ -20,19 +20,21 @@ from src.api.schemas import (
 from src.db import repositories as repo
 from src.db.models import Consultation, ConsultationStatus, InputType
 from src.services.consultation import ConsultationService
-from src.utils.file_handlers import classify_file, save_upload
+from src.utils.file_handlers import UploadTooLarge, classify_file, save_upload, upload_limit
 
 router = APIRouter(prefix="/api/consultations", tags=["consultations"])
 
 
 def _consultation_to_detail(c: Consultation, *, include_inputs: bool = False) -> ConsultationDetail:
     """Build ConsultationDetail from ORM. Set include_inputs=True only when inputs are loaded."""
+    precomputer = get_precomputer()
     inputs = (
         [
             InputOut(
                 input_id=str(i.id),
                 type=i.input_type.value,
                 created_at=i.created_at.isoformat(),
+                features_status=precomputer.status(i.id),
             )
             for i in c.inputs
         ]
@@ -78,7 +80,7 @@ async def get_consultation(
     consultation_id: uuid.UUID,
     db: AsyncSession = Depends(get_db),
 ):
-    consultation = await repo.get_consultation(db, consultation_id)
+    consultation = await repo.get_consultation(db, consultation_id, with_analyses=False)
     if not consultation:
         raise HTTPException(404, "Consultation not found")
     return _consultation_to_detail(consultation, include_inputs=True)
@@ -86,11 +88,13 @@ async def get_consultation(
 
 @router.get("", response_model=list[ConsultationDetail])
 async def list_consultations(
+    response: Response,
     doctor_id: uuid.UUID | None = None,
     patient_id: uuid.UUID | None = None,
     status: str | None = None,
     limit: int = 50,
     offset: int = 0,
+    cursor: str | None = None,
     db: AsyncSession = Depends(get_db),
 ):
     status_enum = None
@@ -99,9 +103,15 @@ async def list_consultations(
             status_enum = ConsultationStatus(status)
         except ValueError:
             raise HTTPException(422, f"Invalid status: {status!r}")
-    consultations = await repo.list_consultations(
-        db, doctor_id=doctor_id, patient_id=patient_id, status=status_enum, limit=limit, offset=offset
-    )
+    try:
+        consultations = await repo.list_consultations(
+            db, doctor_id=doctor_id, patient_id=patient_id, status=status_enum,
+            limit=limit, offset=offset, cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    if next_cursor := repo.next_page_cursor(consultations, limit):
+        response.headers["X-Next-Cursor"] = next_cursor
     return [_consultation_to_detail(c, include_inputs=False) for c in consultations]
 
 
@@ -130,8 +140,7 @@ async def add_text_input(
     db: AsyncSession = Depends(get_db),
     svc: ConsultationService = Depends(get_consultation_service),
 ):
-    consultation = await repo.get_consultation(db, consultation_id)
-    if not consultation:
+    if not await repo.consultation_exists(db, consultation_id):
         raise HTTPException(404, "Consultation not found")
     return await svc.add_input(
         db, consultation_id=consultation_id, input_type=InputType.TEXT, raw_text=body.raw_text
@@ -145,20 +154,21 @@ async def add_file_input(
     db: AsyncSession = Depends(get_db),
     svc: ConsultationService = Depends(get_consultation_service),
 ):
-    consultation = await repo.get_consultation(db, consultation_id)
-    if not consultation:
+    if not await repo.consultation_exists(db, consultation_id):
         raise HTTPException(404, "Consultation not found")
 
     file_type = classify_file(file.filename or "")
     if file_type is None:
         raise HTTPException(400, f"Unsupported file type: {file.filename}")
 
-    content = await file.read()
-    path = await save_upload(content, file.filename or "upload", str(consultation_id))
+    try:
+        stored = await save_upload(file, max_bytes=upload_limit(file_type))
+    except UploadTooLarge as e:
+        raise HTTPException(413, str(e))
 
     return await svc.add_input(
         db,
         consultation_id=consultation_id,
         input_type=InputType(file_type),
-        file_path=str(path),
+        file_path=str(stored.path),
     )
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.api.deps import get_db
@@ -16,12 +16,23 @@ router = APIRouter(prefix="/api/doctors", tags=["doctors"])
 
 @router.get("", response_model=list[DoctorOut])
 async def list_doctors(
+    response: Response,
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: str | None = None,
     db: AsyncSession = Depends(get_db),
 ):
-    """List doctors for selection (e.g. when starting a consultation)."""
-    return await repo.list_doctors(db, limit=limit, offset=offset)
+    """List doctors for selection (e.g. when starting a consultation).
+
+    Pass the ``X-Next-Cursor`` response header back as ``cursor`` for the next page.
+    """
+    try:
+        doctors = await repo.list_doctors(db, limit=limit, offset=offset, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    if next_cursor := repo.next_page_cursor(doctors, limit):
+        response.headers["X-Next-Cursor"] = next_cursor
+    return doctors
 
 
 @router.post("", response_model=DoctorOut, status_code=201)
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -71,11 +71,13 @@ def _follow_up_to_out(fu) -> FollowUpOut:
 
 @router.get("/api/follow-ups", response_model=list[FollowUpOut])
 async def list_follow_ups(
+    response: Response,
     doctor_id: uuid.UUID | None = None,
     patient_id: uuid.UUID | None = None,
     status: str | None = None,
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: str | None = None,
     db: AsyncSession = Depends(get_db),
 ):
     status_enum = None
@@ -85,10 +87,15 @@ async def list_follow_ups(
         except ValueError:
             raise HTTPException(422, f"Invalid status: {status!r}")
 
-    follow_ups = await repo.list_follow_ups(
-        db, doctor_id=doctor_id, patient_id=patient_id, status=status_enum,
-        limit=limit, offset=offset,
-    )
+    try:
+        follow_ups = await repo.list_follow_ups(
+            db, doctor_id=doctor_id, patient_id=patient_id, status=status_enum,
+            limit=limit, offset=offset, cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    if next_cursor := repo.next_page_cursor(follow_ups, limit):
+        response.headers["X-Next-Cursor"] = next_cursor
     return [_follow_up_to_out(fu) for fu in follow_ups]
 
 
@@ -143,7 +150,7 @@ async def create_follow_up(
     db: AsyncSession = Depends(get_db),
 ):
     """Manually create a follow-up for a consultation."""
-    consultation = await repo.get_consultation(db, consultation_id)
+    consultation = await repo.get_consultation_header(db, consultation_id)
     if not consultation:
         raise HTTPException(404, "Consultation not found")
 
@@ -177,8 +184,7 @@ async def generate_follow_ups(
     svc: FollowUpService = Depends(_get_follow_up_service),
 ):
     """AI-generate follow-up recommendations from consultation results."""
-    consultation = await repo.get_consultation(db, consultation_id)
-    if not consultation:
+    if not await repo.consultation_exists(db, consultation_id):
         raise HTTPException(404, "Consultation not found")
 
     follow_ups = await svc.generate_follow_ups(db, consultation_id)
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, UploadFile, File, Form
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.api.deps import get_db
@@ -17,7 +17,7 @@ from src.api.schemas import (
 )
 from src.db import repositories as repo
 from src.db.models import RecordType
-from src.utils.file_handlers import save_upload
+from src.utils.file_handlers import UploadTooLarge, classify_file, save_upload, upload_limit
 
 router = APIRouter(prefix="/api/patients/{patient_id}", tags=["medical-records"])
 
@@ -59,8 +59,15 @@ async def upload_record(
     if not patient:
         raise HTTPException(404, "Patient not found")
 
+    file_type = classify_file(file.filename or "")
+    if file_type is None:
+        raise HTTPException(400, f"Unsupported file type: {file.filename}")
+
     from datetime import datetime
-    file_path = await save_upload(file, sub_dir=f"records/{patient_id}")
+    try:
+        stored = await save_upload(file, max_bytes=upload_limit(file_type))
+    except UploadTooLarge as e:
+        raise HTTPException(413, str(e))
     parsed_date = datetime.fromisoformat(record_date)
 
     record = await repo.create_medical_record(
@@ -69,7 +76,7 @@ async def upload_record(
         record_type=RecordType(record_type),
         title=title,
         description=description,
-        file_path=file_path,
+        file_path=str(stored.path),
         record_date=parsed_date,
     )
     return record
@@ -77,16 +84,24 @@ async def upload_record(
 
 @router.get("/records", response_model=list[MedicalRecordOut])
 async def list_records(
+    response: Response,
     patient_id: uuid.UUID,
     record_type: RecordTypeEnum | None = Query(None),
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: str | None = None,
     db: AsyncSession = Depends(get_db),
 ):
     rt = RecordType(record_type.value) if record_type else None
-    return await repo.list_medical_records(
-        db, patient_id, record_type=rt, limit=limit, offset=offset
-    )
+    try:
+        records = await repo.list_medical_records(
+            db, patient_id, record_type=rt, limit=limit, offset=offset, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    if next_cursor := repo.next_page_cursor(records, limit):
+        response.headers["X-Next-Cursor"] = next_cursor
+    return records
 
 
 @router.get("/records/{record_id}", response_model=MedicalRecordOut)
@@ -115,11 +130,20 @@ async def delete_record(
 
 @router.get("/timeline")
 async def get_timeline(
+    response: Response,
     patient_id: uuid.UUID,
     limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = None,
     db: AsyncSession = Depends(get_db),
 ):
+    """Newest-first timeline; follow ``X-Next-Cursor`` for older entries."""
     patient = await repo.get_patient(db, patient_id)
     if not patient:
         raise HTTPException(404, "Patient not found")
-    return await repo.get_patient_timeline(db, patient_id, limit=limit)
+    try:
+        entries = await repo.get_patient_timeline(db, patient_id, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    if next_cursor := repo.timeline_cursor(entries, limit):
+        response.headers["X-Next-Cursor"] = next_cursor
+    return entries
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.api.deps import get_db
@@ -16,14 +16,22 @@ router = APIRouter(prefix="/api/patients", tags=["patients"])
 
 @router.get("", response_model=list[PatientOut])
 async def list_or_search_patients(
+    response: Response,
     q: str = Query("", min_length=0),
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: str | None = None,
     db: AsyncSession = Depends(get_db),
 ):
     if q:
         return await repo.search_patients(db, q, limit=limit)
-    return await repo.list_patients(db, limit=limit, offset=offset)
+    try:
+        patients = await repo.list_patients(db, limit=limit, offset=offset, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    if next_cursor := repo.next_page_cursor(patients, limit):
+        response.headers["X-Next-Cursor"] = next_cursor
+    return patients
 
 
 @router.post("", response_model=PatientOut, status_code=201)
@@ -2,13 +2,26 @@
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.ext.asyncio import AsyncSession
+import logging
+import uuid
+from datetime import datetime
 
-from src.api.deps import get_db, get_fusion
-from src.api.schemas import AnalysisSearchResultOut, SearchResultOut, SemanticSearchRequest
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.api.deps import get_db, get_fusion, get_session_factory
+from src.api.schemas import (
+    AnalysisSearchResultOut,
+    HybridSearchResultOut,
+    SearchResultOut,
+    SemanticSearchRequest,
+)
 from src.db import repositories as repo
+from src.db.search import SearchFilters
 from src.services.fusion import FusionOrchestrator
+from src.services.search import SearchService
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/search", tags=["search"])
 
@@ -20,14 +33,15 @@ async def fulltext_search(
     db: AsyncSession = Depends(get_db),
 ):
     """Full-text search across consultation summaries."""
-    consultations = await repo.fulltext_search(db, q, limit=limit)
+    rows = await repo.fulltext_search(db, q, limit=limit)
     return [
         SearchResultOut(
             consultation_id=str(c.id),
             summary=c.summary,
+            snippet=snippet,
             started_at=c.started_at,
         )
-        for c in consultations
+        for c, snippet in rows
     ]
 
 
@@ -38,15 +52,68 @@ async def semantic_search(
     fusion: FusionOrchestrator = Depends(get_fusion),
 ):
     """Semantic similarity search across analysis results using embeddings."""
-    query_embedding = fusion.nlp.get_embedding(body.query)
-    results = await repo.semantic_search(db, query_embedding, limit=body.limit)
+    if body.date_from and body.date_to and body.date_from > body.date_to:
+        raise HTTPException(400, "date_from must not be after date_to")
+    try:
+        query_embedding = await fusion.embed_query(body.query)
+    except TimeoutError:
+        raise HTTPException(503, "Query embedding timed out")
+    results = await repo.semantic_search(
+        db,
+        query_embedding,
+        limit=body.limit,
+        patient_id=body.patient_id,
+        doctor_id=body.doctor_id,
+        date_from=body.date_from,
+        date_to=body.date_to,
+        modality=body.modality,
+    )
     return [
         AnalysisSearchResultOut(
             analysis_id=str(r.id),
             consultation_id=str(r.consultation_id),
             prompt=r.prompt,
-            result=r.result,
+            response=r.result.get("response", "") if isinstance(r.result, dict) else "",
+            model=r.result.get("model") if isinstance(r.result, dict) else None,
             created_at=r.created_at,
         )
         for r in results
     ]
+
+
+@router.get("/hybrid", response_model=list[HybridSearchResultOut])
+async def hybrid_search(
+    q: str = Query(..., min_length=1),
+    patient_id: uuid.UUID | None = None,
+    doctor_id: uuid.UUID | None = None,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    limit: int = Query(20, ge=1, le=100),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_session_factory),
+    fusion: FusionOrchestrator = Depends(get_fusion),
+):
+    """Consultations, analyses and records ranked by full-text and semantic match."""
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(400, "date_from must not be after date_to")
+    try:
+        query_embedding = await fusion.embed_query(q)
+    except TimeoutError:
+        logger.warning("Query embedding timed out; hybrid search falls back to full-text only")
+        query_embedding = None
+    except Exception:
+        logger.exception("Query embedding failed; hybrid search falls back to full-text only")
+        query_embedding = None
+
+    filters = SearchFilters(patient_id=patient_id, doctor_id=doctor_id, date_from=date_from, date_to=date_to)
+    results = await SearchService().hybrid(session_factory, q, query_embedding, filters=filters, limit=limit)
+    return [
+        HybridSearchResultOut(
+            **{
+                **r,
+                "id": str(r["id"]),
+                "consultation_id": str(r["consultation_id"]) if r["consultation_id"] else None,
+                "patient_id": str(r["patient_id"]),
+            }
+        )
+        for r in results
+    ]
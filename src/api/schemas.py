@@ -222,6 +222,8 @@ class InputOut(BaseModel):
     input_id: str
     type: str
     created_at: str
+    # Background encoding of an uploaded file: pending, ready, failed or skipped.
+    features_status: str | None = None
 
 
 # ── Analysis ──
@@ -245,17 +247,32 @@ class AnalysisOut(BaseModel):
     modalities_used: list[str]
 
 
+class SimilarStudyOut(BaseModel):
+    input_id: str
+    consultation_id: str
+    patient_id: str
+    consultation_started_at: datetime
+    created_at: datetime
+    similarity: float
+
+
 # ── Search ──
 
 
 class SemanticSearchRequest(BaseModel):
     query: str
     limit: int = Field(default=10, ge=1, le=100)
+    patient_id: uuid.UUID | None = None
+    doctor_id: uuid.UUID | None = None
+    date_from: datetime | None = None
+    date_to: datetime | None = None
+    modality: Literal["vision", "text", "audio", "history"] | None = None
 
 
 class SearchResultOut(BaseModel):
     consultation_id: str
     summary: str | None
+    snippet: str | None = None
     started_at: datetime
 
     model_config = {"from_attributes": True}
@@ -265,7 +282,21 @@ class AnalysisSearchResultOut(BaseModel):
     analysis_id: str
     consultation_id: str
     prompt: str
-    result: dict
+    response: str
+    model: str | None = None
     created_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+class HybridSearchResultOut(BaseModel):
+    kind: Literal["consultation", "analysis", "record"]
+    id: str
+    consultation_id: str | None
+    patient_id: str
+    title: str | None
+    snippet: str
+    occurred_at: datetime
+    score: float
+    fulltext_rank: int | None
+    vector_rank: int | None
@@ -1,14 +1,27 @@
 from collections.abc import AsyncGenerator
 
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
 
 from src.config import settings
+from src.db import profiling
+from src.utils.metrics import metrics
 
 engine = create_async_engine(settings.database_url, echo=False, future=True)
+profiling.install(engine.sync_engine)
 
 async_session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
+@event.listens_for(Session, "after_commit")
+def _count_commit(session: Session) -> None:
+    # session.info is shared with the owning AsyncSession, so get_db can
+    # report the number of transactions a request committed.
+    session.info["commits"] = session.info.get("commits", 0) + 1
+    metrics.incr("db.commits")
+
+
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     async with async_session_factory() as session:
         yield session
@@ -1,23 +1,57 @@
 import enum
 import uuid
-from datetime import datetime
+from datetime import date, datetime
 
 from pgvector.sqlalchemy import Vector
 from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    Computed,
+    Date,
     DateTime,
     Enum,
     ForeignKey,
     Index,
+    Integer,
     String,
     Text,
     func,
+    text,
 )
 from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR, UUID
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
 class Base(DeclarativeBase):
-    pass
+    # Fetch server-generated values (defaults, onupdate, computed columns) with
+    # RETURNING on flush, so writes need no refresh() round-trip afterwards.
+    __mapper_args__ = {"eager_defaults": True}
+
+
+# Risk score: 2 points per chronic condition, 1 per allergy. Non-array JSONB
+# values (SQL or JSON null) count as empty so the generated column never errors.
+RISK_SCORE_SQL = (
+    "(CASE WHEN jsonb_typeof(chronic_conditions) = 'array' "
+    "THEN jsonb_array_length(chronic_conditions) ELSE 0 END) * 2 + "
+    "(CASE WHEN jsonb_typeof(allergies) = 'array' "
+    "THEN jsonb_array_length(allergies) ELSE 0 END)"
+)
+
+
+def _search_vector() -> Column:
+    """Weighted tsvector kept current by a BEFORE INSERT/UPDATE trigger.
+
+    Weights: consultations summary (A); analyses response (A), prompt (B);
+    records title (A), description (B), extracted text (C). The triggers
+    are installed by migration k1l2m3n4o5p6.
+    """
+    return Column("search_vector", TSVECTOR, nullable=True)
+
+
+# search_vector columns are table-only (use ``Model.__table__.c.search_vector``):
+# mapped, eager_defaults would pull the whole tsvector back on every write.
+_SEARCH_VECTOR_MAPPER_ARGS = {"eager_defaults": True, "exclude_properties": ["search_vector"]}
 
 # Enums 
 
@@ -74,6 +108,9 @@ class FollowUpStatus(str, enum.Enum):
 
 class Doctor(Base):
     __tablename__ = "doctors"
+    __table_args__ = (
+        Index("ix_doctors_name_id", "name", "id"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -88,6 +125,28 @@ class Patient(Base):
     __table_args__ = (
         Index("ix_patients_city", "city"),
         Index("ix_patients_province", "province"),
+        Index("ix_patients_risk_score", "risk_score", "id"),
+        Index("ix_patients_name_id", "name", "id"),
+        # Fuzzy lookup (pg_trgm) and short-query / MRN prefix matches.
+        Index(
+            "ix_patients_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}
+        ),
+        Index(
+            "ix_patients_mrn_trgm",
+            "medical_record_number",
+            postgresql_using="gin",
+            postgresql_ops={"medical_record_number": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_patients_mrn_prefix",
+            "medical_record_number",
+            postgresql_ops={"medical_record_number": "text_pattern_ops"},
+        ),
+        Index(
+            "ix_patients_name_prefix",
+            func.lower(text("name")).label("name_lower"),
+            postgresql_ops={"name_lower": "text_pattern_ops"},
+        ),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -113,6 +172,7 @@ class Patient(Base):
     allergies: Mapped[dict | None] = mapped_column(JSONB)
     chronic_conditions: Mapped[dict | None] = mapped_column(JSONB)
     notes: Mapped[str | None] = mapped_column(Text)
+    risk_score: Mapped[int] = mapped_column(Integer, Computed(RISK_SCORE_SQL, persisted=True))
 
     consultations: Mapped[list["Consultation"]] = relationship(back_populates="patient")
     medical_records: Mapped[list["MedicalRecord"]] = relationship(back_populates="patient", cascade="all, delete-orphan")
@@ -120,8 +180,14 @@ class Patient(Base):
 
 class Consultation(Base):
     __tablename__ = "consultations"
+    __mapper_args__ = _SEARCH_VECTOR_MAPPER_ARGS
     __table_args__ = (
+        _search_vector(),
         Index("ix_consultations_search", "search_vector", postgresql_using="gin"),
+        Index("ix_consultations_started_at", "started_at"),
+        Index("ix_consultations_patient_started", "patient_id", "started_at", "id"),
+        Index("ix_consultations_doctor_started", "doctor_id", "started_at", "id"),
+        Index("ix_consultations_updated_at", "updated_at"),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -137,7 +203,9 @@ class Consultation(Base):
     started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     ended_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
     summary: Mapped[str | None] = mapped_column(Text)
-    search_vector: Mapped[None] = mapped_column(TSVECTOR, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
 
     doctor: Mapped["Doctor"] = relationship(back_populates="consultations")
     patient: Mapped["Patient"] = relationship(back_populates="consultations")
@@ -147,35 +215,108 @@ class Consultation(Base):
 
 class ConsultationInput(Base):
     __tablename__ = "consultation_inputs"
+    __table_args__ = (
+        Index("ix_consultation_inputs_created_at", "created_at"),
+        Index(
+            "ix_consultation_inputs_image_embedding",
+            "image_embedding",
+            postgresql_using="hnsw",
+            postgresql_ops={"image_embedding": "vector_cosine_ops"},
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     consultation_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("consultations.id"), nullable=False)
     input_type: Mapped[InputType] = mapped_column(Enum(InputType, name="input_type_enum"), nullable=False)
     file_path: Mapped[str | None] = mapped_column(String(500))
     raw_text: Mapped[str | None] = mapped_column(Text)
+    # Mean-pooled CXformer embedding of an image input, for prior-study search.
+    image_embedding = mapped_column(Vector(768), nullable=True, deferred=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     consultation: Mapped["Consultation"] = relationship(back_populates="inputs")
     analysis_results: Mapped[list["AnalysisResult"]] = relationship(back_populates="input")
 
 
+# Quantized HNSW expression indexes used by src/db/vectors.py.
+def _quantized_embedding_indexes(table: str) -> tuple[Index, Index]:
+    return (
+        Index(
+            f"ix_{table}_embedding_half",
+            text("(embedding::halfvec(768)) halfvec_cosine_ops"),
+            postgresql_using="hnsw",
+        ),
+        Index(
+            f"ix_{table}_embedding_bits",
+            text("(binary_quantize(embedding)::bit(768)) bit_hamming_ops"),
+            postgresql_using="hnsw",
+        ),
+    )
+
+
 class AnalysisResult(Base):
     __tablename__ = "analysis_results"
+    __mapper_args__ = _SEARCH_VECTOR_MAPPER_ARGS
+    __table_args__ = (
+        _search_vector(),
+        Index("ix_analysis_results_search", "search_vector", postgresql_using="gin"),
+        Index("ix_analysis_results_consultation_created", "consultation_id", "created_at"),
+        *_quantized_embedding_indexes("analysis_results"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     consultation_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("consultations.id"), nullable=False)
     input_id: Mapped[uuid.UUID | None] = mapped_column(ForeignKey("consultation_inputs.id"))
     prompt: Mapped[str] = mapped_column(Text, nullable=False)
     result: Mapped[dict] = mapped_column(JSONB, nullable=False)
-    embedding = mapped_column(Vector(768), nullable=True)
+    embedding = mapped_column(Vector(768), nullable=True, deferred=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     consultation: Mapped["Consultation"] = relationship(back_populates="analysis_results")
     input: Mapped["ConsultationInput | None"] = relationship(back_populates="analysis_results")
 
 
+class AnalysisTelemetry(Base):
+    """Narrow per-analysis metrics, kept apart from the wide JSONB/vector row.
+
+    Analytics aggregate over this table only, so dashboards never touch the
+    response text or embeddings stored on ``analysis_results``.
+    """
+
+    __tablename__ = "analysis_telemetry"
+    __table_args__ = (
+        Index("ix_analysis_telemetry_created_at", "created_at"),
+    )
+
+    analysis_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("analysis_results.id", ondelete="CASCADE"), primary_key=True
+    )
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    model: Mapped[str] = mapped_column(String(255), nullable=False, default="unknown")
+    input_tokens: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    output_tokens: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    vision_ms: Mapped[int | None] = mapped_column(Integer)
+    nlp_ms: Mapped[int | None] = mapped_column(Integer)
+    audio_ms: Mapped[int | None] = mapped_column(Integer)
+    reasoning_ms: Mapped[int | None] = mapped_column(Integer)
+    total_ms: Mapped[int | None] = mapped_column(Integer)
+
+    used_vision: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    used_text: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    used_audio: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    used_history: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+
+
 class MedicalRecord(Base):
     __tablename__ = "medical_records"
+    __mapper_args__ = _SEARCH_VECTOR_MAPPER_ARGS
+    __table_args__ = (
+        _search_vector(),
+        Index("ix_medical_records_search", "search_vector", postgresql_using="gin"),
+        Index("ix_medical_records_patient_date", "patient_id", "record_date", "id"),
+        *_quantized_embedding_indexes("medical_records"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     patient_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("patients.id"), nullable=False)
@@ -187,13 +328,21 @@ class MedicalRecord(Base):
     metadata_json: Mapped[dict | None] = mapped_column(JSONB)
     record_date: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
-    embedding = mapped_column(Vector(768), nullable=True)
+    embedding = mapped_column(Vector(768), nullable=True, deferred=True)
 
     patient: Mapped["Patient"] = relationship(back_populates="medical_records")
 
 
 class FollowUp(Base):
     __tablename__ = "follow_ups"
+    __table_args__ = (
+        Index("ix_follow_ups_updated_at", "updated_at"),
+        Index("ix_follow_ups_created_at", "created_at"),
+        Index("ix_follow_ups_due_date", "due_date", "id"),
+        Index("ix_follow_ups_doctor_due", "doctor_id", "due_date", "id"),
+        Index("ix_follow_ups_patient_due", "patient_id", "due_date", "id"),
+        Index("ix_follow_ups_status_due", "status", "due_date"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     consultation_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("consultations.id"), nullable=False)
@@ -218,7 +367,100 @@ class FollowUp(Base):
     outcome_notes: Mapped[str | None] = mapped_column(Text)
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
 
     consultation: Mapped["Consultation"] = relationship()
     patient: Mapped["Patient"] = relationship()
     doctor: Mapped["Doctor"] = relationship()
+
+
+# Analytics rollups
+#
+# Daily pre-aggregates maintained by ``src.services.rollups``. Each table is
+# rebuilt only for the days touched since its watermark, so dashboard reads
+# scale with the number of days in the window rather than the number of rows.
+
+
+class ConsultationDailyRollup(Base):
+    __tablename__ = "consultation_daily_rollup"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    doctor_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    status: Mapped[ConsultationStatus] = mapped_column(
+        Enum(ConsultationStatus, name="consultation_status_enum"), primary_key=True
+    )
+    consultation_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    duration_seconds_sum: Mapped[float] = mapped_column(nullable=False, default=0)
+    duration_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class InputDailyRollup(Base):
+    __tablename__ = "input_daily_rollup"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    input_type: Mapped[InputType] = mapped_column(
+        Enum(InputType, name="input_type_enum"), primary_key=True
+    )
+    input_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class AnalysisDailyRollup(Base):
+    __tablename__ = "analysis_daily_rollup"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    model: Mapped[str] = mapped_column(String(255), primary_key=True)
+    analysis_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    input_tokens: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    output_tokens: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+    used_vision: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    used_text: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    used_audio: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    used_history: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    # Latency sums/counts per stage; averages are sum / count at read time.
+    vision_ms_sum: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    vision_ms_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    nlp_ms_sum: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    nlp_ms_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    audio_ms_sum: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    audio_ms_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    reasoning_ms_sum: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    reasoning_ms_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    total_ms_sum: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    total_ms_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class FollowUpDailyRollup(Base):
+    __tablename__ = "follow_up_daily_rollup"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    status: Mapped[FollowUpStatus] = mapped_column(
+        Enum(FollowUpStatus, name="follow_up_status_enum"), primary_key=True
+    )
+    follow_up_type: Mapped[FollowUpType] = mapped_column(
+        Enum(FollowUpType, name="follow_up_type_enum"), primary_key=True
+    )
+    ai_generated: Mapped[bool] = mapped_column(Boolean, primary_key=True)
+    follow_up_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class RollupWatermark(Base):
+    __tablename__ = "rollup_watermarks"
+
+    name: Mapped[str] = mapped_column(String(100), primary_key=True)
+    watermark: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class RollupDirtyDay(Base):
+    """A rollup day a source row has left (deleted, or its bucket timestamp moved).
+
+    Written by the ``rollup_mark_dirty`` triggers, consumed by the next refresh.
+    """
+
+    __tablename__ = "rollup_dirty_days"
+
+    name: Mapped[str] = mapped_column(String(100), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
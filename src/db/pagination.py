@@ -0,0 +1,80 @@
+"""Opaque keyset cursors for paginated listings.
+
+A cursor encodes the sort key of the last row on a page. The next page is
+fetched with a row-value comparison against it, so every page costs the same
+index range scan however deep the caller has scrolled.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import uuid
+from collections.abc import Callable
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import Select, tuple_
+
+
+def _dump(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if hasattr(value, "value"):  # enum members
+        return value.value
+    return value
+
+
+def encode_cursor(*values: Any) -> str:
+    """Pack the sort key of the last row on a page into an opaque token."""
+    payload = json.dumps([_dump(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: Callable[[Any], Any]) -> tuple:
+    """Unpack a token produced by ``encode_cursor``.
+
+    ``types`` converts each position back to its Python type (e.g. ``int``,
+    ``uuid.UUID``, ``datetime.fromisoformat``). Raises ``ValueError`` for
+    anything that was not produced by ``encode_cursor`` with the same shape.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Malformed cursor") from exc
+    if not isinstance(values, list) or len(values) != len(types):
+        raise ValueError("Malformed cursor")
+    try:
+        return tuple(t(v) for t, v in zip(types, values))
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Malformed cursor") from exc
+
+
+def _loader(column) -> Callable[[Any], Any]:
+    python_type = column.type.python_type
+    return datetime.fromisoformat if python_type is datetime else python_type
+
+
+def keyset(stmt: Select, columns: tuple, cursor: str | None, *, descending: bool = False) -> Select:
+    """Order *stmt* by *columns* and, given a cursor, start just past it.
+
+    *columns* must end in a unique column (normally the primary key) so the
+    order is total; all columns sort in the same direction so a single
+    row-value comparison selects the rest of the range.
+    """
+    stmt = stmt.order_by(*(c.desc() if descending else c.asc() for c in columns))
+    if cursor:
+        values = decode_cursor(cursor, *(_loader(c) for c in columns))
+        key = tuple_(*columns)
+        stmt = stmt.where(key < tuple_(*values) if descending else key > tuple_(*values))
+    return stmt
+
+
+def next_cursor(rows: list, limit: int, columns: tuple) -> str | None:
+    """Cursor for the page after *rows*, or ``None`` when it was a short (last) page."""
+    if len(rows) < limit or not rows:
+        return None
+    return encode_cursor(*(getattr(rows[-1], c.key) for c in columns))
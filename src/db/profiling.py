@@ -0,0 +1,70 @@
+"""Query counting for spotting N+1 patterns and over-fetching.
+
+``profile_queries()`` collects, for everything executed inside it, the number
+of SQL statements, the number of ORM rows loaded and how often each distinct
+statement ran::
+
+    with profile_queries() as stats:
+        await repo.get_consultation(session, consultation_id)
+    assert stats.queries <= 3 and not stats.repeated()
+
+With ``QUERY_PROFILING`` enabled, the app wraps every request in it, records
+per-endpoint counts in ``/health/metrics`` and logs a warning for requests
+that repeat a statement or load an unusually large number of rows.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .models import Base
+
+
+@dataclass
+class QueryStats:
+    queries: int = 0
+    rows: int = 0
+    statements: Counter[str] = field(default_factory=Counter)
+
+    def repeated(self, threshold: int = 2) -> dict[str, int]:
+        """Statements executed at least *threshold* times (N+1 candidates)."""
+        return {sql: n for sql, n in self.statements.items() if n >= threshold}
+
+
+_current: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def profile_queries() -> Iterator[QueryStats]:
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.statements[statement] += 1
+
+
+def _on_load(target, context) -> None:
+    stats = _current.get()
+    if stats is not None:
+        stats.rows += 1
+
+
+def install(engine: Engine) -> None:
+    """Hook the counters into *engine* (a sync engine) and the ORM mappers."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Base, "load", _on_load, propagate=True)
@@ -1,13 +1,17 @@
+import logging
 import uuid
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 
 from pgvector.sqlalchemy import Vector
-from sqlalchemy import cast, func, select, text, union_all, literal_column
+from sqlalchemy import Row, Text, cast, exists, func, insert, literal, null, select, text, tuple_, union_all, update, literal_column
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased, selectinload
 
 from .models import (
     AnalysisResult,
+    AnalysisTelemetry,
     Consultation,
     ConsultationInput,
     ConsultationStatus,
@@ -21,14 +25,107 @@ from .models import (
     Patient,
     RecordType,
 )
+from .pagination import decode_cursor, encode_cursor, keyset, next_cursor
+from .search import SNIPPET_OPTIONS
+from .vectors import nearest
+
+logger = logging.getLogger(__name__)
+
+# Sort keys of the paginated listings below (ending in the primary key so the
+# order is total). Each is backed by a composite index.
+_PAGE_KEYS = {
+    Doctor: ((Doctor.name, Doctor.id), False),
+    Patient: ((Patient.name, Patient.id), False),
+    Consultation: ((Consultation.started_at, Consultation.id), True),
+    MedicalRecord: ((MedicalRecord.record_date, MedicalRecord.id), True),
+    FollowUp: ((FollowUp.due_date, FollowUp.id), False),
+}
+
+
+def _paginate(stmt, model, cursor: str | None, limit: int, offset: int):
+    columns, descending = _PAGE_KEYS[model]
+    stmt = keyset(stmt, columns, cursor, descending=descending).limit(limit)
+    return stmt.offset(offset) if offset else stmt
+
+
+def next_page_cursor(rows: list, limit: int) -> str | None:
+    """Opaque cursor for the page after *rows* from one of the ``list_*`` functions."""
+    if not rows:
+        return None
+    columns, _ = _PAGE_KEYS[type(rows[0])]
+    return next_cursor(rows, limit, columns)
+
+
+# Write hooks
+_write_listeners: list[Callable[[tuple[str, ...]], Awaitable[None]]] = []
+
+
+def on_write(listener: Callable[[tuple[str, ...]], Awaitable[None]]):
+    """Register *listener* to be awaited with the table names after each committed write."""
+    _write_listeners.append(listener)
+    return listener
+
+
+async def notify_write(*tables: str) -> None:
+    """Fire the write hooks. Called by every write below, and by bulk jobs that bypass them."""
+    for listener in _write_listeners:
+        try:
+            await listener(tables)
+        except Exception:
+            logger.exception("Write listener failed for %s", tables)
+
+
+# Unit of work
+_UOW_KEY = "unit_of_work_tables"
+
+
+@asynccontextmanager
+async def unit_of_work(session: AsyncSession) -> AsyncIterator[AsyncSession]:
+    """Group the repository writes made inside the block into one transaction.
+
+    Inside the block, write functions flush (so ids and server defaults are
+    populated) instead of committing. The block commits once on exit, or rolls
+    back if it raises, and then fires the write hooks for every table touched.
+    Nested blocks join the outermost one.
+    """
+    if _UOW_KEY in session.info:
+        yield session
+        return
+
+    tables: set[str] = set()
+    session.info[_UOW_KEY] = tables
+    try:
+        yield session
+        await session.commit()
+    except BaseException:
+        await session.rollback()
+        raise
+    finally:
+        del session.info[_UOW_KEY]
+    if tables:
+        await notify_write(*sorted(tables))
+
+
+async def _commit(session: AsyncSession, *tables: str) -> None:
+    """Commit a write, or only flush it when a unit of work is open.
+
+    Server defaults come back via RETURNING (``eager_defaults``), so no
+    follow-up ``refresh()`` round-trip is needed.
+    """
+    pending = session.info.get(_UOW_KEY)
+    if pending is not None:
+        await session.flush()
+        pending.update(tables)
+        return
+    await session.commit()
+    await notify_write(*tables)
 
 
 # Doctor
 async def create_doctor(session: AsyncSession, *, name: str, specialization: str | None = None) -> Doctor:
     doctor = Doctor(name=name, specialization=specialization)
     session.add(doctor)
-    await session.commit()
-    await session.refresh(doctor)
+    await _commit(session, "doctors")
     return doctor
 
 
@@ -36,8 +133,10 @@ async def get_doctor(session: AsyncSession, doctor_id: uuid.UUID) -> Doctor | No
     return await session.get(Doctor, doctor_id)
 
 
-async def list_doctors(session: AsyncSession, *, limit: int = 50, offset: int = 0) -> list[Doctor]:
-    stmt = select(Doctor).order_by(Doctor.name).limit(limit).offset(offset)
+async def list_doctors(
+    session: AsyncSession, *, limit: int = 50, offset: int = 0, cursor: str | None = None
+) -> list[Doctor]:
+    stmt = _paginate(select(Doctor), Doctor, cursor, limit, offset)
     result = await session.execute(stmt)
     return list(result.scalars().all())
 
@@ -46,8 +145,7 @@ async def list_doctors(session: AsyncSession, *, limit: int = 50, offset: int =
 async def create_patient(session: AsyncSession, **fields) -> Patient:
     patient = Patient(**fields)
     session.add(patient)
-    await session.commit()
-    await session.refresh(patient)
+    await _commit(session, "patients")
     return patient
 
 
@@ -59,8 +157,7 @@ async def update_patient(
         return None
     for key, value in fields.items():
         setattr(patient, key, value)
-    await session.commit()
-    await session.refresh(patient)
+    await _commit(session, "patients")
     return patient
 
 
@@ -68,22 +165,72 @@ async def get_patient(session: AsyncSession, patient_id: uuid.UUID) -> Patient |
     return await session.get(Patient, patient_id)
 
 
-async def list_patients(session: AsyncSession, *, limit: int = 50, offset: int = 0) -> list[Patient]:
-    stmt = select(Patient).order_by(Patient.name).limit(limit).offset(offset)
+async def list_patients(
+    session: AsyncSession, *, limit: int = 50, offset: int = 0, cursor: str | None = None
+) -> list[Patient]:
+    stmt = _paginate(select(Patient), Patient, cursor, limit, offset)
     result = await session.execute(stmt)
     return list(result.scalars().all())
 
 
+# Shorter queries hold no complete trigram, so they fall back to prefix matches.
+_MIN_TRIGRAM_QUERY = 3
+
+
+def _like_escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
 async def search_patients(session: AsyncSession, query: str, *, limit: int = 20) -> list[Patient]:
-    pattern = f"%{query}%"
-    stmt = (
-        select(Patient)
-        .where(
-            Patient.name.ilike(pattern) | Patient.medical_record_number.ilike(pattern)
+    """Typo-tolerant lookup by name or MRN, best match first.
+
+    A query containing a digit is first tried as an exact MRN prefix. Otherwise
+    names match on trigram word similarity (so "jonh smth" finds "John Smith")
+    or substring, and MRNs on substring; all of it is served by the pg_trgm
+    GIN indexes.
+    """
+    query = query.strip()
+    if not query:
+        return []
+    prefix = _like_escape(query) + "%"
+
+    if any(ch.isdigit() for ch in query):
+        stmt = (
+            select(Patient)
+            .where(Patient.medical_record_number.like(prefix))
+            .order_by(Patient.medical_record_number)
+            .limit(limit)
+        )
+        patients = list((await session.execute(stmt)).scalars().all())
+        if patients:
+            return patients
+
+    if len(query) < _MIN_TRIGRAM_QUERY:
+        stmt = (
+            select(Patient)
+            .where(
+                func.lower(Patient.name).like(prefix.lower())
+                | Patient.medical_record_number.like(prefix)
+            )
+            .order_by(Patient.name, Patient.id)
+            .limit(limit)
+        )
+    else:
+        pattern = f"%{_like_escape(query)}%"
+        score = func.greatest(
+            func.word_similarity(query, Patient.name),
+            func.similarity(func.coalesce(Patient.medical_record_number, ""), query),
+        )
+        stmt = (
+            select(Patient)
+            .where(
+                Patient.name.ilike(pattern)
+                | literal(query).op("<%")(Patient.name)
+                | Patient.medical_record_number.ilike(pattern)
+            )
+            .order_by(score.desc(), Patient.name, Patient.id)
+            .limit(limit)
         )
-        .order_by(Patient.name)
-        .limit(limit)
-    )
     result = await session.execute(stmt)
     return list(result.scalars().all())
 
@@ -102,21 +249,58 @@ async def create_consultation(
         consultation_type=consultation_type,
     )
     session.add(consultation)
-    await session.commit()
-    await session.refresh(consultation)
+    await _commit(session, "consultations")
     return consultation
 
 
-async def get_consultation(session: AsyncSession, consultation_id: uuid.UUID) -> Consultation | None:
-    stmt = (
-        select(Consultation)
-        .options(selectinload(Consultation.inputs), selectinload(Consultation.analysis_results))
-        .where(Consultation.id == consultation_id)
-    )
+async def get_consultation(
+    session: AsyncSession,
+    consultation_id: uuid.UUID,
+    *,
+    with_inputs: bool = True,
+    with_analyses: bool = True,
+) -> Consultation | None:
+    """Load a consultation with the collections the caller asks for.
+
+    Pass ``with_inputs=False`` / ``with_analyses=False`` when those
+    collections aren't needed; to merely check existence or read a column
+    or two, use ``consultation_exists`` / ``get_consultation_header``.
+    """
+    stmt = select(Consultation).where(Consultation.id == consultation_id)
+    if with_inputs:
+        stmt = stmt.options(selectinload(Consultation.inputs))
+    if with_analyses:
+        stmt = stmt.options(selectinload(Consultation.analysis_results))
     result = await session.execute(stmt)
     return result.scalar_one_or_none()
 
 
+async def consultation_exists(session: AsyncSession, consultation_id: uuid.UUID) -> bool:
+    stmt = select(exists().where(Consultation.id == consultation_id))
+    return bool((await session.execute(stmt)).scalar())
+
+
+async def get_consultation_header(session: AsyncSession, consultation_id: uuid.UUID) -> Row | None:
+    """The consultation's scalar columns (no summary, inputs or analyses), as a row."""
+    stmt = select(
+        Consultation.id,
+        Consultation.doctor_id,
+        Consultation.patient_id,
+        Consultation.consultation_type,
+        Consultation.status,
+        Consultation.started_at,
+        Consultation.ended_at,
+    ).where(Consultation.id == consultation_id)
+    return (await session.execute(stmt)).one_or_none()
+
+
+async def get_consultation_patient_id(
+    session: AsyncSession, consultation_id: uuid.UUID
+) -> uuid.UUID | None:
+    stmt = select(Consultation.patient_id).where(Consultation.id == consultation_id)
+    return (await session.execute(stmt)).scalar_one_or_none()
+
+
 async def list_consultations(
     session: AsyncSession,
     *,
@@ -125,8 +309,9 @@ async def list_consultations(
     status: ConsultationStatus | None = None,
     limit: int = 50,
     offset: int = 0,
+    cursor: str | None = None,
 ) -> list[Consultation]:
-    stmt = select(Consultation).order_by(Consultation.started_at.desc()).limit(limit).offset(offset)
+    stmt = _paginate(select(Consultation), Consultation, cursor, limit, offset)
     if doctor_id:
         stmt = stmt.where(Consultation.doctor_id == doctor_id)
     if patient_id:
@@ -140,16 +325,15 @@ async def list_consultations(
 async def end_consultation(
     session: AsyncSession, consultation_id: uuid.UUID, *, summary: str | None = None
 ) -> Consultation | None:
-    consultation = await get_consultation(session, consultation_id)
+    # Served from the identity map when the caller already loaded it.
+    consultation = await session.get(Consultation, consultation_id)
     if consultation is None:
         return None
     consultation.status = ConsultationStatus.COMPLETED
     consultation.ended_at = datetime.now(timezone.utc)
     if summary:
         consultation.summary = summary
-        consultation.search_vector = func.to_tsvector("english", summary)
-    await session.commit()
-    await session.refresh(consultation)
+    await _commit(session, "consultations")
     return consultation
 
 
@@ -169,12 +353,100 @@ async def add_input(
         raw_text=raw_text,
     )
     session.add(inp)
-    await session.commit()
-    await session.refresh(inp)
+    await _commit(session, "consultation_inputs")
     return inp
 
 
+async def get_input(
+    session: AsyncSession, input_id: uuid.UUID, *, consultation_id: uuid.UUID | None = None
+) -> ConsultationInput | None:
+    stmt = select(ConsultationInput).where(ConsultationInput.id == input_id)
+    if consultation_id is not None:
+        stmt = stmt.where(ConsultationInput.consultation_id == consultation_id)
+    return (await session.execute(stmt)).scalar_one_or_none()
+
+
+async def get_image_embedding(session: AsyncSession, input_id: uuid.UUID) -> list[float] | None:
+    stmt = select(ConsultationInput.image_embedding).where(ConsultationInput.id == input_id)
+    return (await session.execute(stmt)).scalar_one_or_none()
+
+
+async def save_image_embedding(session: AsyncSession, input_id: uuid.UUID, embedding: list[float]) -> None:
+    """Store an image input's embedding; an already stored one is kept."""
+    await session.execute(
+        update(ConsultationInput)
+        .where(ConsultationInput.id == input_id, ConsultationInput.image_embedding.is_(None))
+        .values(image_embedding=embedding)
+        .execution_options(synchronize_session=False)
+    )
+    await _commit(session, "consultation_inputs")
+
+
+async def similar_images(
+    session: AsyncSession,
+    embedding: list[float],
+    *,
+    exclude_input_id: uuid.UUID | None = None,
+    patient_id: uuid.UUID | None = None,
+    started_before: datetime | None = None,
+    limit: int = 10,
+) -> list[Row]:
+    """Image inputs nearest to *embedding* as ``(ConsultationInput, patient_id, started_at, distance)``.
+
+    Candidates come from :func:`nearest` on the HNSW index over
+    ``image_embedding``. *patient_id* restricts the search to that patient's
+    studies, which are few enough to be ranked exactly rather than filtered
+    out of the archive-wide index scan; *started_before* to studies from
+    consultations that started before then.
+    """
+    consultation_filters = []
+    if patient_id is not None:
+        consultation_filters.append(Consultation.patient_id == patient_id)
+    if started_before is not None:
+        consultation_filters.append(Consultation.started_at < started_before)
+    where = []
+    if consultation_filters:
+        where.append(
+            ConsultationInput.consultation_id.in_(select(Consultation.id).where(*consultation_filters))
+        )
+    # One extra neighbour stands in for the excluded input, usually the query itself.
+    neighbours = await nearest(
+        session,
+        ConsultationInput,
+        ConsultationInput.image_embedding,
+        embedding,
+        limit=limit + (exclude_input_id is not None),
+        where=where,
+        quantization="vector",
+    )
+    ids = [row.ConsultationInput.id for row in neighbours if row.ConsultationInput.id != exclude_input_id][:limit]
+    if not ids:
+        return []
+
+    distance = ConsultationInput.image_embedding.cosine_distance(embedding)
+    stmt = (
+        select(ConsultationInput, Consultation.patient_id, Consultation.started_at, distance.label("distance"))
+        .join(Consultation, Consultation.id == ConsultationInput.consultation_id)
+        .where(ConsultationInput.id.in_(ids))
+        .order_by(distance)
+    )
+    return list((await session.execute(stmt)).all())
+
+
 # Analysis Results
+
+# Keys of a fusion result kept in the ``result`` JSONB. The embedding lives
+# only in its pgvector column; per-stage detail is in analysis_telemetry.
+ANALYSIS_RESULT_FIELDS = (
+    "response",
+    "model",
+    "input_tokens",
+    "output_tokens",
+    "context_modalities",
+    "timings_ms",
+)
+
+
 async def save_analysis(
     session: AsyncSession,
     *,
@@ -185,49 +457,120 @@ async def save_analysis(
     embedding: list[float] | None = None,
 ) -> AnalysisResult:
     ar = AnalysisResult(
+        id=uuid.uuid4(),
         consultation_id=consultation_id,
         input_id=input_id,
         prompt=prompt,
-        result=result,
+        result={k: result[k] for k in ANALYSIS_RESULT_FIELDS if k in result},
         embedding=embedding,
     )
     session.add(ar)
-    await session.commit()
-    await session.refresh(ar)
+    session.add(_telemetry_from_result(ar.id, result))
+    await _commit(session, "analysis_results")
     return ar
 
+
+def _telemetry_from_result(analysis_id: uuid.UUID, result: dict) -> AnalysisTelemetry:
+    """Lift the fields analytics aggregate over out of a fusion result."""
+    timings = result.get("timings_ms") or {}
+    modalities = set(result.get("context_modalities") or [])
+    return AnalysisTelemetry(
+        analysis_id=analysis_id,
+        model=result.get("model") or "unknown",
+        input_tokens=result.get("input_tokens") or 0,
+        output_tokens=result.get("output_tokens") or 0,
+        vision_ms=timings.get("vision"),
+        nlp_ms=timings.get("nlp"),
+        audio_ms=timings.get("audio"),
+        reasoning_ms=timings.get("reasoning"),
+        total_ms=timings.get("total"),
+        used_vision="vision" in modalities,
+        used_text="text" in modalities,
+        used_audio="audio" in modalities,
+        used_history="patient_history" in modalities,
+    )
+
 # Search 
-async def fulltext_search(session: AsyncSession, query: str, *, limit: int = 20) -> list[Consultation]:
+async def fulltext_search(session: AsyncSession, query: str, *, limit: int = 20) -> list[Row]:
+    """Best-ranked consultations for *query* as ``(Consultation, snippet)`` rows."""
     ts_query = func.plainto_tsquery("english", query)
-    stmt = (
-        select(Consultation)
-        .where(Consultation.search_vector.op("@@")(ts_query))
-        .order_by(func.ts_rank(Consultation.search_vector, ts_query).desc())
+    search_vector = Consultation.__table__.c.search_vector
+    rank = func.ts_rank_cd(search_vector, ts_query)
+    ranked = (
+        select(Consultation, rank.label("rank"))
+        .where(search_vector.op("@@")(ts_query))
+        .order_by(rank.desc())
         .limit(limit)
+        .subquery()
     )
+    # ts_headline is expensive, so it runs only over the rows that made the cut.
+    snippet = func.ts_headline("english", func.coalesce(ranked.c.summary, ""), ts_query, SNIPPET_OPTIONS)
+    stmt = select(aliased(Consultation, ranked), snippet.label("snippet")).order_by(ranked.c.rank.desc())
     result = await session.execute(stmt)
-    return list(result.scalars().all())
+    return list(result.all())
+
+# Analysis modalities a semantic search can be restricted to.
+_MODALITY_FLAGS = {
+    "vision": AnalysisTelemetry.used_vision,
+    "text": AnalysisTelemetry.used_text,
+    "audio": AnalysisTelemetry.used_audio,
+    "history": AnalysisTelemetry.used_history,
+}
+
 
 async def semantic_search(
-    session: AsyncSession, query_embedding: list[float], *, limit: int = 10
+    session: AsyncSession,
+    query_embedding: list[float],
+    *,
+    limit: int = 10,
+    quantization: str | None = None,
+    patient_id: uuid.UUID | None = None,
+    doctor_id: uuid.UUID | None = None,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    modality: str | None = None,
 ) -> list[AnalysisResult]:
-    distance = AnalysisResult.embedding.cosine_distance(query_embedding)
-    stmt = (
-        select(AnalysisResult)
-        .where(AnalysisResult.embedding.isnot(None))
-        .order_by(distance)
-        .limit(limit)
+    """Analyses closest to the query embedding (see ``vectors.nearest``).
+
+    The filters narrow the search before ranking; ``nearest`` decides from
+    the size of the filtered set whether to use the ANN index at all.
+    """
+    where = []
+    if patient_id is not None or doctor_id is not None:
+        consultations = select(Consultation.id)
+        if patient_id is not None:
+            consultations = consultations.where(Consultation.patient_id == patient_id)
+        if doctor_id is not None:
+            consultations = consultations.where(Consultation.doctor_id == doctor_id)
+        where.append(AnalysisResult.consultation_id.in_(consultations))
+    if date_from is not None:
+        where.append(AnalysisResult.created_at >= date_from)
+    if date_to is not None:
+        where.append(AnalysisResult.created_at <= date_to)
+    if modality is not None:
+        where.append(
+            exists().where(
+                AnalysisTelemetry.analysis_id == AnalysisResult.id, _MODALITY_FLAGS[modality].is_(True)
+            )
+        )
+
+    rows = await nearest(
+        session,
+        AnalysisResult,
+        AnalysisResult.embedding,
+        query_embedding,
+        limit=limit,
+        where=where,
+        quantization=quantization,
     )
-    result = await session.execute(stmt)
-    return list(result.scalars().all())
+    return [row.AnalysisResult for row in rows]
 
 
 # Medical Records
 async def create_medical_record(session: AsyncSession, **fields) -> MedicalRecord:
     record = MedicalRecord(**fields)
     session.add(record)
-    await session.commit()
-    await session.refresh(record)
+    await _commit(session, "medical_records")
     return record
 
 
@@ -242,13 +585,11 @@ async def list_medical_records(
     record_type: RecordType | None = None,
     limit: int = 50,
     offset: int = 0,
+    cursor: str | None = None,
 ) -> list[MedicalRecord]:
-    stmt = (
-        select(MedicalRecord)
-        .where(MedicalRecord.patient_id == patient_id)
-        .order_by(MedicalRecord.record_date.desc())
-        .limit(limit)
-        .offset(offset)
+    stmt = _paginate(
+        select(MedicalRecord).where(MedicalRecord.patient_id == patient_id),
+        MedicalRecord, cursor, limit, offset,
     )
     if record_type:
         stmt = stmt.where(MedicalRecord.record_type == record_type)
@@ -261,67 +602,124 @@ async def delete_medical_record(session: AsyncSession, record_id: uuid.UUID) ->
     if record is None:
         return False
     await session.delete(record)
-    await session.commit()
+    await _commit(session, "medical_records")
     return True
 
 
 # Patient Timeline
+TIMELINE_ENTRY_TYPES = ("consultation", "medical_record")
+
+
+def _timeline_branch(entry_type: str, date_col, id_col, cursor_key: tuple | None):
+    """Seek condition for one UNION branch, given the (date, entry_type, id) cursor.
+
+    Within a branch entry_type is constant, so the three-column comparison
+    reduces to one on (date, id) that the (patient_id, date, id) index serves.
+    """
+    if cursor_key is None:
+        return None
+    date, after_type, after_id = cursor_key
+    if entry_type < after_type:
+        return date_col <= date
+    if entry_type > after_type:
+        return date_col < date
+    return tuple_(date_col, id_col) < tuple_(date, after_id)
+
+
 async def get_patient_timeline(
     session: AsyncSession,
     patient_id: uuid.UUID,
     *,
     limit: int = 50,
+    cursor: str | None = None,
 ) -> list[dict]:
-    """Return a unified, date-sorted timeline of consultations and medical records."""
+    """Return a unified, date-sorted timeline of consultations and medical records.
+
+    Ordered by (date, entry_type, id) descending and keyset-paginated with
+    ``cursor`` (see ``timeline_cursor``). Each branch reads at most ``limit``
+    rows off its index, and the merge happens in the same query.
+    """
+    cursor_key = None
+    if cursor:
+        cursor_key = decode_cursor(cursor, datetime.fromisoformat, str, uuid.UUID)
+        if cursor_key[1] not in TIMELINE_ENTRY_TYPES:
+            raise ValueError("Malformed cursor")
+
     consultations_q = (
         select(
+            literal_column("'consultation'").label("entry_type"),
             Consultation.id.label("id"),
             Consultation.started_at.label("date"),
             Consultation.summary.label("title"),
             Consultation.status.label("status"),
             Consultation.consultation_type.label("consultation_type"),
+            cast(null(), MedicalRecord.record_type.type).label("record_type"),
+            cast(null(), Text).label("description"),
         )
         .where(Consultation.patient_id == patient_id)
+        .order_by(Consultation.started_at.desc(), Consultation.id.desc())
+        .limit(limit)
     )
-    cons_rows = await session.execute(consultations_q.order_by(Consultation.started_at.desc()).limit(limit))
-    consultations = cons_rows.all()
-
     records_q = (
         select(
+            literal_column("'medical_record'").label("entry_type"),
             MedicalRecord.id.label("id"),
             MedicalRecord.record_date.label("date"),
             MedicalRecord.title.label("title"),
+            cast(null(), Consultation.status.type).label("status"),
+            cast(null(), Consultation.consultation_type.type).label("consultation_type"),
             MedicalRecord.record_type.label("record_type"),
             MedicalRecord.description.label("description"),
         )
         .where(MedicalRecord.patient_id == patient_id)
+        .order_by(MedicalRecord.record_date.desc(), MedicalRecord.id.desc())
+        .limit(limit)
     )
-    rec_rows = await session.execute(records_q.order_by(MedicalRecord.record_date.desc()).limit(limit))
-    records = rec_rows.all()
+    seek = _timeline_branch("consultation", Consultation.started_at, Consultation.id, cursor_key)
+    if seek is not None:
+        consultations_q = consultations_q.where(seek)
+    seek = _timeline_branch("medical_record", MedicalRecord.record_date, MedicalRecord.id, cursor_key)
+    if seek is not None:
+        records_q = records_q.where(seek)
+
+    timeline_q = union_all(consultations_q, records_q).subquery()
+    stmt = (
+        select(timeline_q)
+        .order_by(timeline_q.c.date.desc(), timeline_q.c.entry_type.desc(), timeline_q.c.id.desc())
+        .limit(limit)
+    )
+    rows = (await session.execute(stmt)).all()
 
     timeline: list[dict] = []
-    for c in consultations:
-        timeline.append({
-            "entry_type": "consultation",
-            "id": c.id,
-            "date": c.date,
-            "title": c.title or "Consultation",
-            "status": c.status.value if hasattr(c.status, "value") else str(c.status),
-            "consultation_type": c.consultation_type.value if hasattr(c.consultation_type, "value") else str(c.consultation_type),
-            "summary": c.title,
-        })
-    for r in records:
-        timeline.append({
-            "entry_type": "medical_record",
-            "id": r.id,
-            "date": r.date,
-            "title": r.title,
-            "record_type": r.record_type.value if hasattr(r.record_type, "value") else str(r.record_type),
-            "description": r.description,
-        })
-
-    timeline.sort(key=lambda x: x["date"], reverse=True)
-    return timeline[:limit]
+    for r in rows:
+        if r.entry_type == "consultation":
+            timeline.append({
+                "entry_type": "consultation",
+                "id": r.id,
+                "date": r.date,
+                "title": r.title or "Consultation",
+                "status": r.status.value if hasattr(r.status, "value") else str(r.status),
+                "consultation_type": r.consultation_type.value if hasattr(r.consultation_type, "value") else str(r.consultation_type),
+                "summary": r.title,
+            })
+        else:
+            timeline.append({
+                "entry_type": "medical_record",
+                "id": r.id,
+                "date": r.date,
+                "title": r.title,
+                "record_type": r.record_type.value if hasattr(r.record_type, "value") else str(r.record_type),
+                "description": r.description,
+            })
+    return timeline
+
+
+def timeline_cursor(entries: list[dict], limit: int) -> str | None:
+    """Cursor for the timeline page after *entries*, or ``None`` after a short page."""
+    if len(entries) < limit or not entries:
+        return None
+    last = entries[-1]
+    return encode_cursor(last["date"], last["entry_type"], last["id"])
 
 
 async def get_patient_analysis_details(
@@ -405,11 +803,20 @@ async def get_patient_history_summary(
 async def create_follow_up(session: AsyncSession, **fields) -> FollowUp:
     follow_up = FollowUp(**fields)
     session.add(follow_up)
-    await session.commit()
-    await session.refresh(follow_up)
+    await _commit(session, "follow_ups")
     return follow_up
 
 
+async def create_follow_ups(session: AsyncSession, rows: list[dict]) -> list[FollowUp]:
+    """Insert several follow-ups with one INSERT ... RETURNING."""
+    if not rows:
+        return []
+    result = await session.scalars(insert(FollowUp).returning(FollowUp), rows)
+    follow_ups = list(result.all())
+    await _commit(session, "follow_ups")
+    return follow_ups
+
+
 async def get_follow_up(session: AsyncSession, follow_up_id: uuid.UUID) -> FollowUp | None:
     return await session.get(FollowUp, follow_up_id)
 
@@ -422,8 +829,9 @@ async def list_follow_ups(
     status: FollowUpStatus | None = None,
     limit: int = 50,
     offset: int = 0,
+    cursor: str | None = None,
 ) -> list[FollowUp]:
-    stmt = select(FollowUp).order_by(FollowUp.due_date.asc()).limit(limit).offset(offset)
+    stmt = _paginate(select(FollowUp), FollowUp, cursor, limit, offset)
     if doctor_id:
         stmt = stmt.where(FollowUp.doctor_id == doctor_id)
     if patient_id:
@@ -442,22 +850,38 @@ async def update_follow_up(
         return None
     for key, value in fields.items():
         setattr(follow_up, key, value)
-    await session.commit()
-    await session.refresh(follow_up)
+    await _commit(session, "follow_ups")
     return follow_up
 
 
-async def mark_overdue_follow_ups(session: AsyncSession) -> int:
-    """Mark all pending follow-ups past their due date as overdue. Returns count."""
-    now = datetime.now(timezone.utc)
-    stmt = (
-        select(FollowUp)
-        .where(FollowUp.status == FollowUpStatus.PENDING, FollowUp.due_date < now)
-    )
-    result = await session.execute(stmt)
-    overdue = list(result.scalars().all())
-    for fu in overdue:
-        fu.status = FollowUpStatus.OVERDUE
-    if overdue:
+async def mark_overdue_follow_ups(session: AsyncSession, *, batch_size: int = 1000) -> int:
+    """Mark all pending follow-ups past their due date as overdue. Returns count.
+
+    Runs set-based UPDATEs of at most ``batch_size`` rows, each committed on
+    its own, so no rows are loaded into Python and row locks stay short.
+    Rows are claimed with SKIP LOCKED, so concurrent sweepers don't block.
+    """
+    total = 0
+    while True:
+        batch = (
+            select(FollowUp.id)
+            .where(FollowUp.status == FollowUpStatus.PENDING, FollowUp.due_date < func.now())
+            .order_by(FollowUp.due_date)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            update(FollowUp)
+            .where(FollowUp.id.in_(batch))
+            .values(status=FollowUpStatus.OVERDUE, updated_at=func.now())
+            .returning(FollowUp.id)
+            .execution_options(synchronize_session=False)
+        )
+        marked = len((await session.execute(stmt)).scalars().all())
         await session.commit()
-    return len(overdue)
+        total += marked
+        if marked < batch_size:
+            break
+    if total:
+        await notify_write("follow_ups")
+    return total
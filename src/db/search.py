@@ -0,0 +1,221 @@
+"""Ranked retrieval over the clinical corpus for hybrid search.
+
+Three kinds of document are searchable, each through its stored, weighted
+``search_vector`` (see ``src.db.models``): consultations (summary), analyses
+(response, prompt) and medical records (title, description, extracted text).
+Each retriever returns ``(kind, id, rank)`` keys, ranked within each kind:
+full-text matches come from a single ``UNION ALL`` statement, nearest
+neighbours from :func:`src.db.vectors.nearest` per embedded kind.
+``SearchService.hybrid`` fuses the rankings and :func:`search_hits` loads
+the winners with highlighted snippets.
+"""
+
+from __future__ import annotations
+
+import uuid
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import Row, and_, case, false, func, literal_column, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from .models import AnalysisResult, Consultation, MedicalRecord
+from .vectors import nearest
+
+SEARCH_KINDS = ("consultation", "analysis", "record")
+
+_TS_CONFIG = "english"
+SNIPPET_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15, MaxFragments=2"
+
+
+@dataclass(frozen=True)
+class SearchFilters:
+    patient_id: uuid.UUID | None = None
+    doctor_id: uuid.UUID | None = None
+    date_from: datetime | None = None
+    date_to: datetime | None = None
+
+
+_analysis_consultation = aliased(Consultation)
+_analysis_response = AnalysisResult.result["response"].astext
+_record_text = func.concat_ws(" ", MedicalRecord.description, MedicalRecord.raw_text)
+
+
+@dataclass(frozen=True)
+class _Source:
+    kind: str
+    id: object
+    document: object
+    embedding: object | None
+    date: object
+    patient_id: object
+    doctor_id: object | None
+    join: tuple = ()
+
+
+_SOURCES = (
+    _Source(
+        kind="consultation",
+        id=Consultation.id,
+        document=Consultation.__table__.c.search_vector,
+        embedding=None,
+        date=Consultation.started_at,
+        patient_id=Consultation.patient_id,
+        doctor_id=Consultation.doctor_id,
+    ),
+    _Source(
+        kind="analysis",
+        id=AnalysisResult.id,
+        document=AnalysisResult.__table__.c.search_vector,
+        embedding=AnalysisResult.embedding,
+        date=AnalysisResult.created_at,
+        patient_id=_analysis_consultation.patient_id,
+        doctor_id=_analysis_consultation.doctor_id,
+        join=(_analysis_consultation, _analysis_consultation.id == AnalysisResult.consultation_id),
+    ),
+    _Source(
+        kind="record",
+        id=MedicalRecord.id,
+        document=MedicalRecord.__table__.c.search_vector,
+        embedding=MedicalRecord.embedding,
+        date=MedicalRecord.record_date,
+        patient_id=MedicalRecord.patient_id,
+        doctor_id=None,
+    ),
+)
+
+
+def _filter_clauses(source: _Source, filters: SearchFilters) -> list:
+    clauses = []
+    if filters.patient_id is not None:
+        clauses.append(source.patient_id == filters.patient_id)
+    if filters.doctor_id is not None:
+        # Records are not attributed to a doctor, so a doctor filter excludes them.
+        clauses.append(source.doctor_id == filters.doctor_id if source.doctor_id is not None else false())
+    if filters.date_from is not None:
+        clauses.append(source.date >= filters.date_from)
+    if filters.date_to is not None:
+        clauses.append(source.date <= filters.date_to)
+    return clauses
+
+
+def _embedded_filter_clauses(source: _Source, filters: SearchFilters) -> list:
+    """``_filter_clauses`` for a statement over the source's table alone.
+
+    Filters on the joined table become a correlated ``EXISTS``, so the
+    statement can go through ``vectors.nearest``.
+    """
+    clauses = _filter_clauses(source, filters)
+    if clauses and source.join and (filters.patient_id is not None or filters.doctor_id is not None):
+        target, on = source.join
+        return [select(target.id).where(on, *clauses).exists()]
+    return clauses
+
+
+def _numbered(keys: Iterable[tuple[str, uuid.UUID]]) -> list[tuple[str, uuid.UUID, int]]:
+    """Rank *keys*, given best first within each kind, from 1 per kind."""
+    positions: dict[str, int] = {}
+    ranked = []
+    for kind, id_ in keys:
+        positions[kind] = positions.get(kind, 0) + 1
+        ranked.append((kind, id_, positions[kind]))
+    return ranked
+
+
+async def fulltext_candidates(
+    session: AsyncSession, query: str, filters: SearchFilters, *, limit: int
+) -> list[tuple[str, uuid.UUID, int]]:
+    """Top *limit* full-text matches of each kind as ``(kind, id, rank)``."""
+    ts_query = func.plainto_tsquery(_TS_CONFIG, query)
+    branches = []
+    for source in _SOURCES:
+        score = func.ts_rank_cd(source.document, ts_query)
+        stmt = select(
+            literal_column(f"'{source.kind}'").label("kind"),
+            source.id.label("id"),
+            score.label("score"),
+        ).select_from(source.id.table)
+        if source.join and (filters.patient_id is not None or filters.doctor_id is not None):
+            stmt = stmt.join(*source.join)
+        stmt = (
+            stmt.where(source.document.op("@@")(ts_query), *_filter_clauses(source, filters))
+            .order_by(score.desc())
+            .limit(limit)
+        )
+        branches.append(select(stmt.subquery()))
+    stmt = union_all(*branches).order_by(literal_column("kind"), literal_column("score").desc())
+    result = await session.execute(stmt)
+    return _numbered((row.kind, row.id) for row in result)
+
+
+async def vector_candidates(
+    session: AsyncSession, query_embedding: list[float], filters: SearchFilters, *, limit: int
+) -> list[tuple[str, uuid.UUID, int]]:
+    """Top *limit* nearest neighbours of each embedded kind as ``(kind, id, rank)``."""
+    keys = []
+    for source in _SOURCES:
+        if source.embedding is None:
+            continue
+        rows = await nearest(
+            session,
+            source.id.class_,
+            source.embedding,
+            query_embedding,
+            limit=limit,
+            where=_embedded_filter_clauses(source, filters),
+        )
+        keys.extend((source.kind, entity.id) for entity, _ in rows)
+    return _numbered(keys)
+
+
+async def search_hits(session: AsyncSession, query: str, keys: list[tuple[str, uuid.UUID]]) -> list[Row]:
+    """Display fields and a highlighted snippet for each ``(kind, id)`` key.
+
+    Rows come back unordered; ``ts_headline`` runs only over these rows, never
+    over the candidate lists.
+    """
+    if not keys:
+        return []
+    ts_query = func.plainto_tsquery(_TS_CONFIG, query)
+    consultation, analysis, record = Consultation, AnalysisResult, MedicalRecord
+    analysis_consultation = aliased(Consultation)
+
+    def _ids(kind: str) -> list[uuid.UUID]:
+        return [id_ for k, id_ in keys if k == kind]
+
+    body = case(
+        (consultation.id.isnot(None), consultation.summary),
+        (analysis.id.isnot(None), _analysis_response),
+        else_=_record_text,
+    )
+    hits = (
+        select(literal_column("'consultation'").label("kind"), consultation.id.label("id"))
+        .where(consultation.id.in_(_ids("consultation")))
+        .union_all(
+            select(literal_column("'analysis'"), analysis.id).where(analysis.id.in_(_ids("analysis"))),
+            select(literal_column("'record'"), record.id).where(record.id.in_(_ids("record"))),
+        )
+        .subquery("hits")
+    )
+    stmt = (
+        select(
+            hits.c.kind,
+            hits.c.id,
+            func.coalesce(consultation.id, analysis.consultation_id).label("consultation_id"),
+            func.coalesce(consultation.patient_id, analysis_consultation.patient_id, record.patient_id).label(
+                "patient_id"
+            ),
+            func.coalesce(analysis.prompt, record.title).label("title"),
+            func.coalesce(consultation.started_at, analysis.created_at, record.record_date).label("occurred_at"),
+            func.ts_headline(_TS_CONFIG, func.coalesce(body, ""), ts_query, SNIPPET_OPTIONS).label("snippet"),
+        )
+        .select_from(hits)
+        .outerjoin(consultation, and_(hits.c.kind == "consultation", consultation.id == hits.c.id))
+        .outerjoin(analysis, and_(hits.c.kind == "analysis", analysis.id == hits.c.id))
+        .outerjoin(analysis_consultation, analysis_consultation.id == analysis.consultation_id)
+        .outerjoin(record, and_(hits.c.kind == "record", record.id == hits.c.id))
+    )
+    result = await session.execute(stmt)
+    return list(result.all())
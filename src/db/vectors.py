@@ -0,0 +1,129 @@
+"""Nearest-neighbour search over pgvector embeddings.
+
+Embeddings are stored once as full-precision ``vector(768)``. The
+quantized forms live only in HNSW expression indexes, so writes are
+unchanged:
+
+* ``halfvec`` -- ``embedding::halfvec(768)``, cosine distance (half the size)
+* ``binary``  -- ``binary_quantize(embedding)::bit(768)``, Hamming distance
+  (1/32 of the size)
+
+With a quantization selected, the index produces ``limit * rerank_factor``
+candidates, which are then re-ranked exactly on the full vectors. With
+``"none"`` the full vectors are compared directly. ``"vector"`` is for
+columns indexed at full precision (image embeddings): candidates come from
+that index and are re-ranked the same way.
+
+Filtered searches (``where=``) pick a strategy from the size of the filtered
+set, counted up to ``vector_exact_search_threshold``:
+
+* ``exact`` -- small sets (a patient's analyses, say) are ranked on the full
+  vectors without the index, which is cheap and loses nothing;
+* ``ann`` -- larger sets go through the quantized index with pgvector's
+  iterative scan, which keeps walking the graph until enough rows pass the
+  filter instead of returning whatever survives the first ``ef_search``.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+from pgvector.sqlalchemy import BIT, HALFVEC, Vector
+from sqlalchemy import Row, cast, func, inspect, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import settings
+from src.utils.metrics import metrics
+
+EMBEDDING_DIM = 768
+QUANTIZATIONS = ("none", "halfvec", "binary")
+
+# pgvector caps hnsw.ef_search at 1000; below 40 (its default) recall drops.
+_EF_SEARCH_MIN, _EF_SEARCH_MAX = 40, 1000
+
+
+def halfvec_expr(column):
+    return cast(column, HALFVEC(EMBEDDING_DIM))
+
+
+def binary_expr(column):
+    return cast(func.binary_quantize(column), BIT(EMBEDDING_DIM))
+
+
+def _approx_distance(column, query_embedding: list[float], quantization: str):
+    query = literal(query_embedding, Vector(EMBEDDING_DIM))
+    if quantization == "vector":
+        return column.cosine_distance(query)
+    if quantization == "halfvec":
+        return halfvec_expr(column).cosine_distance(halfvec_expr(query))
+    if quantization == "binary":
+        return binary_expr(column).hamming_distance(binary_expr(query))
+    raise ValueError(f"Unknown embedding quantization: {quantization!r}")
+
+
+async def _filtered_count(session: AsyncSession, pk, column, where: Sequence, cap: int) -> int:
+    """Rows matching *where*, counted no further than ``cap + 1``."""
+    matching = select(pk).where(column.isnot(None), *where).limit(cap + 1).subquery()
+    return await session.scalar(select(func.count()).select_from(matching))
+
+
+async def _choose_strategy(session: AsyncSession, pk, column, where: Sequence, quantization: str) -> str:
+    if quantization == "none":
+        return "exact"
+    if not where:
+        return "ann"
+    threshold = settings.vector_exact_search_threshold
+    return "exact" if await _filtered_count(session, pk, column, where, threshold) <= threshold else "ann"
+
+
+async def nearest(
+    session: AsyncSession,
+    entity,
+    column,
+    query_embedding: list[float],
+    *,
+    limit: int,
+    where: Sequence = (),
+    quantization: str | None = None,
+    rerank_factor: int | None = None,
+) -> list[Row]:
+    """Rows of *entity* closest to *query_embedding*, as ``(entity, distance)``.
+
+    *column* is the entity's embedding column and *where* extra filters.
+    The result is ordered by exact cosine distance, whichever strategy
+    picked the candidates.
+    """
+    quantization = quantization or settings.embedding_quantization
+    pk = inspect(entity).primary_key[0]
+    exact = column.cosine_distance(query_embedding)
+    stmt = select(entity, exact.label("distance")).where(column.isnot(None), *where)
+
+    strategy = await _choose_strategy(session, pk, column, where, quantization)
+    metrics.incr(f"vectors.strategy.{strategy}")
+    if strategy == "ann":
+        candidates = limit * (rerank_factor or settings.vector_rerank_factor)
+        ef_search = min(max(candidates, _EF_SEARCH_MIN), _EF_SEARCH_MAX)
+        configs = [func.set_config("hnsw.ef_search", str(ef_search), True)]
+        if where:
+            configs.append(func.set_config("hnsw.iterative_scan", "relaxed_order", True))
+        await session.execute(select(*configs))
+        prefilter = (
+            select(pk)
+            .where(column.isnot(None), *where)
+            .order_by(_approx_distance(column, query_embedding, quantization))
+            .limit(candidates)
+        )
+        stmt = stmt.where(pk.in_(prefilter))
+
+    stmt = stmt.order_by(exact).limit(limit)
+    if strategy == "exact" and where:
+        # Keep the planner off an HNSW index on *column*: its scan stops after
+        # ef_search candidates and the filter would discard most of them.
+        await session.execute(select(func.set_config("enable_indexscan", "off", True)))
+        try:
+            result = await session.execute(stmt)
+        finally:
+            await session.execute(select(func.set_config("enable_indexscan", "on", True)))
+    else:
+        result = await session.execute(stmt)
+    return list(result.all())
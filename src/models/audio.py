@@ -3,10 +3,13 @@ Distil-Whisper wrapper for medical speech-to-text.
 
 Model: distil-whisper/distil-large-v3.5 (756M params)
 Supports both batch transcription and streaming (chunked) mode.
+Audio is gated by voice-activity detection first: only speech regions are
+decoded, and chunk timestamps are mapped back to the original recording.
 """
 
 from __future__ import annotations
 
+from bisect import bisect_left, bisect_right
 from pathlib import Path
 
 import numpy as np
@@ -14,11 +17,14 @@ import torch
 from transformers import AutoModelForSpeechSeq2Seq, AutoProcessor, pipeline
 
 from src.config import settings
+from src.utils.metrics import metrics
+from src.utils.vad import VoiceActivityDetector
 
 
 class AudioTranscriber:
     def __init__(self, model_name: str | None = None, device: str | None = None):
         self._model_name = model_name or settings.audio_model
+        self.revision = settings.audio_model_revision
         self._device = device or self._resolve_device()
         self._torch_dtype = torch.float16 if self._device == "cuda" else torch.float32
         self._model = None
@@ -32,10 +38,11 @@ class AudioTranscriber:
 
     def load(self) -> None:
         self._processor = AutoProcessor.from_pretrained(
-            self._model_name, token=settings.hf_token
+            self._model_name, revision=self.revision, token=settings.hf_token
         )
         self._model = AutoModelForSpeechSeq2Seq.from_pretrained(
             self._model_name,
+            revision=self.revision,
             dtype=self._torch_dtype,
             low_cpu_mem_usage=True,
             token=settings.hf_token,
@@ -72,37 +79,56 @@ class AudioTranscriber:
 
         Returns dict with 'text' and optionally 'chunks' (timestamped segments).
         """
-        generate_kwargs = {}
-        if language:
-            generate_kwargs["language"] = language
+        from transformers.pipelines.audio_utils import ffmpeg_read
 
-        result = self.pipe(
-            str(audio_path),
-            return_timestamps=True,
-            generate_kwargs=generate_kwargs,
-        )
-        return {
-            "text": result["text"],
-            "chunks": result.get("chunks", []),
-        }
+        sampling_rate = self.pipe.feature_extractor.sampling_rate
+        audio_array = ffmpeg_read(Path(audio_path).read_bytes(), sampling_rate)
+        return self.transcribe_array(audio_array, sampling_rate, language=language)
 
     def transcribe_array(
         self, audio_array: np.ndarray, sampling_rate: int = 16_000, *, language: str | None = None
     ) -> dict:
         """Transcribe from a raw numpy audio array (for real-time / streaming use)."""
+        if settings.vad_enabled:
+            vad = VoiceActivityDetector(sampling_rate, padding_ms=settings.vad_padding_ms)
+            segments = [(start, audio_array[start:end]) for start, end in vad.regions(audio_array)]
+        else:
+            segments = [(0, audio_array)]
+        metrics.incr("audio.seconds_in", len(audio_array) / sampling_rate)
+        metrics.incr("audio.seconds_decoded", sum(len(audio) for _, audio in segments) / sampling_rate)
+        return self.transcribe_segments(segments, sampling_rate, len(audio_array), language=language)
+
+    def transcribe_segments(
+        self,
+        segments: list[tuple[int, np.ndarray]],
+        sampling_rate: int,
+        total_samples: int,
+        *,
+        language: str | None = None,
+    ) -> dict:
+        """Transcribe ``(start_sample, audio)`` speech segments of a longer recording.
+
+        The segments are decoded back to back in one pass; chunk timestamps
+        refer to the original recording of *total_samples* samples. Callers
+        record the ``audio.seconds_*`` metrics, once per recording.
+        """
+        audio_seconds = total_samples / sampling_rate
+        decoded_seconds = sum(len(audio) for _, audio in segments) / sampling_rate
+        stats = {"audio_seconds": round(audio_seconds, 2), "decoded_seconds": round(decoded_seconds, 2)}
+        if not segments:
+            return {"text": "", "chunks": [], **stats}
+
         generate_kwargs = {}
         if language:
             generate_kwargs["language"] = language
 
         result = self.pipe(
-            {"raw": audio_array, "sampling_rate": sampling_rate},
+            {"raw": np.concatenate([audio for _, audio in segments]), "sampling_rate": sampling_rate},
             return_timestamps=True,
             generate_kwargs=generate_kwargs,
         )
-        return {
-            "text": result["text"],
-            "chunks": result.get("chunks", []),
-        }
+        chunks = _restore_timestamps(result.get("chunks", []), segments, sampling_rate)
+        return {"text": result["text"], "chunks": chunks, **stats}
 
     def analyze(self, audio_path: str | Path) -> dict:
         """High-level analysis returning transcript + metadata for the fusion layer."""
@@ -112,4 +138,33 @@ class AudioTranscriber:
             "model": self._model_name,
             "transcript": result["text"],
             "chunks": result.get("chunks", []),
+            "audio_seconds": result["audio_seconds"],
+            "decoded_seconds": result["decoded_seconds"],
         }
+
+
+def _restore_timestamps(
+    chunks: list[dict], segments: list[tuple[int, np.ndarray]], sampling_rate: int
+) -> list[dict]:
+    """Map chunk timestamps on the concatenated segments back to the recording."""
+    decoded_starts, original_starts, lengths = [], [], []
+    position = 0.0
+    for start, audio in segments:
+        decoded_starts.append(position)
+        original_starts.append(start / sampling_rate)
+        lengths.append(len(audio) / sampling_rate)
+        position += lengths[-1]
+
+    def _map(t: float | None, *, is_end: bool) -> float | None:
+        if t is None:
+            return None
+        # A time on a segment boundary ends the earlier segment or starts the later one.
+        i = (bisect_left if is_end else bisect_right)(decoded_starts, t) - 1
+        i = max(i, 0)
+        return round(original_starts[i] + min(t - decoded_starts[i], lengths[i]), 2)
+
+    restored = []
+    for chunk in chunks:
+        start, end = chunk.get("timestamp", (None, None))
+        restored.append({**chunk, "timestamp": (_map(start, is_end=False), _map(end, is_end=True))})
+    return restored
@@ -2,12 +2,13 @@
 CXformer-base vision encoder for chest X-ray analysis.
 
 Model: m42-health/CXformer-base (87M params, DINOv2-adapted)
-Input:  PIL Image  ->  [1, 3, 518, 518]
+Input:  PIL Image or preprocessed pixels  ->  [1, 3, 518, 518]
 Output: last_hidden_state  [1, 1374, 768]
 """
 
 from __future__ import annotations
 
+import numpy as np
 import torch
 from PIL import Image
 from transformers import AutoImageProcessor, AutoModel
@@ -18,6 +19,7 @@ from src.config import settings
 class VisionEncoder:
     def __init__(self, model_name: str | None = None, device: str | None = None):
         self._model_name = model_name or settings.vision_model
+        self.revision = settings.vision_model_revision
         self._device = device or self._resolve_device()
         self._model: AutoModel | None = None
         self._processor: AutoImageProcessor | None = None
@@ -29,10 +31,10 @@ class VisionEncoder:
 
     def load(self) -> None:
         self._processor = AutoImageProcessor.from_pretrained(
-            self._model_name, trust_remote_code=True, token=settings.hf_token
+            self._model_name, revision=self.revision, trust_remote_code=True, token=settings.hf_token
         )
         self._model = AutoModel.from_pretrained(
-            self._model_name, token=settings.hf_token
+            self._model_name, revision=self.revision, token=settings.hf_token
         ).to(self._device)
         self._model.eval()
 
@@ -65,6 +67,14 @@ class VisionEncoder:
         outputs = self.model(**inputs)
         return outputs.last_hidden_state
 
+    @torch.no_grad()
+    def extract_features_from_pixels(self, pixel_values: np.ndarray) -> torch.Tensor:
+        """Hidden states for an already preprocessed ``[3, 518, 518]`` array."""
+        # Copy: the array may be a read-only memory map.
+        pixels = torch.from_numpy(np.array(pixel_values, dtype=np.float32))[None]
+        outputs = self.model(pixel_values=pixels.to(self._device))
+        return outputs.last_hidden_state
+
     @torch.no_grad()
     def get_embedding(self, image: Image.Image) -> list[float]:
         """Return a single 768-d vector (mean-pooled) for downstream use."""
@@ -75,7 +85,14 @@ class VisionEncoder:
     @torch.no_grad()
     def analyze(self, image: Image.Image) -> dict:
         """High-level analysis returning embedding + metadata for the fusion layer."""
-        hidden = self.extract_features(image)
+        return self._summarize(self.extract_features(image))
+
+    @torch.no_grad()
+    def analyze_pixels(self, pixel_values: np.ndarray) -> dict:
+        """Same as ``analyze`` for preprocessed pixels (see ``src/services/vision_pipeline.py``)."""
+        return self._summarize(self.extract_features_from_pixels(pixel_values))
+
+    def _summarize(self, hidden: torch.Tensor) -> dict:
         pooled = hidden.mean(dim=1).squeeze(0).cpu().tolist()
         return {
             "modality": "vision",
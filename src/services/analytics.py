@@ -1,91 +1,221 @@
 """Analytics service — aggregate intelligence across patients and operations.
 
 Provides consultation stats, modality usage, demographics, AI performance,
-doctor activity, and risk cohort groupings.
+doctor activity, and risk cohort groupings. Time-series and usage panels read
+the daily rollups maintained by ``src.services.rollups`` and report the
+rollup watermark as ``as_of``.
 """
 
 from __future__ import annotations
 
+import asyncio
+import logging
+import time
 import uuid
-from datetime import datetime, timedelta, timezone
+from collections.abc import Callable
+from datetime import date, datetime, timedelta, timezone
 from collections import Counter
 
-from sqlalchemy import func, select, case, extract
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Date, case, cast, extract, func, literal_column, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from src.db.models import (
-    AnalysisResult,
+    AnalysisDailyRollup,
     Consultation,
-    ConsultationInput,
+    ConsultationDailyRollup,
     ConsultationStatus,
     Doctor,
     FollowUp,
+    FollowUpDailyRollup,
     FollowUpStatus,
-    InputType,
+    InputDailyRollup,
     Patient,
+    RollupWatermark,
 )
+from src.db.pagination import decode_cursor, encode_cursor
+from src.services.cache import cached
+
+logger = logging.getLogger(__name__)
+
+GRANULARITIES = ("hour", "day", "week")
+
+DASHBOARD_PANELS = (
+    "consultations",
+    "modalities",
+    "demographics",
+    "ai_performance",
+    "follow_ups",
+    "risk_cohorts",
+)
+
+_BUCKET_FORMATS = {
+    "hour": "%Y-%m-%dT%H:00",
+    "day": "%Y-%m-%d",
+    "week": "%Y-%m-%d",
+}
+
+RISK_COHORTS = ("high", "medium", "low")
+
+
+def _cohort_clause(cohort: str):
+    if cohort == "high":
+        return Patient.risk_score >= 4
+    if cohort == "medium":
+        return Patient.risk_score.between(2, 3)
+    return Patient.risk_score < 2
+
+
+def _jsonb_array_length(column):
+    """``jsonb_array_length`` that treats non-array values as empty."""
+    return case(
+        (func.jsonb_typeof(column) == "array", func.jsonb_array_length(column)),
+        else_=0,
+    )
+
+
+def _raw_consultation_counts(unit, cutoff: datetime, doctor_id: uuid.UUID | None):
+    c = Consultation
+    bucket = func.date_trunc(unit, c.started_at)
+    stmt = (
+        select(
+            bucket.label("bucket"),
+            func.count().label("total"),
+            func.count().filter(c.status == ConsultationStatus.COMPLETED).label("completed"),
+            func.count().filter(c.status == ConsultationStatus.ACTIVE).label("active"),
+            func.count().filter(c.status == ConsultationStatus.CANCELLED).label("cancelled"),
+            func.sum(extract("epoch", c.ended_at - c.started_at)).label("duration_sum"),
+            func.count(c.ended_at).label("duration_count"),
+        )
+        .where(c.started_at >= cutoff)
+        .group_by(bucket)
+    )
+    if doctor_id:
+        stmt = stmt.where(c.doctor_id == doctor_id)
+    return stmt
+
+
+def _rollup_consultation_counts(unit, cutoff_day: date, doctor_id: uuid.UUID | None):
+    r = ConsultationDailyRollup
+    bucket = cast(func.date_trunc(unit, r.day), Date)
+    n = r.consultation_count
+    stmt = (
+        select(
+            bucket.label("bucket"),
+            func.sum(n).label("total"),
+            func.sum(n).filter(r.status == ConsultationStatus.COMPLETED).label("completed"),
+            func.sum(n).filter(r.status == ConsultationStatus.ACTIVE).label("active"),
+            func.sum(n).filter(r.status == ConsultationStatus.CANCELLED).label("cancelled"),
+            func.sum(r.duration_seconds_sum).label("duration_sum"),
+            func.sum(r.duration_count).label("duration_count"),
+        )
+        .where(r.day >= cutoff_day)
+        .group_by(bucket)
+    )
+    if doctor_id:
+        stmt = stmt.where(r.doctor_id == doctor_id)
+    return stmt
 
 
 class AnalyticsService:
     """Read-only analytics queries over the Hippocrates-X data."""
 
+    @cached("consultations", ttl=60)
     async def consultation_stats(
         self,
         session: AsyncSession,
         *,
         days: int = 30,
         doctor_id: uuid.UUID | None = None,
+        granularity: str = "day",
     ) -> dict:
-        cutoff = datetime.now(timezone.utc) - timedelta(days=days)
-
-        base = select(Consultation).where(Consultation.started_at >= cutoff)
-        if doctor_id:
-            base = base.where(Consultation.doctor_id == doctor_id)
+        """Status counts, average duration and zero-filled time buckets.
+
+        Everything is aggregated in a single statement: per-bucket counts are
+        computed with ``FILTER`` clauses and left-joined onto a
+        ``generate_series`` of buckets, so only one row per bucket comes back.
+        Daily and weekly buckets are summed from ``consultation_daily_rollup``;
+        hourly buckets fall back to the raw table.
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unsupported granularity: {granularity!r}")
+
+        now = datetime.now(timezone.utc)
+        cutoff = now - timedelta(days=days)
+        # Inlined rather than bound so the SELECT and GROUP BY expressions match.
+        unit = literal_column(f"'{granularity}'")
+        step = literal_column(f"INTERVAL '1 {granularity}'")
+
+        if granularity == "hour":
+            # Sub-day buckets are not rolled up; aggregate the raw rows.
+            counts = _raw_consultation_counts(unit, cutoff, doctor_id).cte("counts")
+            series = select(
+                func.generate_series(
+                    func.date_trunc(unit, cutoff), func.date_trunc(unit, now), step
+                ).label("bucket")
+            ).cte("series")
+            as_of = now.isoformat()
+        else:
+            counts = _rollup_consultation_counts(unit, cutoff.date(), doctor_id).cte("counts")
+            series = select(
+                cast(
+                    func.generate_series(
+                        func.date_trunc(unit, cutoff.date()), func.date_trunc(unit, now.date()), step
+                    ),
+                    Date,
+                ).label("bucket")
+            ).cte("series")
+            as_of = await self._freshness(session, "consultations")
 
-        result = await session.execute(base)
-        consultations = list(result.scalars().all())
-
-        total = len(consultations)
-        completed = sum(1 for c in consultations if c.status == ConsultationStatus.COMPLETED)
-        active = sum(1 for c in consultations if c.status == ConsultationStatus.ACTIVE)
-        cancelled = sum(1 for c in consultations if c.status == ConsultationStatus.CANCELLED)
-
-        durations = []
-        for c in consultations:
-            if c.ended_at and c.started_at:
-                dur = (c.ended_at - c.started_at).total_seconds()
-                durations.append(dur)
-
-        avg_duration_min = (sum(durations) / len(durations) / 60) if durations else 0
-
-        by_day: dict[str, int] = Counter()
-        for c in consultations:
-            day_key = c.started_at.strftime("%Y-%m-%d")
-            by_day[day_key] += 1
+        stmt = (
+            select(
+                series.c.bucket,
+                func.coalesce(counts.c.total, 0),
+                func.coalesce(counts.c.completed, 0),
+                func.coalesce(counts.c.active, 0),
+                func.coalesce(counts.c.cancelled, 0),
+                func.coalesce(counts.c.duration_sum, 0),
+                func.coalesce(counts.c.duration_count, 0),
+            )
+            .select_from(series.outerjoin(counts, series.c.bucket == counts.c.bucket))
+            .order_by(series.c.bucket)
+        )
+        rows = (await session.execute(stmt)).all()
+
+        total = completed = active = cancelled = duration_count = 0
+        duration_sum = 0.0
+        by_bucket: dict[str, int] = {}
+        label_fmt = _BUCKET_FORMATS[granularity]
+        for b, n, done, act, canc, dur_sum, dur_count in rows:
+            total += n
+            completed += done
+            active += act
+            cancelled += canc
+            duration_sum += float(dur_sum)
+            duration_count += dur_count
+            by_bucket[b.strftime(label_fmt)] = n
+
+        avg_duration_min = (duration_sum / duration_count / 60) if duration_count else 0
 
         return {
             "period_days": days,
+            "granularity": granularity,
             "total": total,
             "completed": completed,
             "active": active,
             "cancelled": cancelled,
             "completion_rate": round(completed / total * 100, 1) if total else 0,
             "avg_duration_minutes": round(avg_duration_min, 1),
-            "by_day": dict(sorted(by_day.items())),
+            f"by_{granularity}": by_bucket,
+            "as_of": as_of,
         }
 
+    @cached("consultation_inputs", ttl=300)
     async def modality_usage(self, session: AsyncSession) -> dict:
-        stmt = (
-            select(
-                ConsultationInput.input_type,
-                func.count(ConsultationInput.id),
-            )
-            .group_by(ConsultationInput.input_type)
-        )
-        result = await session.execute(stmt)
-        rows = result.all()
+        r = InputDailyRollup
+        stmt = select(r.input_type, func.sum(r.input_count)).group_by(r.input_type)
+        rows = (await session.execute(stmt)).all()
 
-        usage = {r[0].value: r[1] for r in rows}
+        usage = {input_type.value: n for input_type, n in rows}
         total = sum(usage.values())
         return {
             "counts": usage,
@@ -94,70 +224,94 @@ class AnalyticsService:
                 k: round(v / total * 100, 1) if total else 0
                 for k, v in usage.items()
             },
+            "as_of": await self._freshness(session, "inputs"),
         }
 
+    @cached("patients", ttl=300)
     async def patient_demographics(self, session: AsyncSession) -> dict:
-        patients_result = await session.execute(select(Patient))
-        patients = list(patients_result.scalars().all())
-
-        gender_dist: dict[str, int] = Counter()
-        city_dist: dict[str, int] = Counter()
-        has_allergies = 0
-        has_chronic = 0
-
-        for p in patients:
-            g = p.gender.value if p.gender else "unspecified"
-            gender_dist[g] += 1
-            if p.city:
-                city_dist[p.city] += 1
-            if p.allergies:
-                has_allergies += 1
-            if p.chronic_conditions:
-                has_chronic += 1
+        totals_stmt = select(
+            func.count(),
+            func.count().filter(_jsonb_array_length(Patient.allergies) > 0),
+            func.count().filter(_jsonb_array_length(Patient.chronic_conditions) > 0),
+        ).select_from(Patient)
+        total, has_allergies, has_chronic = (await session.execute(totals_stmt)).one()
+
+        gender_stmt = select(Patient.gender, func.count()).group_by(Patient.gender)
+        gender_rows = (await session.execute(gender_stmt)).all()
+
+        city_count = func.count().label("n")
+        city_stmt = (
+            select(Patient.city, city_count)
+            .where(Patient.city.isnot(None), Patient.city != "")
+            .group_by(Patient.city)
+            .order_by(city_count.desc(), Patient.city)
+            .limit(10)
+        )
+        city_rows = (await session.execute(city_stmt)).all()
 
         return {
-            "total_patients": len(patients),
-            "gender_distribution": dict(gender_dist),
-            "top_cities": dict(city_dist.most_common(10)),
+            "total_patients": total,
+            "gender_distribution": {
+                (g.value if g else "unspecified"): n for g, n in gender_rows
+            },
+            "top_cities": {city: n for city, n in city_rows},
             "patients_with_allergies": has_allergies,
             "patients_with_chronic_conditions": has_chronic,
         }
 
+    @cached("analysis_results", ttl=120)
     async def ai_performance(self, session: AsyncSession, *, days: int = 30) -> dict:
-        cutoff = datetime.now(timezone.utc) - timedelta(days=days)
-        stmt = select(AnalysisResult).where(AnalysisResult.created_at >= cutoff)
-        result = await session.execute(stmt)
-        analyses = list(result.scalars().all())
-
-        total = len(analyses)
-        models_used: dict[str, int] = Counter()
-        total_input_tokens = 0
-        total_output_tokens = 0
-
-        for a in analyses:
-            r = a.result if isinstance(a.result, dict) else {}
-            model = r.get("model", "unknown")
-            models_used[model] += 1
-            total_input_tokens += r.get("input_tokens", 0)
-            total_output_tokens += r.get("output_tokens", 0)
-
-        modalities_used: dict[str, int] = Counter()
-        for a in analyses:
-            r = a.result if isinstance(a.result, dict) else {}
-            for m in r.get("context_modalities", []):
-                modalities_used[m] += 1
+        cutoff_day = (datetime.now(timezone.utc) - timedelta(days=days)).date()
+        r = AnalysisDailyRollup
+        in_window = r.day >= cutoff_day
+
+        stages = ("vision", "nlp", "audio", "reasoning", "total")
+        totals_stmt = select(
+            func.coalesce(func.sum(r.analysis_count), 0),
+            func.coalesce(func.sum(r.input_tokens), 0),
+            func.coalesce(func.sum(r.output_tokens), 0),
+            func.coalesce(func.sum(r.used_history), 0),
+            func.coalesce(func.sum(r.used_vision), 0),
+            func.coalesce(func.sum(r.used_text), 0),
+            func.coalesce(func.sum(r.used_audio), 0),
+            *(func.sum(getattr(r, f"{stage}_ms_sum")) for stage in stages),
+            *(func.sum(getattr(r, f"{stage}_ms_count")) for stage in stages),
+        ).where(in_window)
+        row = (await session.execute(totals_stmt)).one()
+        total, total_input_tokens, total_output_tokens = row[0], row[1], row[2]
+        modality_counts = row[3:7]
+        stage_sums, stage_counts = row[7:12], row[12:17]
+
+        models_stmt = (
+            select(r.model, func.sum(r.analysis_count)).where(in_window).group_by(r.model)
+        )
+        models_used = dict((await session.execute(models_stmt)).all())
+
+        modalities_used = {
+            name: n
+            for name, n in zip(("patient_history", "vision", "text", "audio"), modality_counts)
+            if n
+        }
+        avg_latency_ms = {
+            stage: round(ms_sum / n)
+            for stage, ms_sum, n in zip(stages, stage_sums, stage_counts)
+            if n
+        }
 
         return {
             "period_days": days,
             "total_analyses": total,
-            "models_used": dict(models_used),
+            "models_used": models_used,
             "total_input_tokens": total_input_tokens,
             "total_output_tokens": total_output_tokens,
             "avg_input_tokens": round(total_input_tokens / total) if total else 0,
             "avg_output_tokens": round(total_output_tokens / total) if total else 0,
-            "modalities_in_context": dict(modalities_used),
+            "modalities_in_context": modalities_used,
+            "avg_latency_ms": avg_latency_ms,
+            "as_of": await self._freshness(session, "analyses"),
         }
 
+    @cached("doctors", "consultations", "follow_ups", ttl=60)
     async def doctor_activity(
         self, session: AsyncSession, doctor_id: uuid.UUID
     ) -> dict:
@@ -165,19 +319,21 @@ class AnalyticsService:
         if not doctor:
             return {"error": "Doctor not found"}
 
-        cons_stmt = select(Consultation).where(Consultation.doctor_id == doctor_id)
-        result = await session.execute(cons_stmt)
-        consultations = list(result.scalars().all())
-
-        total = len(consultations)
-        completed = sum(1 for c in consultations if c.status == ConsultationStatus.COMPLETED)
-
-        fu_stmt = select(FollowUp).where(FollowUp.doctor_id == doctor_id)
-        fu_result = await session.execute(fu_stmt)
-        follow_ups = list(fu_result.scalars().all())
-
-        pending_fus = sum(1 for f in follow_ups if f.status == FollowUpStatus.PENDING)
-        overdue_fus = sum(1 for f in follow_ups if f.status == FollowUpStatus.OVERDUE)
+        r = ConsultationDailyRollup
+        cons_stmt = select(
+            func.coalesce(func.sum(r.consultation_count), 0),
+            func.coalesce(
+                func.sum(r.consultation_count).filter(r.status == ConsultationStatus.COMPLETED), 0
+            ),
+        ).where(r.doctor_id == doctor_id)
+        total, completed = (await session.execute(cons_stmt)).one()
+
+        fu_stmt = select(
+            func.count(),
+            func.count().filter(FollowUp.status == FollowUpStatus.PENDING),
+            func.count().filter(FollowUp.status == FollowUpStatus.OVERDUE),
+        ).where(FollowUp.doctor_id == doctor_id)
+        total_fus, pending_fus, overdue_fus = (await session.execute(fu_stmt)).one()
 
         return {
             "doctor_id": str(doctor_id),
@@ -185,66 +341,167 @@ class AnalyticsService:
             "specialization": doctor.specialization,
             "total_consultations": total,
             "completed_consultations": completed,
-            "total_follow_ups": len(follow_ups),
+            "total_follow_ups": total_fus,
             "pending_follow_ups": pending_fus,
             "overdue_follow_ups": overdue_fus,
+            "as_of": await self._freshness(session, "consultations"),
         }
 
-    async def risk_cohorts(self, session: AsyncSession) -> dict:
-        """Group patients by risk level based on chronic conditions count."""
-        patients_result = await session.execute(select(Patient))
-        patients = list(patients_result.scalars().all())
+    @cached("patients", ttl=300)
+    async def risk_cohorts(self, session: AsyncSession, *, limit: int = 20) -> dict:
+        """Group patients by risk level based on chronic conditions count.
+
+        Counts come from one aggregate over the stored ``risk_score`` column;
+        each cohort carries only its first page of members plus a cursor for
+        ``risk_cohort_members``.
+        """
+        counts_stmt = select(
+            *(func.count().filter(_cohort_clause(c)) for c in RISK_COHORTS)
+        ).select_from(Patient)
+        high, medium, low = (await session.execute(counts_stmt)).one()
+
+        cohorts: dict[str, list[dict]] = {}
+        next_cursors: dict[str, str | None] = {}
+        for cohort in RISK_COHORTS:
+            page = await self.risk_cohort_members(session, cohort, limit=limit)
+            cohorts[cohort] = page["patients"]
+            next_cursors[cohort] = page["next_cursor"]
 
-        cohorts: dict[str, list[dict]] = {"high": [], "medium": [], "low": []}
-
-        for p in patients:
-            conditions = p.chronic_conditions or []
-            allergies = p.allergies or []
-            score = len(conditions) * 2 + len(allergies)
+        return {
+            "high_risk_count": high,
+            "medium_risk_count": medium,
+            "low_risk_count": low,
+            "cohorts": cohorts,
+            "next_cursors": next_cursors,
+        }
 
-            entry = {
-                "patient_id": str(p.id),
-                "name": p.name,
-                "chronic_conditions": conditions,
-                "allergies": allergies,
-                "risk_score": score,
-            }
+    @cached("patients", ttl=300)
+    async def risk_cohort_members(
+        self,
+        session: AsyncSession,
+        cohort: str,
+        *,
+        limit: int = 50,
+        cursor: str | None = None,
+    ) -> dict:
+        """Keyset-paginated members of one cohort, highest score first."""
+        if cohort not in RISK_COHORTS:
+            raise ValueError(f"Unknown risk cohort: {cohort!r}")
 
-            if score >= 4:
-                cohorts["high"].append(entry)
-            elif score >= 2:
-                cohorts["medium"].append(entry)
-            else:
-                cohorts["low"].append(entry)
+        stmt = (
+            select(
+                Patient.id,
+                Patient.name,
+                Patient.chronic_conditions,
+                Patient.allergies,
+                Patient.risk_score,
+            )
+            .where(_cohort_clause(cohort))
+            .order_by(Patient.risk_score.desc(), Patient.id.desc())
+            .limit(limit + 1)
+        )
+        if cursor:
+            score, patient_id = decode_cursor(cursor, int, uuid.UUID)
+            stmt = stmt.where(tuple_(Patient.risk_score, Patient.id) < tuple_(score, patient_id))
 
-        for key in cohorts:
-            cohorts[key].sort(key=lambda x: x["risk_score"], reverse=True)
+        rows = (await session.execute(stmt)).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
 
         return {
-            "high_risk_count": len(cohorts["high"]),
-            "medium_risk_count": len(cohorts["medium"]),
-            "low_risk_count": len(cohorts["low"]),
-            "cohorts": cohorts,
+            "cohort": cohort,
+            "patients": [
+                {
+                    "patient_id": str(r.id),
+                    "name": r.name,
+                    "chronic_conditions": r.chronic_conditions or [],
+                    "allergies": r.allergies or [],
+                    "risk_score": r.risk_score,
+                }
+                for r in rows
+            ],
+            "next_cursor": encode_cursor(rows[-1].risk_score, rows[-1].id) if has_more else None,
         }
 
+    @cached("follow_ups", ttl=60)
     async def follow_up_stats(self, session: AsyncSession) -> dict:
-        result = await session.execute(select(FollowUp))
-        follow_ups = list(result.scalars().all())
+        r = FollowUpDailyRollup
+        stmt = (
+            select(r.status, r.follow_up_type, r.ai_generated, func.sum(r.follow_up_count))
+            .group_by(r.status, r.follow_up_type, r.ai_generated)
+        )
+        rows = (await session.execute(stmt)).all()
 
         by_status: dict[str, int] = Counter()
         by_type: dict[str, int] = Counter()
-        ai_generated = 0
-
-        for fu in follow_ups:
-            by_status[fu.status.value] += 1
-            by_type[fu.follow_up_type.value] += 1
-            if fu.ai_generated:
-                ai_generated += 1
+        total = ai_generated = 0
+        for status, fu_type, is_ai, n in rows:
+            by_status[status.value] += n
+            by_type[fu_type.value] += n
+            total += n
+            if is_ai:
+                ai_generated += n
 
         return {
-            "total": len(follow_ups),
+            "total": total,
             "by_status": dict(by_status),
             "by_type": dict(by_type),
             "ai_generated": ai_generated,
-            "manual": len(follow_ups) - ai_generated,
+            "manual": total - ai_generated,
+            "as_of": await self._freshness(session, "follow_ups"),
+        }
+
+    async def dashboard(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        *,
+        panels: tuple[str, ...] = DASHBOARD_PANELS,
+        days: int = 30,
+        doctor_id: uuid.UUID | None = None,
+    ) -> dict:
+        """Compute several dashboard panels concurrently.
+
+        Each panel gets its own session (and therefore its own pooled
+        connection) so the queries overlap; total latency tracks the slowest
+        panel. A failing panel is reported under ``errors`` without taking
+        the others down.
+        """
+        loaders: dict[str, Callable[[AsyncSession], object]] = {
+            "consultations": lambda s: self.consultation_stats(s, days=days, doctor_id=doctor_id),
+            "modalities": self.modality_usage,
+            "demographics": self.patient_demographics,
+            "ai_performance": lambda s: self.ai_performance(s, days=days),
+            "follow_ups": self.follow_up_stats,
+            "risk_cohorts": self.risk_cohorts,
         }
+        unknown = [p for p in panels if p not in loaders]
+        if unknown:
+            raise ValueError(f"Unknown dashboard panels: {', '.join(unknown)}")
+
+        async def _run(panel: str) -> tuple[str, dict | None, str | None, float]:
+            started = time.perf_counter()
+            try:
+                async with session_factory() as session:
+                    data = await loaders[panel](session)
+                error = None
+            except Exception as exc:
+                logger.exception("Dashboard panel %s failed", panel)
+                data, error = None, type(exc).__name__
+            return panel, data, error, (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(_run(p) for p in dict.fromkeys(panels)))
+
+        return {
+            "panels": {panel: data for panel, data, error, _ in results if error is None},
+            "errors": {panel: error for panel, _, error, _ in results if error is not None},
+            "timings_ms": {panel: round(ms, 1) for panel, _, _, ms in results},
+            "total_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+
+    @staticmethod
+    async def _freshness(session: AsyncSession, rollup: str) -> str | None:
+        """Watermark of *rollup*: rows changed after it are not yet reflected."""
+        stmt = select(RollupWatermark.watermark).where(RollupWatermark.name == rollup)
+        watermark = (await session.execute(stmt)).scalar()
+        return watermark.isoformat() if watermark else None
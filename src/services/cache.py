@@ -0,0 +1,159 @@
+"""Response cache for read-mostly analytics.
+
+Entries are keyed on method name and call parameters and expire after a
+per-method TTL. Each key also embeds the current *generation* of every table
+the result was computed from. Repository writes (and rollup refreshes) bump
+those generations, so an invalidated entry is simply never looked up again
+and ages out of the LRU.
+
+The default backend is an in-process LRU bounded by
+``analytics_cache_max_entries``. Pointing ``analytics_cache_url`` at a
+``redis://`` URL shares entries and generations across workers; that needs
+the optional ``redis`` package.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable
+
+from src.config import settings
+from src.db import repositories as repo
+from src.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+_REDIS_PREFIX = "hippocrates:analytics:"
+
+
+class _MemoryBackend:
+    def __init__(self, max_entries: int) -> None:
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._generations: dict[str, int] = {}
+
+    async def generations(self, tags: Iterable[str]) -> list[int]:
+        return [self._generations.get(t, 0) for t in tags]
+
+    async def bump(self, tags: Iterable[str]) -> None:
+        for t in tags:
+            self._generations[t] = self._generations.get(t, 0) + 1
+
+    async def get(self, key: str) -> dict | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: dict, ttl: int) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class _RedisBackend:
+    def __init__(self, url: str) -> None:
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url)
+
+    async def generations(self, tags: Iterable[str]) -> list[int]:
+        values = await self._redis.mget([f"{_REDIS_PREFIX}gen:{t}" for t in tags])
+        return [int(v) if v else 0 for v in values]
+
+    async def bump(self, tags: Iterable[str]) -> None:
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for t in tags:
+                pipe.incr(f"{_REDIS_PREFIX}gen:{t}")
+            await pipe.execute()
+
+    async def get(self, key: str) -> dict | None:
+        raw = await self._redis.get(_REDIS_PREFIX + key)
+        return json.loads(raw) if raw else None
+
+    async def set(self, key: str, value: dict, ttl: int) -> None:
+        await self._redis.set(_REDIS_PREFIX + key, json.dumps(value, default=str), ex=ttl)
+
+
+class ResponseCache:
+    def __init__(self) -> None:
+        if settings.analytics_cache_url:
+            self._backend = _RedisBackend(settings.analytics_cache_url)
+        else:
+            self._backend = _MemoryBackend(settings.analytics_cache_max_entries)
+
+    async def get_or_compute(
+        self,
+        key: str,
+        tags: tuple[str, ...],
+        ttl: int,
+        compute: Callable[[], Awaitable[dict]],
+    ) -> dict:
+        generations = await self._backend.generations(tags)
+        full_key = f"{key}|{','.join(map(str, generations))}"
+
+        value = await self._backend.get(full_key)
+        if value is not None:
+            metrics.incr("analytics_cache.hits")
+            return value
+
+        metrics.incr("analytics_cache.misses")
+        value = await compute()
+        await self._backend.set(full_key, value, ttl)
+        return value
+
+    async def invalidate(self, tags: Iterable[str]) -> None:
+        tags = tuple(tags)
+        if tags:
+            await self._backend.bump(tags)
+            metrics.incr("analytics_cache.invalidations")
+
+    def hit_ratio(self) -> float | None:
+        hits = metrics.counter("analytics_cache.hits")
+        total = hits + metrics.counter("analytics_cache.misses")
+        return round(hits / total, 3) if total else None
+
+
+analytics_cache = ResponseCache()
+metrics.gauge("analytics_cache.hit_ratio", analytics_cache.hit_ratio)
+
+
+@repo.on_write
+async def _invalidate_on_write(tables: tuple[str, ...]) -> None:
+    await analytics_cache.invalidate(tables)
+
+
+def cached(*tags: str, ttl: int):
+    """Cache an ``AnalyticsService`` method's result.
+
+    *tags* are the tables the result is derived from; *ttl* bounds staleness
+    for changes that bypass the repository write hooks.
+    """
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(self, session, *args, **kwargs):
+            params = json.dumps([args, sorted(kwargs.items())], default=str)
+            return await analytics_cache.get_or_compute(
+                f"{fn.__name__}:{params}",
+                tags,
+                ttl,
+                lambda: fn(self, session, *args, **kwargs),
+            )
+
+        return wrapper
+
+    return decorator
@@ -16,11 +16,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from src.db import repositories as repo
 from src.db.models import ConsultationStatus, ConsultationType, InputType
 from src.services.fusion import FusionOrchestrator
+from src.services.precompute import FeaturePrecomputer
 
 
 class ConsultationService:
-    def __init__(self, fusion: FusionOrchestrator):
+    def __init__(self, fusion: FusionOrchestrator, precomputer: FeaturePrecomputer | None = None):
         self._fusion = fusion
+        self._precomputer = precomputer
 
     # Maps consultation type -> modalities likely needed.
     _HINT_MAP: dict[ConsultationType, list[str]] = {
@@ -69,10 +71,14 @@ class ConsultationService:
             file_path=file_path,
             raw_text=raw_text,
         )
+        features_status = None
+        if file_path and self._precomputer is not None:
+            features_status = self._precomputer.submit(inp.id, input_type, file_path)
         return {
             "input_id": str(inp.id),
             "type": inp.input_type.value,
             "created_at": inp.created_at.isoformat(),
+            "features_status": features_status,
         }
 
     async def run_analysis(
@@ -94,6 +100,11 @@ class ConsultationService:
                 session, patient_id
             )
 
+        # Let a background encode of this input finish; the analysis below
+        # then reads its features from the store instead of encoding again.
+        if input_id and self._precomputer is not None:
+            await self._precomputer.wait(input_id)
+
         result = await asyncio.to_thread(
             self._fusion.analyze,
             prompt,
@@ -103,14 +114,17 @@ class ConsultationService:
             patient_history=patient_history,
         )
 
-        analysis = await repo.save_analysis(
-            session,
-            consultation_id=consultation_id,
-            prompt=prompt,
-            result=result,
-            input_id=input_id,
-            embedding=result.get("embedding"),
-        )
+        async with repo.unit_of_work(session):
+            analysis = await repo.save_analysis(
+                session,
+                consultation_id=consultation_id,
+                prompt=prompt,
+                result=result,
+                input_id=input_id,
+                embedding=result.get("embedding"),
+            )
+            if input_id and result.get("image_embedding"):
+                await repo.save_image_embedding(session, input_id, result["image_embedding"])
 
         return {
             "analysis_id": str(analysis.id),
@@ -119,6 +133,58 @@ class ConsultationService:
             "modalities_used": result.get("context_modalities", []),
         }
 
+    async def similar_studies(
+        self,
+        session: AsyncSession,
+        input_id: uuid.UUID,
+        *,
+        same_patient: bool = False,
+        limit: int = 10,
+    ) -> list[dict]:
+        """Prior image inputs most similar to image input *input_id*.
+
+        Uses the embedding stored when the image was analyzed; otherwise the
+        features come from the feature store (encoding the image only if it
+        was never seen) and the embedding is stored for next time. With
+        *same_patient*, only that patient's images from consultations that
+        started before this one are compared.
+        """
+        inp = await repo.get_input(session, input_id)
+        if inp is None or inp.input_type != InputType.IMAGE:
+            raise ValueError(f"Image input {input_id} not found")
+
+        embedding = await repo.get_image_embedding(session, input_id)
+        if embedding is None:
+            if not inp.file_path or not Path(inp.file_path).exists():
+                raise ValueError(f"Image for input {input_id} is missing")
+            features = await asyncio.to_thread(self._fusion.vision_features, inp.file_path)
+            embedding = features["embedding"]
+            await repo.save_image_embedding(session, input_id, embedding)
+
+        patient_id = started_before = None
+        if same_patient:
+            header = await repo.get_consultation_header(session, inp.consultation_id)
+            patient_id, started_before = header.patient_id, header.started_at
+        rows = await repo.similar_images(
+            session,
+            embedding,
+            exclude_input_id=input_id,
+            patient_id=patient_id,
+            started_before=started_before,
+            limit=limit,
+        )
+        return [
+            {
+                "input_id": str(row.ConsultationInput.id),
+                "consultation_id": str(row.ConsultationInput.consultation_id),
+                "patient_id": str(row.patient_id),
+                "consultation_started_at": row.started_at,
+                "created_at": row.ConsultationInput.created_at,
+                "similarity": round(1 - row.distance, 4),
+            }
+            for row in rows
+        ]
+
     async def end(
         self,
         session: AsyncSession,
@@ -126,28 +192,35 @@ class ConsultationService:
         *,
         generate_summary: bool = True,
     ) -> dict:
-        consultation = await repo.get_consultation(session, consultation_id)
+        consultation = await repo.get_consultation(session, consultation_id, with_inputs=False)
         if consultation is None:
             raise ValueError(f"Consultation {consultation_id} not found")
 
+        # End the read transaction rather than hold it idle across the model
+        # calls (expire_on_commit is off, so the loaded rows stay usable).
+        await session.commit()
+
         summary = None
         if generate_summary and consultation.analysis_results:
             summary = await self._generate_summary(consultation)
 
+        # The status change does not wait on the follow-up planning.
         updated = await repo.end_consultation(session, consultation_id, summary=summary)
 
-        # Generate AI follow-up recommendations in background
+        follow_ups: list[dict] = []
         if consultation.analysis_results or summary:
             try:
                 from src.services.follow_up import FollowUpService
                 follow_up_svc = FollowUpService(fusion=self._fusion)
-                await follow_up_svc.generate_follow_ups(session, consultation_id)
+                follow_ups = await follow_up_svc.plan_follow_ups(consultation, summary)
             except Exception:
                 import logging
                 logging.getLogger(__name__).exception(
                     "Follow-up generation failed for consultation %s", consultation_id
                 )
 
+        await repo.create_follow_ups(session, follow_ups)
+
         return {
             "consultation_id": str(updated.id),
             "status": updated.status.value,
@@ -0,0 +1,157 @@
+"""Content-addressed store for per-file model features.
+
+Entries are keyed on the SHA-256 of a file's bytes plus the model name and
+revision that produced them, so the same X-ray or recording uploaded twice,
+or analyzed again with a different prompt, never goes back through the
+encoder. Vision entries hold the pooled embedding and sequence metadata;
+audio entries hold the Whisper transcript and its timestamped chunks.
+Preprocessed pixel tensors (``pixels``) are stored as ``.npy`` arrays and
+read back memory-mapped.
+
+Entries are JSON or ``.npy`` files under ``feature_store_dir``::
+
+    <modality>/<model>@<revision>/<sha256[:2]>/<sha256>.json
+
+Each read refreshes the file's mtime; ``evict()`` removes the least recently
+used entries once the store exceeds ``feature_store_max_mb``, and
+``invalidate_stale()`` drops whole model directories that no longer match
+the configured model and revision.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from src.config import settings
+from src.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+_CHUNK_SIZE = 1024 * 1024
+_SUFFIXES = (".json", ".npy")
+
+
+def file_digest(path: str | Path) -> str:
+    """SHA-256 of the file at *path*, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _model_dir_name(model: str, revision: str) -> str:
+    return f"{model.replace('/', '--')}@{revision}"
+
+
+class FeatureStore:
+    def __init__(self, root: Path, max_bytes: int) -> None:
+        self._root = root
+        self._max_bytes = max_bytes
+
+    def _path(self, modality: str, model: str, revision: str, digest: str, suffix: str = ".json") -> Path:
+        return self._root / modality / _model_dir_name(model, revision) / digest[:2] / f"{digest}{suffix}"
+
+    def get(self, modality: str, model: str, revision: str, digest: str) -> dict | None:
+        path = self._path(modality, model, revision, digest)
+        try:
+            features = json.loads(path.read_text())
+            os.utime(path)
+        except FileNotFoundError:
+            metrics.incr(f"feature_store.{modality}.misses")
+            return None
+        except (OSError, ValueError):
+            logger.warning("Unreadable feature store entry %s; recomputing", path)
+            metrics.incr(f"feature_store.{modality}.misses")
+            return None
+        metrics.incr(f"feature_store.{modality}.hits")
+        return features
+
+    def put(self, modality: str, model: str, revision: str, digest: str, features: dict) -> None:
+        path = self._path(modality, model, revision, digest)
+        self._write(path, "w", lambda f: json.dump(features, f))
+
+    def get_array(self, modality: str, model: str, revision: str, digest: str) -> np.ndarray | None:
+        """Stored array for *digest*, memory-mapped read-only, or None."""
+        path = self._path(modality, model, revision, digest, ".npy")
+        try:
+            array = np.load(path, mmap_mode="r")
+            os.utime(path)
+        except FileNotFoundError:
+            metrics.incr(f"feature_store.{modality}.misses")
+            return None
+        except (OSError, ValueError):
+            logger.warning("Unreadable feature store entry %s; recomputing", path)
+            metrics.incr(f"feature_store.{modality}.misses")
+            return None
+        metrics.incr(f"feature_store.{modality}.hits")
+        return array
+
+    def put_array(self, modality: str, model: str, revision: str, digest: str, array: np.ndarray) -> None:
+        path = self._path(modality, model, revision, digest, ".npy")
+        self._write(path, "wb", lambda f: np.save(f, array))
+
+    def _write(self, path: Path, mode: str, dump) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write-then-rename so concurrent readers never see a partial entry.
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, mode) as f:
+                dump(f)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def evict(self) -> int:
+        """Delete least recently used entries until the store fits its budget."""
+        if not self._root.exists():
+            return 0
+        entries = []
+        total = 0
+        for path in self._root.rglob("*"):
+            if path.suffix not in _SUFFIXES:
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self._max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        if removed:
+            metrics.incr("feature_store.evicted", removed)
+        return removed
+
+    def invalidate_stale(self, current: dict[str, tuple[str, str]]) -> int:
+        """Drop entries from models other than ``current[modality] = (model, revision)``."""
+        removed = 0
+        for modality, (model, revision) in current.items():
+            modality_dir = self._root / modality
+            if not modality_dir.is_dir():
+                continue
+            keep = _model_dir_name(model, revision)
+            for model_dir in modality_dir.iterdir():
+                if model_dir.is_dir() and model_dir.name != keep:
+                    logger.info("Invalidating %s features from %s", modality, model_dir.name)
+                    shutil.rmtree(model_dir, ignore_errors=True)
+                    removed += 1
+        return removed
+
+
+feature_store = FeatureStore(settings.feature_store_dir, settings.feature_store_max_mb * 1024 * 1024)
@@ -13,6 +13,7 @@ from datetime import datetime, timedelta, timezone
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.config import settings
 from src.db import repositories as repo
 from src.db.models import FollowUpStatus, FollowUpType
 from src.services.fusion import FusionOrchestrator
@@ -37,10 +38,30 @@ class FollowUpService:
         consultation_id: uuid.UUID,
     ) -> list[dict]:
         """Analyze a completed consultation and generate follow-up recommendations."""
-        consultation = await repo.get_consultation(session, consultation_id)
+        consultation = await repo.get_consultation(session, consultation_id, with_inputs=False)
         if consultation is None:
             return []
 
+        records = await repo.create_follow_ups(session, await self.plan_follow_ups(consultation))
+        return [
+            {
+                "id": str(record.id),
+                "type": record.follow_up_type.value,
+                "description": record.description,
+                "due_date": record.due_date.isoformat(),
+                "ai_reasoning": record.ai_reasoning,
+            }
+            for record in records
+        ]
+
+    async def plan_follow_ups(self, consultation, summary: str | None = None) -> list[dict]:
+        """Ask the reasoning model for follow-ups on *consultation*.
+
+        Returns unsaved rows for ``repo.create_follow_ups``, so callers can
+        write them in the same transaction as other changes. *summary*
+        overrides the stored one (e.g. when it is being written alongside).
+        """
+        summary = summary or consultation.summary
         analysis_texts = []
         for ar in consultation.analysis_results:
             resp = ar.result.get("response", "") if isinstance(ar.result, dict) else ""
@@ -48,12 +69,12 @@ class FollowUpService:
                 analysis_texts.append(resp[:600])
 
         combined = "\n---\n".join(analysis_texts)
-        if not combined and not consultation.summary:
+        if not combined and not summary:
             return []
 
-        context = consultation.summary or ""
+        context = summary or ""
         if combined:
-            context = f"Consultation Summary:\n{consultation.summary or 'N/A'}\n\nAnalysis Results:\n{combined}"
+            context = f"Consultation Summary:\n{summary or 'N/A'}\n\nAnalysis Results:\n{combined}"
 
         prompt = (
             "Based on the following consultation results, generate specific follow-up "
@@ -74,7 +95,7 @@ class FollowUpService:
         )
 
         follow_ups = self._parse_follow_ups(result.get("response", ""))
-        created = []
+        rows = []
         now = datetime.now(timezone.utc)
 
         for fu in follow_ups:
@@ -83,26 +104,19 @@ class FollowUpService:
             if not isinstance(days, int) or days < 1:
                 days = 7
 
-            record = await repo.create_follow_up(
-                session,
-                consultation_id=consultation_id,
-                patient_id=consultation.patient_id,
-                doctor_id=consultation.doctor_id,
-                follow_up_type=fu_type,
-                description=fu.get("description", "Follow-up required"),
-                due_date=now + timedelta(days=days),
-                ai_generated=True,
-                ai_reasoning=fu.get("reasoning", ""),
-            )
-            created.append({
-                "id": str(record.id),
-                "type": record.follow_up_type.value,
-                "description": record.description,
-                "due_date": record.due_date.isoformat(),
-                "ai_reasoning": record.ai_reasoning,
+            rows.append({
+                "consultation_id": consultation.id,
+                "patient_id": consultation.patient_id,
+                "doctor_id": consultation.doctor_id,
+                "follow_up_type": fu_type,
+                "description": fu.get("description", "Follow-up required"),
+                "due_date": now + timedelta(days=days),
+                "status": FollowUpStatus.PENDING,
+                "ai_generated": True,
+                "ai_reasoning": fu.get("reasoning", ""),
             })
 
-        return created
+        return rows
 
     def _parse_follow_ups(self, text: str) -> list[dict]:
         """Extract JSON array from the LLM response, tolerating markdown fences."""
@@ -160,7 +174,9 @@ class FollowUpService:
         return self._to_dict(fu)
 
     async def check_overdue(self, session: AsyncSession) -> int:
-        return await repo.mark_overdue_follow_ups(session)
+        return await repo.mark_overdue_follow_ups(
+            session, batch_size=settings.overdue_sweep_batch_size
+        )
 
     @staticmethod
     def _to_dict(fu) -> dict:
@@ -7,14 +7,21 @@ the reasoning LLM to produce a unified medical response.
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import threading
 import time
+from collections import OrderedDict
 from pathlib import Path
 from typing import TYPE_CHECKING
 
+from src.config import settings
+from src.services.feature_store import feature_store, file_digest
+from src.utils.metrics import metrics
+
 if TYPE_CHECKING:
     from PIL import Image
+    from src.services.vision_pipeline import VisionPipeline
     from src.models.audio import AudioTranscriber
     from src.models.nlp import ClinicalNLP
     from src.models.reasoning import BaseReasoningEngine
@@ -48,6 +55,11 @@ class FusionOrchestrator:
     * Tracks last-used timestamps per modality.
     * ``hint()`` pre-loads expected models in a background thread.
     * ``cleanup_idle()`` unloads models that exceed their TTL.
+    * ``embed_query()`` embeds search queries off the event loop, with an LRU.
+    * ``vision_features()`` / ``audio_features()`` go through the feature
+      store, so a file already seen is never re-encoded.
+    * Image files are preprocessed in worker processes and encoded through
+      the ``vision_pipeline`` (see ``src/services/vision_pipeline.py``).
     """
 
     def __init__(self) -> None:
@@ -55,10 +67,15 @@ class FusionOrchestrator:
         self._nlp: ClinicalNLP | None = None
         self._audio: AudioTranscriber | None = None
         self._reasoning: BaseReasoningEngine | None = None
+        self._vision_pipeline: VisionPipeline | None = None
 
         self._last_used: dict[str, float] = {}
         self._lock = threading.Lock()
 
+        # Event-loop-only state for embed_query().
+        self._query_embeddings: OrderedDict[str, list[float]] = OrderedDict()
+        self._pending_embeddings: dict[str, asyncio.Future[list[float]]] = {}
+
     # ------------------------------------------------------------------
     # Property accessors (lazy-load + timestamp tracking)
     # ------------------------------------------------------------------
@@ -98,6 +115,19 @@ class FusionOrchestrator:
         self._touch("reasoning")
         return self._reasoning
 
+    @property
+    def vision_pipeline(self) -> VisionPipeline:
+        with self._lock:
+            if self._vision_pipeline is None:
+                from src.services.vision_pipeline import VisionPipeline
+                self._vision_pipeline = VisionPipeline(
+                    lambda: self.vision,
+                    feature_store,
+                    workers=settings.preprocess_workers,
+                    depth=settings.vision_queue_depth,
+                )
+        return self._vision_pipeline
+
     # ------------------------------------------------------------------
     # Model lifecycle helpers
     # ------------------------------------------------------------------
@@ -156,6 +186,11 @@ class FusionOrchestrator:
                 )
                 self.unload_modality(mod)
 
+    def shutdown(self) -> None:
+        """Stop the vision pipeline's worker processes, if they were started."""
+        if self._vision_pipeline is not None:
+            self._vision_pipeline.shutdown()
+
     def model_status(self) -> list[dict]:
         """Return per-model status dicts (for /health/models)."""
         now = time.monotonic()
@@ -180,6 +215,74 @@ class FusionOrchestrator:
             "reasoning": self._reasoning,
         }.get(modality)
 
+    # ------------------------------------------------------------------
+    # Query embeddings
+    # ------------------------------------------------------------------
+
+    async def embed_query(self, text: str) -> list[float]:
+        """Text embedding for a search query, computed in a worker thread.
+
+        The forward pass (and, on first use, the model load) never runs on
+        the event loop. Embeddings are cached per whitespace-normalised query
+        in an LRU of ``query_embedding_cache_size`` entries, and concurrent
+        requests for the same query share one computation. Raises
+        ``TimeoutError`` after ``query_embedding_timeout_seconds``; the
+        computation still completes and populates the cache.
+        """
+        key = " ".join(text.split())
+        cached = self._query_embeddings.get(key)
+        if cached is not None:
+            self._query_embeddings.move_to_end(key)
+            metrics.incr("search.query_embedding.cache_hits")
+            return cached
+
+        metrics.incr("search.query_embedding.cache_misses")
+        pending = self._pending_embeddings.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(asyncio.to_thread(self._embed_query_sync, key))
+            self._pending_embeddings[key] = pending
+            pending.add_done_callback(lambda future: self._store_query_embedding(key, future))
+        return await asyncio.wait_for(asyncio.shield(pending), settings.query_embedding_timeout_seconds)
+
+    def _embed_query_sync(self, text: str) -> list[float]:
+        started = time.perf_counter()
+        embedding = self.nlp.get_embedding(text)
+        metrics.observe("search.query_embedding_ms", (time.perf_counter() - started) * 1000)
+        return embedding
+
+    def _store_query_embedding(self, key: str, future: asyncio.Future[list[float]]) -> None:
+        self._pending_embeddings.pop(key, None)
+        if future.cancelled() or future.exception() is not None:
+            return
+        self._query_embeddings[key] = future.result()
+        while len(self._query_embeddings) > settings.query_embedding_cache_size:
+            self._query_embeddings.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # File features (content-addressed, see src/services/feature_store.py)
+    # ------------------------------------------------------------------
+
+    def vision_features(self, image_path: str | Path) -> dict:
+        """Vision section for the image at *image_path*, encoded at most once."""
+        digest = file_digest(image_path)
+        model, revision = settings.vision_model, settings.vision_model_revision
+        features = feature_store.get("vision", model, revision, digest)
+        if features is None:
+            features = self.vision_pipeline.submit(image_path, digest).result()
+            feature_store.put("vision", model, revision, digest, features)
+        return features
+
+    def audio_features(self, audio_path: str | Path) -> dict:
+        """Audio section (transcript and chunks) for *audio_path*, transcribed at most once."""
+        digest = file_digest(audio_path)
+        # Transcripts depend on the VAD gating too, so it is part of the key.
+        model, revision = settings.audio_model, settings.audio_feature_revision
+        features = feature_store.get("audio", model, revision, digest)
+        if features is None:
+            features = self.audio.analyze(audio_path)
+            feature_store.put("audio", model, revision, digest, features)
+        return features
+
     # ------------------------------------------------------------------
     # Core analysis pipeline
     # ------------------------------------------------------------------
@@ -205,6 +308,15 @@ class FusionOrchestrator:
         """
         context_sections: list[dict] = []
         used_nlp = False
+        timings: dict[str, float] = {}
+        started = time.perf_counter()
+
+        def _timed(stage: str, fn):
+            t0 = time.perf_counter()
+            try:
+                return fn()
+            finally:
+                timings[stage] = timings.get(stage, 0.0) + (time.perf_counter() - t0) * 1000
 
         # -- Patient history (injected first so the LLM sees it as context) --
         if patient_history and patient_history.get("patient_name"):
@@ -214,24 +326,27 @@ class FusionOrchestrator:
             })
 
         # -- Vision --
+        vision_section = None
         if image is not None:
-            context_sections.append(self.vision.analyze(image))
+            vision_section = _timed("vision", lambda: self.vision.analyze(image))
         elif image_path is not None:
-            from PIL import Image
-            img = Image.open(image_path).convert("RGB")
-            context_sections.append(self.vision.analyze(img))
+            vision_section = _timed("vision", lambda: self.vision_features(image_path))
+        if vision_section is not None:
+            context_sections.append(vision_section)
 
         # -- Clinical text --
         if clinical_text:
-            context_sections.append(self.nlp.analyze(clinical_text))
+            context_sections.append(_timed("nlp", lambda: self.nlp.analyze(clinical_text)))
             used_nlp = True
 
         # -- Audio --
         if audio_path is not None:
-            audio_result = self.audio.analyze(audio_path)
+            audio_result = _timed("audio", lambda: self.audio_features(audio_path))
             context_sections.append(audio_result)
             if audio_result.get("transcript"):
-                transcript_analysis = self.nlp.analyze(audio_result["transcript"])
+                transcript_analysis = _timed(
+                    "nlp", lambda: self.nlp.analyze(audio_result["transcript"])
+                )
                 transcript_analysis["modality"] = "text"
                 transcript_analysis["input_preview"] = (
                     f"[Transcribed from audio] {transcript_analysis['input_preview']}"
@@ -240,11 +355,14 @@ class FusionOrchestrator:
                 used_nlp = True
 
         # -- Reasoning --
-        result = self.reasoning.generate(
-            prompt,
-            context_sections,
-            max_new_tokens=max_new_tokens,
-            temperature=temperature,
+        result = _timed(
+            "reasoning",
+            lambda: self.reasoning.generate(
+                prompt,
+                context_sections,
+                max_new_tokens=max_new_tokens,
+                temperature=temperature,
+            ),
         )
 
         # Generate NLP embedding only when meaningful text context exists.
@@ -254,9 +372,14 @@ class FusionOrchestrator:
             combined_text = prompt
             if clinical_text:
                 combined_text = f"{clinical_text} {prompt}"
-            result["embedding"] = self.nlp.get_embedding(combined_text)
+            result["embedding"] = _timed("nlp", lambda: self.nlp.get_embedding(combined_text))
         else:
             result["embedding"] = None
 
+        # Kept so callers can store it for image similarity search.
+        result["image_embedding"] = vision_section["embedding"] if vision_section else None
+
+        timings["total"] = (time.perf_counter() - started) * 1000
+        result["timings_ms"] = {stage: round(ms) for stage, ms in timings.items()}
         result["context_modalities"] = [s["modality"] for s in context_sections]
         return result
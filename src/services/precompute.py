@@ -0,0 +1,108 @@
+"""Background feature precomputation for uploaded files.
+
+An uploaded image or recording is encoded as soon as it lands instead of
+when the doctor first asks about it: ``submit()`` queues CXformer features
+(images) or a Whisper transcript (audio) on a small dedicated thread pool.
+The results go into the feature store, so the later analysis reads them
+instead of re-running the model, and an image's embedding is stored on its
+input for similarity search.
+
+The queue is bounded: beyond ``precompute_max_pending`` outstanding jobs an
+upload is marked ``skipped`` and simply encoded at analysis time as before.
+Job status is kept per process and reported on the input as
+``features_status``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.db import repositories as repo
+from src.db.models import InputType
+from src.services.fusion import FusionOrchestrator
+from src.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Statuses remembered for reporting; older inputs fall out first.
+_MAX_TRACKED = 10_000
+
+
+class FeaturePrecomputer:
+    def __init__(
+        self,
+        fusion: FusionOrchestrator,
+        session_factory: async_sessionmaker[AsyncSession],
+        *,
+        workers: int,
+        max_pending: int,
+    ) -> None:
+        self._fusion = fusion
+        self._session_factory = session_factory
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="precompute")
+        self._max_pending = max_pending
+        # Event-loop-only state.
+        self._jobs: dict[uuid.UUID, asyncio.Task] = {}
+        self._status: OrderedDict[uuid.UUID, str] = OrderedDict()
+
+    def _set_status(self, input_id: uuid.UUID, status: str) -> None:
+        self._status[input_id] = status
+        self._status.move_to_end(input_id)
+        while len(self._status) > _MAX_TRACKED:
+            self._status.popitem(last=False)
+
+    def status(self, input_id: uuid.UUID) -> str | None:
+        """``pending``, ``ready``, ``failed``, ``skipped``, or None if never submitted here."""
+        return self._status.get(input_id)
+
+    def submit(self, input_id: uuid.UUID, input_type: InputType, file_path: str) -> str | None:
+        """Queue encoding of an uploaded file and return its status."""
+        if input_type not in (InputType.IMAGE, InputType.AUDIO):
+            return None
+        if len(self._jobs) >= self._max_pending:
+            metrics.incr("precompute.skipped")
+            self._set_status(input_id, "skipped")
+            return "skipped"
+        self._set_status(input_id, "pending")
+        self._jobs[input_id] = asyncio.create_task(self._run(input_id, input_type, file_path))
+        return "pending"
+
+    async def wait(self, input_id: uuid.UUID) -> None:
+        """Wait for a queued job on *input_id*, if any, so its result is reused."""
+        task = self._jobs.get(input_id)
+        if task is not None:
+            started = time.perf_counter()
+            await asyncio.shield(task)
+            metrics.observe("precompute.analysis_wait_ms", (time.perf_counter() - started) * 1000)
+
+    async def _run(self, input_id: uuid.UUID, input_type: InputType, file_path: str) -> None:
+        encode = (
+            self._fusion.vision_features if input_type == InputType.IMAGE else self._fusion.audio_features
+        )
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            features = await loop.run_in_executor(self._executor, encode, file_path)
+            if input_type == InputType.IMAGE:
+                async with self._session_factory() as session:
+                    await repo.save_image_embedding(session, input_id, features["embedding"])
+            self._set_status(input_id, "ready")
+            metrics.observe(f"precompute.{input_type.value}_ms", (time.perf_counter() - started) * 1000)
+        except Exception:
+            logger.exception("Feature precompute failed for input %s", input_id)
+            self._set_status(input_id, "failed")
+            metrics.incr("precompute.failed")
+        finally:
+            self._jobs.pop(input_id, None)
+
+    def shutdown(self) -> None:
+        for task in self._jobs.values():
+            task.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
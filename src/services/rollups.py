@@ -0,0 +1,262 @@
+"""Incremental maintenance of the analytics rollup tables.
+
+Each rollup has a watermark in ``rollup_watermarks``. A refresh collects the
+distinct days touched since then -- the bucket days of source rows created
+or updated after the watermark, plus days left by deleted or re-dated rows
+(queued in ``rollup_dirty_days`` by triggers) -- and rebuilds only those
+days with one ``INSERT ... SELECT ... GROUP BY``. Work is proportional to
+the days touched, not to the history after the oldest of them; the first
+run (no watermark) builds the full history.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import date, datetime, time, timedelta, timezone
+
+from sqlalchemy import Date, and_, cast, delete, extract, false, func, insert, literal_column, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db import repositories as repo
+from src.db.models import (
+    AnalysisDailyRollup,
+    AnalysisTelemetry,
+    Consultation,
+    ConsultationDailyRollup,
+    ConsultationInput,
+    FollowUp,
+    FollowUpDailyRollup,
+    InputDailyRollup,
+    RollupDirtyDay,
+    RollupWatermark,
+)
+
+logger = logging.getLogger(__name__)
+
+# Rows written by transactions that started before a refresh but committed
+# after it carry timestamps just below the new watermark. Re-scanning a short
+# window is cheap because rebuilding a day is idempotent.
+_OVERLAP = timedelta(minutes=5)
+
+# pg_advisory_xact_lock key so concurrent workers never rebuild in parallel.
+_LOCK_KEY = 0x48585231
+
+ROLLUPS = ("consultations", "inputs", "analyses", "follow_ups")
+
+_SOURCE_TABLES = {
+    "consultations": "consultations",
+    "inputs": "consultation_inputs",
+    "analyses": "analysis_results",
+    "follow_ups": "follow_ups",
+}
+
+
+def utc_day(column):
+    """Calendar day (UTC) of a timestamptz column."""
+    return cast(func.timezone(literal_column("'UTC'"), column), Date)
+
+
+def _midnight(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+async def _affected_days(
+    session: AsyncSession, name: str, bucket_column, changed_column, since
+) -> list[date] | None:
+    """Days of rollup *name* to rebuild, or None to rebuild all of it.
+
+    Consumes the rollup's queued ``rollup_dirty_days`` in the same
+    transaction as the rebuild.
+    """
+    dirty = (
+        await session.execute(
+            delete(RollupDirtyDay).where(RollupDirtyDay.name == name).returning(RollupDirtyDay.day)
+        )
+    ).scalars().all()
+    if since is None:
+        return None
+    day = utc_day(bucket_column)
+    changed = (
+        await session.execute(select(day).where(changed_column >= since, bucket_column.isnot(None)).distinct())
+    ).scalars().all()
+    return sorted(set(dirty) | set(changed))
+
+
+def _in_days(bucket_column, days: list[date]):
+    """Filter for rows bucketed on *days*: one index range per day, so far-apart days scan nothing between."""
+    return or_(
+        *(
+            and_(bucket_column >= _midnight(day), bucket_column < _midnight(day + timedelta(days=1)))
+            for day in days
+        )
+    )
+
+
+async def _replace_days(session: AsyncSession, rollup, columns: list, source, bucket_column, days) -> None:
+    """Delete *days* (all days when None) from *rollup* and re-insert them from *source*."""
+    clear = delete(rollup)
+    if days is not None:
+        clear = clear.where(rollup.day.in_(days))
+        source = source.where(_in_days(bucket_column, days))
+    await session.execute(clear)
+    await session.execute(insert(rollup).from_select(columns, source))
+
+
+class RollupService:
+    """Keeps the ``*_daily_rollup`` tables in step with their source tables."""
+
+    async def refresh(self, session: AsyncSession) -> dict[str, str | None]:
+        """Fold rows changed since each watermark into the rollups.
+
+        Returns the number of days rebuilt per rollup (``None`` for a full
+        rebuild), or an empty dict if another worker holds the refresh lock.
+        """
+        locked = await session.execute(select(func.pg_try_advisory_xact_lock(_LOCK_KEY)))
+        if not locked.scalar():
+            return {}
+
+        now = (await session.execute(select(func.now()))).scalar_one()
+        marks = dict(
+            (await session.execute(select(RollupWatermark.name, RollupWatermark.watermark))).all()
+        )
+
+        rebuilders = {
+            "consultations": self._rebuild_consultations,
+            "inputs": self._rebuild_inputs,
+            "analyses": self._rebuild_analyses,
+            "follow_ups": self._rebuild_follow_ups,
+        }
+        rebuilt: dict[str, int | None] = {}
+        for name in ROLLUPS:
+            since = marks.get(name)
+            days = await rebuilders[name](session, since - _OVERLAP if since else None)
+            rebuilt[name] = None if days is None else len(days)
+            stmt = pg_insert(RollupWatermark).values(name=name, watermark=now)
+            await session.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[RollupWatermark.name],
+                    set_={"watermark": stmt.excluded.watermark},
+                )
+            )
+
+        await session.commit()
+        # Cached analytics for a rebuilt rollup are keyed on its source table.
+        changed = tuple(_SOURCE_TABLES[name] for name, count in rebuilt.items() if count != 0)
+        if changed:
+            await repo.notify_write(*changed)
+        logger.debug("Analytics rollups refreshed: %s", rebuilt)
+        return rebuilt
+
+    async def _rebuild_consultations(self, session: AsyncSession, since) -> list[date] | None:
+        c = Consultation
+        days = await _affected_days(session, "consultations", c.started_at, c.updated_at, since)
+        if days == []:
+            return days
+
+        day = utc_day(c.started_at)
+        source = (
+            select(
+                day,
+                c.doctor_id,
+                c.status,
+                func.count(),
+                func.coalesce(func.sum(extract("epoch", c.ended_at - c.started_at)), 0),
+                func.count(c.ended_at),
+            )
+            .where(c.started_at.isnot(None))
+            .group_by(day, c.doctor_id, c.status)
+        )
+        r = ConsultationDailyRollup
+        await _replace_days(
+            session,
+            r,
+            [r.day, r.doctor_id, r.status, r.consultation_count, r.duration_seconds_sum, r.duration_count],
+            source,
+            c.started_at,
+            days,
+        )
+        return days
+
+    async def _rebuild_inputs(self, session: AsyncSession, since) -> list[date] | None:
+        i = ConsultationInput
+        days = await _affected_days(session, "inputs", i.created_at, i.created_at, since)
+        if days == []:
+            return days
+
+        day = utc_day(i.created_at)
+        source = (
+            select(day, i.input_type, func.count())
+            .where(i.created_at.isnot(None))
+            .group_by(day, i.input_type)
+        )
+        r = InputDailyRollup
+        await _replace_days(session, r, [r.day, r.input_type, r.input_count], source, i.created_at, days)
+        return days
+
+    async def _rebuild_analyses(self, session: AsyncSession, since) -> list[date] | None:
+        t = AnalysisTelemetry
+        days = await _affected_days(session, "analyses", t.created_at, t.created_at, since)
+        if days == []:
+            return days
+
+        day = utc_day(t.created_at)
+        stage_columns = []
+        for stage in (t.vision_ms, t.nlp_ms, t.audio_ms, t.reasoning_ms, t.total_ms):
+            stage_columns += [func.coalesce(func.sum(stage), 0), func.count(stage)]
+        source = (
+            select(
+                day,
+                t.model,
+                func.count(),
+                func.coalesce(func.sum(t.input_tokens), 0),
+                func.coalesce(func.sum(t.output_tokens), 0),
+                func.count().filter(t.used_vision),
+                func.count().filter(t.used_text),
+                func.count().filter(t.used_audio),
+                func.count().filter(t.used_history),
+                *stage_columns,
+            )
+            .where(t.created_at.isnot(None))
+            .group_by(day, t.model)
+        )
+        r = AnalysisDailyRollup
+        await _replace_days(
+            session,
+            r,
+            [
+                r.day, r.model, r.analysis_count, r.input_tokens, r.output_tokens,
+                r.used_vision, r.used_text, r.used_audio, r.used_history,
+                r.vision_ms_sum, r.vision_ms_count, r.nlp_ms_sum, r.nlp_ms_count,
+                r.audio_ms_sum, r.audio_ms_count, r.reasoning_ms_sum, r.reasoning_ms_count,
+                r.total_ms_sum, r.total_ms_count,
+            ],
+            source,
+            t.created_at,
+            days,
+        )
+        return days
+
+    async def _rebuild_follow_ups(self, session: AsyncSession, since) -> list[date] | None:
+        f = FollowUp
+        days = await _affected_days(session, "follow_ups", f.created_at, f.updated_at, since)
+        if days == []:
+            return days
+
+        day = utc_day(f.created_at)
+        ai_generated = func.coalesce(f.ai_generated, false())
+        source = (
+            select(day, f.status, f.follow_up_type, ai_generated, func.count())
+            .where(f.created_at.isnot(None))
+            .group_by(day, f.status, f.follow_up_type, ai_generated)
+        )
+        r = FollowUpDailyRollup
+        await _replace_days(
+            session,
+            r,
+            [r.day, r.status, r.follow_up_type, r.ai_generated, r.follow_up_count],
+            source,
+            f.created_at,
+            days,
+        )
+        return days
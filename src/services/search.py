@@ -0,0 +1,97 @@
+"""Hybrid search — full-text and vector retrieval fused by reciprocal rank.
+
+Both retrievers run concurrently, each on its own session, over
+consultations, analyses and medical records. Their rankings are combined
+with reciprocal rank fusion (RRF): a document scores ``sum(1 / (k + rank))``
+over every list it appears in, so items found by both retrievers rise to the
+top without having to calibrate ts_rank against cosine distance.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict
+from collections.abc import Iterable
+
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.db import search as search_repo
+from src.db.search import SearchFilters
+
+# Constant from Cormack et al.; damps the weight of the very top ranks.
+RRF_K = 60
+# Candidates taken from each retriever per document kind before fusing.
+_CANDIDATES_PER_KIND = 50
+
+
+def reciprocal_rank_fusion(*rankings: Iterable[Row], k: int = RRF_K) -> list[tuple[tuple, float, list]]:
+    """Fuse ``(kind, id, rank)`` rankings into ``(key, score, ranks)`` by score.
+
+    ``ranks`` holds the document's rank in each input list (``None`` where it
+    is absent), in the order the rankings were given.
+    """
+    scores: dict[tuple, float] = defaultdict(float)
+    ranks: dict[tuple, list] = defaultdict(lambda: [None] * len(rankings))
+    for position, ranking in enumerate(rankings):
+        for kind, id_, rank in ranking:
+            scores[(kind, id_)] += 1.0 / (k + rank)
+            ranks[(kind, id_)][position] = rank
+    fused = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    return [(key, score, ranks[key]) for key, score in fused]
+
+
+class SearchService:
+    async def hybrid(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        query: str,
+        query_embedding: list[float] | None,
+        *,
+        filters: SearchFilters = SearchFilters(),
+        limit: int = 20,
+    ) -> list[dict]:
+        """Best *limit* documents for *query*, with highlighted snippets.
+
+        Without a *query_embedding* (the text model is unavailable) the
+        results are the full-text ranking alone.
+        """
+        candidates = max(limit, _CANDIDATES_PER_KIND)
+
+        async def _fulltext() -> list[Row]:
+            async with session_factory() as session:
+                return await search_repo.fulltext_candidates(session, query, filters, limit=candidates)
+
+        async def _vector() -> list[Row]:
+            if query_embedding is None:
+                return []
+            async with session_factory() as session:
+                return await search_repo.vector_candidates(session, query_embedding, filters, limit=candidates)
+
+        fulltext, vector = await asyncio.gather(_fulltext(), _vector())
+        fused = reciprocal_rank_fusion(fulltext, vector)[:limit]
+
+        async with session_factory() as session:
+            hits = await search_repo.search_hits(session, query, [key for key, _, _ in fused])
+        by_key = {(hit.kind, hit.id): hit for hit in hits}
+
+        results = []
+        for key, score, (fulltext_rank, vector_rank) in fused:
+            hit = by_key.get(key)
+            if hit is None:  # deleted between retrieval and loading
+                continue
+            results.append(
+                {
+                    "kind": hit.kind,
+                    "id": hit.id,
+                    "consultation_id": hit.consultation_id,
+                    "patient_id": hit.patient_id,
+                    "title": hit.title,
+                    "snippet": hit.snippet,
+                    "occurred_at": hit.occurred_at,
+                    "score": score,
+                    "fulltext_rank": fulltext_rank,
+                    "vector_rank": vector_rank,
+                }
+            )
+        return results
@@ -2,7 +2,11 @@
 Real-time transcription service for WebSocket streaming.
 
 Receives audio chunks over a WebSocket, buffers them, and returns
-partial / final transcriptions using the AudioTranscriber.
+partial / final transcriptions using the AudioTranscriber. Each chunk is
+gated by voice-activity detection as it arrives, so only speech is kept
+and decoded; timestamps stay relative to the start of the stream. Speech
+padding crosses chunk boundaries: the gate sees the tail of the previous
+chunk, and a pad owed past the end of one chunk is taken from the next.
 """
 
 from __future__ import annotations
@@ -12,6 +16,10 @@ from typing import TYPE_CHECKING
 
 import numpy as np
 
+from src.config import settings
+from src.utils.metrics import metrics
+from src.utils.vad import VoiceActivityDetector
+
 if TYPE_CHECKING:
     from src.models.audio import AudioTranscriber
 
@@ -27,10 +35,21 @@ class StreamingTranscriber:
         else:
             from src.models.audio import AudioTranscriber
             self._transcriber = AudioTranscriber()
-        self._buffer: list[np.ndarray] = []
+        # Speech kept so far as (start sample in the stream, audio).
+        self._buffer: list[tuple[int, np.ndarray]] = []
+        self._samples_in = 0
+        self._buffer_start = 0  # stream position of the last clear()
+        self._vad = (
+            VoiceActivityDetector(self.SAMPLE_RATE, padding_ms=settings.vad_padding_ms)
+            if settings.vad_enabled
+            else None
+        )
+        self._context = np.zeros(0, dtype=np.float32)  # tail of the last chunk, for the gate
+        self._pad_owed = 0  # trailing padding the last chunk could not hold
+        self._kept_until = 0  # stream position up to which audio has been gated
 
     def add_chunk(self, raw_bytes: bytes) -> None:
-        """Decode an audio chunk (WAV or raw PCM) and append to the buffer."""
+        """Decode an audio chunk (WAV or raw PCM) and buffer its speech."""
         import soundfile as sf
 
         try:
@@ -43,21 +62,63 @@ class StreamingTranscriber:
         if audio_array.ndim > 1:
             audio_array = audio_array.mean(axis=1)
 
-        self._buffer.append(audio_array)
+        offset = self._samples_in
+        self._samples_in += len(audio_array)
+        kept = [(offset, audio_array)] if self._vad is None else self._gate(offset, audio_array)
+        self._buffer.extend(kept)
+        # Counted here, once per chunk: a flush re-decodes the whole buffer.
+        metrics.incr("audio.seconds_in", len(audio_array) / self.SAMPLE_RATE)
+        metrics.incr("audio.seconds_decoded", sum(len(audio) for _, audio in kept) / self.SAMPLE_RATE)
+
+    def _gate(self, offset: int, audio: np.ndarray) -> list[tuple[int, np.ndarray]]:
+        """Speech in the chunk at stream position *offset*, with padding, as ``(start, audio)``.
+
+        Onset padding may reach into the previous chunk's tail; audio that
+        was already kept is not returned twice.
+        """
+        window = np.concatenate([self._context, audio])
+        window_start = offset - len(self._context)
+        spans = [(window_start + start, window_start + end) for start, end in self._vad.regions(window)]
+        owed = self._pad_owed
+        self._pad_owed = max(owed - len(audio), 0)
+        if spans and spans[-1][1] == offset + len(audio):
+            self._pad_owed = max(self._pad_owed, self._vad.padding_samples)
+        if owed:
+            spans.append((offset, offset + min(owed, len(audio))))
+        self._context = window[-self._vad.context_samples :]
+
+        merged: list[list[int]] = []
+        for start, end in sorted(spans):
+            start = max(start, self._kept_until)
+            if end <= start:
+                continue
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+            self._kept_until = max(self._kept_until, end)
+        return [(start, window[start - window_start : end - window_start]) for start, end in merged]
 
     def transcribe_buffer(self) -> dict:
         """Transcribe everything accumulated so far."""
-        if not self._buffer:
-            return {"text": "", "chunks": []}
-
-        full_audio = np.concatenate(self._buffer)
-        return self._transcriber.transcribe_array(full_audio, self.SAMPLE_RATE)
+        base = self._buffer_start
+        segments = [(start - base, audio) for start, audio in self._buffer]
+        result = self._transcriber.transcribe_segments(segments, self.SAMPLE_RATE, self._samples_in - base)
+        # Timestamps count from the start of the stream, not of the buffer.
+        shift = base / self.SAMPLE_RATE
+        for chunk in result["chunks"]:
+            chunk["timestamp"] = tuple(
+                None if t is None else round(t + shift, 2) for t in chunk["timestamp"]
+            )
+        return result
 
     def transcribe_and_flush(self) -> dict:
         """Transcribe and clear the buffer."""
         result = self.transcribe_buffer()
-        self._buffer.clear()
+        self.clear()
         return result
 
     def clear(self) -> None:
         self._buffer.clear()
+        self._buffer_start = self._samples_in
+        self._kept_until = max(self._kept_until, self._samples_in)
@@ -0,0 +1,191 @@
+"""Vision encoding pipeline: process-pool preprocessing feeding one model thread.
+
+Turning an upload into the vision model's ``[3, 518, 518]`` input (DICOM
+decode and windowing, resize, normalization) is CPU work that used to run
+on the inference thread, serialized with the forward pass and holding the
+GIL against the other model threads. Here it runs in worker processes, each
+holding its own copy of the model's image processor. A worker writes the
+finished tensor into a shared-memory slot owned by the pipeline and into
+the feature store under the file's content hash, so a study analyzed again
+is read back memory-mapped instead of being decoded and resized.
+
+Jobs reach the single inference thread through a bounded FIFO queue: while
+the model encodes image N, image N+1 is already being decoded. Submitting
+blocks once ``vision_queue_depth`` images are waiting, which also caps the
+number of tensors held in memory. Per-stage timings are recorded as
+metrics: ``decode``/``resize`` in the worker, ``ready_wait`` (tensor ready,
+model still busy: overlap) and ``model_idle`` (model waiting on a tensor).
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import queue
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from contextlib import suppress
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from src.config import settings
+from src.services.feature_store import FeatureStore, feature_store
+from src.utils.metrics import metrics
+
+if TYPE_CHECKING:
+    from src.models.vision import VisionEncoder
+
+# CXformer input; every slot holds one preprocessed image.
+_SLOT_SHAPE = (3, 518, 518)
+_SLOT_BYTES = int(np.prod(_SLOT_SHAPE)) * np.dtype(np.float32).itemsize
+
+# Per worker process, set by _init_worker().
+_processor = None
+
+
+def _init_worker(model: str, revision: str, token: str | None) -> None:
+    global _processor
+    from transformers import AutoImageProcessor
+
+    _processor = AutoImageProcessor.from_pretrained(
+        model, revision=revision, trust_remote_code=True, token=token
+    )
+
+
+def _preprocess_into(path: str, digest: str, slot_name: str) -> tuple[tuple[int, ...], float, float, float]:
+    """Decode *path* into shared-memory slot *slot_name* and the feature store.
+
+    Returns the tensor shape, decode and resize times in ms, and the wall
+    clock time the tensor was ready.
+    """
+    from src.utils.imaging import load_image
+
+    started = time.perf_counter()
+    image = load_image(path)
+    decoded = time.perf_counter()
+    pixels = _processor(image, return_tensors="np")["pixel_values"][0].astype(np.float32, copy=False)
+    resized = time.perf_counter()
+    if pixels.nbytes > _SLOT_BYTES:
+        raise ValueError(f"Preprocessed image of shape {pixels.shape} does not fit a pipeline slot")
+
+    slot = SharedMemory(name=slot_name)
+    try:
+        view = np.ndarray(pixels.shape, dtype=np.float32, buffer=slot.buf)
+        view[...] = pixels
+        del view
+    finally:
+        slot.close()
+    feature_store.put_array("pixels", settings.vision_model, settings.vision_model_revision, digest, pixels)
+    return pixels.shape, (decoded - started) * 1000, (resized - decoded) * 1000, time.time()
+
+
+@dataclass
+class _Job:
+    future: Future
+    pixels: np.ndarray | None = None  # feature store hit
+    pending: Future | None = None  # preprocessing in a worker
+    slot: SharedMemory | None = None
+
+
+class VisionPipeline:
+    def __init__(
+        self,
+        encoder: Callable[[], VisionEncoder],
+        store: FeatureStore,
+        *,
+        workers: int,
+        depth: int,
+    ) -> None:
+        self._encoder = encoder
+        self._store = store
+        self._workers = workers
+        self._depth = depth
+        self._jobs: queue.Queue[_Job | None] = queue.Queue(maxsize=depth)
+        # One slot per queued job plus the one being encoded.
+        self._free_slots: queue.Queue[SharedMemory] = queue.Queue()
+        self._slots: list[SharedMemory] = []
+        self._executor: ProcessPoolExecutor | None = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                return
+            # spawn, not fork: the parent may already hold torch/CUDA threads.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(settings.vision_model, settings.vision_model_revision, settings.hf_token),
+            )
+            for _ in range(self._depth + 1):
+                slot = SharedMemory(create=True, size=_SLOT_BYTES)
+                self._slots.append(slot)
+                self._free_slots.put(slot)
+            self._thread = threading.Thread(target=self._run, name="vision-pipeline", daemon=True)
+            self._thread.start()
+
+    def submit(self, image_path: str | Path, digest: str) -> Future[dict]:
+        """Queue the image at *image_path* for encoding; resolves to the vision section.
+
+        Blocks while the queue is full.
+        """
+        self._start()
+        job = _Job(future=Future())
+        job.pixels = self._store.get_array("pixels", settings.vision_model, settings.vision_model_revision, digest)
+        if job.pixels is None:
+            job.slot = self._free_slots.get()
+            job.pending = self._executor.submit(_preprocess_into, str(image_path), digest, job.slot.name)
+        self._jobs.put(job)
+        metrics.observe("vision.queue_depth", self._jobs.qsize())
+        return job.future
+
+    def _run(self) -> None:
+        while (job := self._jobs.get()) is not None:
+            try:
+                if not job.future.set_running_or_notify_cancel():
+                    if job.pending is not None:
+                        wait([job.pending])  # the worker still owns the slot until it finishes
+                    continue
+                waiting = time.perf_counter()
+                pixels = job.pixels
+                if job.pending is not None:
+                    shape, decode_ms, resize_ms, ready_at = job.pending.result()
+                    metrics.observe("vision.decode_ms", decode_ms)
+                    metrics.observe("vision.resize_ms", resize_ms)
+                    metrics.observe("vision.ready_wait_ms", max(0.0, time.time() - ready_at) * 1000)
+                    pixels = np.ndarray(shape, dtype=np.float32, buffer=job.slot.buf)
+                metrics.observe("vision.model_idle_ms", (time.perf_counter() - waiting) * 1000)
+
+                started = time.perf_counter()
+                features = self._encoder().analyze_pixels(pixels)
+                metrics.observe("vision.inference_ms", (time.perf_counter() - started) * 1000)
+                job.future.set_result(features)
+            except Exception as e:
+                job.future.set_exception(e)
+            finally:
+                pixels = None
+                if job.slot is not None:
+                    self._free_slots.put(job.slot)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is None:
+                return
+            try:
+                self._jobs.put_nowait(None)
+            except queue.Full:
+                pass  # daemon thread; exits with the process
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            for slot in self._slots:
+                slot.unlink()
+                with suppress(BufferError):  # still viewed by an in-flight encode
+                    slot.close()
+            self._slots.clear()
@@ -1,26 +1,78 @@
+import hashlib
+import os
+from dataclasses import dataclass
 from pathlib import Path
 from uuid import uuid4
 
 import aiofiles
+import aiofiles.os
+from fastapi import UploadFile
 
 from src.config import settings
 
 ALLOWED_IMAGE_TYPES = {".png", ".jpg", ".jpeg", ".dcm", ".dicom"}
 ALLOWED_AUDIO_TYPES = {".wav", ".mp3", ".flac", ".ogg", ".m4a"}
 
+_CHUNK_SIZE = 1024 * 1024
 
-async def save_upload(data: bytes, filename: str, consultation_id: str) -> Path:
-    ext = Path(filename).suffix.lower()
-    dest_dir = settings.upload_dir / consultation_id
-    dest_dir.mkdir(parents=True, exist_ok=True)
 
-    safe_name = f"{uuid4().hex}{ext}"
-    dest_path = dest_dir / safe_name
+class UploadTooLarge(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class StoredUpload:
+    path: Path
+    sha256: str
+    size: int
+    deduplicated: bool
+
+
+def upload_limit(file_type: str) -> int:
+    """Maximum upload size in bytes for a ``classify_file`` type."""
+    mb = {
+        "image": settings.max_image_upload_mb,
+        "audio": settings.max_audio_upload_mb,
+    }.get(file_type, settings.max_document_upload_mb)
+    return mb * 1024 * 1024
+
+
+async def save_upload(file: UploadFile, *, max_bytes: int) -> StoredUpload:
+    """Stream *file* into the content-addressed upload store.
+
+    The body is copied in fixed-size chunks to a temporary file while its
+    SHA-256 is computed, so memory use does not grow with the upload. The
+    finished file is renamed into place as ``objects/<sha[:2]>/<sha><ext>``;
+    content already stored is kept and the new copy discarded. Raises
+    ``UploadTooLarge`` as soon as *max_bytes* is exceeded.
+    """
+    ext = Path(file.filename or "").suffix.lower()
+    tmp_dir = settings.upload_dir / "tmp"
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = tmp_dir / f"{uuid4().hex}.part"
 
-    async with aiofiles.open(dest_path, "wb") as f:
-        await f.write(data)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with aiofiles.open(tmp_path, "wb") as f:
+            while chunk := await file.read(_CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"Upload exceeds {max_bytes // (1024 * 1024)} MB")
+                digest.update(chunk)
+                await f.write(chunk)
 
-    return dest_path
+        sha256 = digest.hexdigest()
+        dest_path = settings.upload_dir / "objects" / sha256[:2] / f"{sha256}{ext}"
+        if dest_path.exists():
+            await aiofiles.os.remove(tmp_path)
+            return StoredUpload(dest_path, sha256, size, deduplicated=True)
+        dest_path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp_path, dest_path)
+        return StoredUpload(dest_path, sha256, size, deduplicated=False)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
 
 
 def classify_file(filename: str) -> str | None:
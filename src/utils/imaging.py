@@ -0,0 +1,83 @@
+"""Decode medical images into 8-bit RGB for the vision processor.
+
+DICOM files go through pydicom: the modality LUT (rescale slope/intercept)
+and the stored VOI LUT or window are applied, falling back to a percentile
+window when the file carries none, and MONOCHROME1 images are inverted so
+bone is always bright. Multi-frame objects contribute their middle frame.
+16-bit PNGs are windowed the same way instead of being clipped by PIL.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+DICOM_SUFFIXES = {".dcm", ".dicom"}
+
+# Percentiles used as the window when an image specifies none.
+_AUTO_WINDOW = (0.5, 99.5)
+
+
+def is_dicom(path: str | Path) -> bool:
+    """True for DICOM files, by suffix or by the ``DICM`` preamble marker."""
+    path = Path(path)
+    if path.suffix.lower() in DICOM_SUFFIXES:
+        return True
+    with open(path, "rb") as f:
+        f.seek(128)
+        return f.read(4) == b"DICM"
+
+
+def _to_uint8(pixels: np.ndarray) -> np.ndarray:
+    """Scale an array to 0-255 over its range (shared across channels)."""
+    pixels = pixels.astype(np.float32)
+    lo, hi = float(pixels.min()), float(pixels.max())
+    scaled = (pixels - lo) / (hi - lo) if hi > lo else np.zeros_like(pixels)
+    return np.round(scaled * 255).astype(np.uint8)
+
+
+def _to_rgb(gray: np.ndarray) -> Image.Image:
+    """Scale a single-channel array to 0-255 and stack to RGB."""
+    u8 = _to_uint8(gray)
+    return Image.fromarray(np.stack([u8, u8, u8], axis=-1), mode="RGB")
+
+
+def _auto_window(gray: np.ndarray) -> np.ndarray:
+    lo, hi = np.percentile(gray, _AUTO_WINDOW)
+    return np.clip(gray, lo, hi)
+
+
+def _load_dicom(path: str | Path) -> Image.Image:
+    import pydicom
+    from pydicom.pixels import apply_modality_lut, apply_voi_lut
+
+    ds = pydicom.dcmread(path)
+    pixels = ds.pixel_array
+    frames = int(getattr(ds, "NumberOfFrames", 1) or 1)
+    if frames > 1:
+        pixels = pixels[frames // 2]
+
+    # Colour objects (ultrasound, secondary captures) are already display RGB.
+    if int(getattr(ds, "SamplesPerPixel", 1)) == 3:
+        return Image.fromarray(pixels if pixels.dtype == np.uint8 else _to_uint8(pixels), mode="RGB")
+
+    gray = apply_modality_lut(pixels, ds)
+    if "WindowCenter" in ds or "VOILUTSequence" in ds:
+        gray = apply_voi_lut(gray, ds, prefer_lut=True)
+    else:
+        gray = _auto_window(gray)
+    if getattr(ds, "PhotometricInterpretation", "") == "MONOCHROME1":
+        gray = gray.max() - gray
+    return _to_rgb(gray)
+
+
+def load_image(path: str | Path) -> Image.Image:
+    """Decode *path* (DICOM, PNG or JPEG) into an 8-bit RGB image."""
+    if is_dicom(path):
+        return _load_dicom(path)
+    with Image.open(path) as img:
+        if img.mode in ("I", "I;16", "I;16B", "F"):
+            return _to_rgb(_auto_window(np.asarray(img, dtype=np.float32)))
+        return img.convert("RGB")
@@ -0,0 +1,61 @@
+"""In-process counters and timings, exposed on ``/health/metrics``.
+
+Values are per worker process. Writers may be request handlers or model
+threads, so every update takes the registry lock.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import defaultdict
+from collections.abc import Callable
+
+
+class Metrics:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: dict[str, float] = defaultdict(float)
+        self._timings: dict[str, dict[str, float]] = {}
+        self._gauges: dict[str, Callable[[], float | int | None]] = {}
+
+    def incr(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._counters[name] += value
+
+    def observe(self, name: str, value: float) -> None:
+        """Record one sample (e.g. a duration in ms) under *name*."""
+        with self._lock:
+            t = self._timings.get(name)
+            if t is None:
+                self._timings[name] = {"count": 1, "total": value, "max": value, "last": value}
+            else:
+                t["count"] += 1
+                t["total"] += value
+                t["max"] = max(t["max"], value)
+                t["last"] = value
+
+    def gauge(self, name: str, fn: Callable[[], float | int | None]) -> None:
+        """Register a value computed on read (e.g. a ratio of two counters)."""
+        with self._lock:
+            self._gauges[name] = fn
+
+    def counter(self, name: str) -> float:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+            timings = {
+                name: {**t, "avg": round(t["total"] / t["count"], 2)}
+                for name, t in self._timings.items()
+            }
+            gauges = dict(self._gauges)
+        return {
+            "counters": counters,
+            "timings": timings,
+            "gauges": {name: fn() for name, fn in gauges.items()},
+        }
+
+
+metrics = Metrics()
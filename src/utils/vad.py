@@ -0,0 +1,108 @@
+"""Energy-based voice-activity detection, CPU-only and numpy-only.
+
+Audio is split into short frames whose level (dBFS) is compared with a
+running estimate of the noise floor: a frame is speech when it stands
+``margin_db`` above the floor and above an absolute minimum. Speech frames
+are grouped into regions, short gaps are bridged, blips dropped, and each
+region padded so word onsets and tails reach the model.
+
+The noise floor persists across calls, so a streaming session can be gated
+chunk by chunk once it has heard some background; the caller passes the
+last ``context_samples`` of the previous chunk along with each one so that
+padding reaches back across chunk boundaries. The floor is capped at
+``_MAX_NOISE_FLOOR_DB``: audio without real pauses (compressed or AGC'd
+phone lines, short dictation, a stream that starts mid-sentence) would
+otherwise put it at the speech level. If nothing passes the gate but the
+audio is not silent, the whole input is kept rather than dropped.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+# Level assigned to digital silence instead of -inf.
+_SILENCE_DB = -100.0
+# A percentile floor louder than this is speech, not background.
+_MAX_NOISE_FLOOR_DB = -45.0
+
+
+class VoiceActivityDetector:
+    def __init__(
+        self,
+        sample_rate: int = 16_000,
+        *,
+        frame_ms: int = 30,
+        margin_db: float = 12.0,
+        min_level_db: float = -55.0,
+        min_speech_ms: int = 120,
+        min_silence_ms: int = 400,
+        padding_ms: int = 200,
+    ) -> None:
+        self.sample_rate = sample_rate
+        self._frame = max(1, sample_rate * frame_ms // 1000)
+        self._margin_db = margin_db
+        self._min_level_db = min_level_db
+        self._min_speech = max(1, min_speech_ms // frame_ms)
+        self._min_silence = max(1, min_silence_ms // frame_ms)
+        self._padding = sample_rate * padding_ms // 1000
+        self._noise_db: float | None = None
+
+    @property
+    def padding_samples(self) -> int:
+        return self._padding
+
+    @property
+    def context_samples(self) -> int:
+        """Samples before a chunk that ``regions`` needs to pad speech starting in it."""
+        return self._padding + self._min_speech * self._frame
+
+    def _frame_levels(self, audio: np.ndarray) -> np.ndarray:
+        n_frames = -(-len(audio) // self._frame)
+        padded = np.zeros(n_frames * self._frame, dtype=np.float32)
+        padded[: len(audio)] = audio
+        rms = np.sqrt(np.mean(np.square(padded.reshape(n_frames, self._frame)), axis=1))
+        with np.errstate(divide="ignore"):
+            return np.maximum(20 * np.log10(rms), _SILENCE_DB)
+
+    def _update_noise_floor(self, levels: np.ndarray) -> float:
+        candidate = min(float(np.percentile(levels, 10)), _MAX_NOISE_FLOOR_DB)
+        if self._noise_db is None or candidate < self._noise_db:
+            self._noise_db = candidate
+        else:
+            # Rise slowly, so a chunk of continuous speech cannot become the floor.
+            self._noise_db += 0.1 * (candidate - self._noise_db)
+        return self._noise_db
+
+    def regions(self, audio: np.ndarray) -> list[tuple[int, int]]:
+        """Padded ``(start, end)`` sample ranges of speech in *audio*, merged and sorted."""
+        if len(audio) == 0:
+            return []
+        levels = self._frame_levels(audio)
+        threshold = max(self._update_noise_floor(levels) + self._margin_db, self._min_level_db)
+        speech = levels > threshold
+
+        # Runs of speech frames as [start, end) frame indices.
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], speech.astype(np.int8), [0]))))
+        runs = edges.reshape(-1, 2).tolist()
+
+        merged: list[list[int]] = []
+        for start, end in runs:
+            if merged and start - merged[-1][1] < self._min_silence:
+                merged[-1][1] = end
+            else:
+                merged.append([start, end])
+
+        regions: list[tuple[int, int]] = []
+        for start, end in merged:
+            if end - start < self._min_speech:
+                continue
+            lo = max(0, start * self._frame - self._padding)
+            hi = min(len(audio), end * self._frame + self._padding)
+            if regions and lo <= regions[-1][1]:
+                regions[-1] = (regions[-1][0], hi)
+            else:
+                regions.append((lo, hi))
+        # Nothing cleared the gate, yet the audio is not silence (a click alone does not count).
+        if not regions and float(np.median(levels)) > self._min_level_db:
+            return [(0, len(audio))]
+        return regions
@@ -0,0 +1,17 @@
+"""Point the app at a disposable test database before anything imports it.
+
+The DB-backed tests run against ``TEST_DATABASE_URL`` (Postgres with
+pgvector and pg_trgm available); its schema is dropped and recreated. They
+are skipped when it is unset.
+"""
+
+import os
+import tempfile
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+if TEST_DATABASE_URL:
+    # src.db.engine builds its engine from settings at import time.
+    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+    os.environ.setdefault("UPLOAD_DIR", tempfile.mkdtemp(prefix="hippocrates-uploads-"))
+    os.environ["QUERY_PROFILING"] = "false"
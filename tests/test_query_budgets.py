@@ -0,0 +1,160 @@
+"""Per-endpoint SQL budgets for the consultation write paths.
+
+Each request runs under ``profile_queries()``; the test fails when an
+endpoint issues more statements or loads more ORM rows than its budget, or
+runs any statement twice (an N+1 in the making). Budgets are upper bounds:
+lower them when an endpoint gets cheaper, and raise one only with a reason.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import uuid
+
+import pytest
+
+pytest.importorskip("pytest_asyncio")
+pytest.importorskip("asyncpg")
+if not os.environ.get("TEST_DATABASE_URL"):
+    pytest.skip("TEST_DATABASE_URL is not set", allow_module_level=True)
+
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+
+from src.api.app import create_app
+from src.api.deps import get_consultation_service, get_fusion
+from src.db import repositories as repo
+from src.db.engine import async_session_factory, engine
+from src.db.models import Base, ConsultationType
+from src.db.profiling import profile_queries
+from src.services.consultation import ConsultationService
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+# endpoint -> (max statements, max ORM rows loaded)
+BUDGETS = {
+    "add_text_input": (2, 1),
+    "add_file_input": (2, 1),
+    "create_follow_up": (2, 1),
+    "generate_follow_ups": (4, 1 + 1 + 2),  # consultation, its analysis, two follow-ups
+    "end": (4, 1 + 1 + 2),
+}
+
+_FOLLOW_UPS = [
+    {"type": "lab_check", "description": "Repeat CBC", "days_from_now": 14, "reasoning": "Anaemia"},
+    {"type": "appointment", "description": "Review results", "days_from_now": 21, "reasoning": "Plan"},
+]
+
+
+class _FakeReasoning:
+    def generate(self, prompt: str, **kwargs) -> dict:
+        return {"response": json.dumps(_FOLLOW_UPS)}
+
+
+class _FakeFusion:
+    """Answers summary and follow-up prompts without loading a model."""
+
+    reasoning = _FakeReasoning()
+
+    def hint(self, modalities: list[str]) -> None:
+        pass
+
+
+@pytest_asyncio.fixture(loop_scope="session", scope="session")
+async def schema():
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    yield
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture(loop_scope="session", scope="session")
+async def client(schema):
+    fusion = _FakeFusion()
+    app = create_app()
+    app.dependency_overrides[get_fusion] = lambda: fusion
+    app.dependency_overrides[get_consultation_service] = lambda: ConsultationService(fusion=fusion)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def consultation_id(schema) -> uuid.UUID:
+    """An in-progress consultation with one analysis result."""
+    async with async_session_factory() as session:
+        doctor = await repo.create_doctor(session, name="Dr. Budget")
+        patient = await repo.create_patient(session, name="Pat Budget")
+        consultation = await repo.create_consultation(
+            session,
+            doctor_id=doctor.id,
+            patient_id=patient.id,
+            consultation_type=ConsultationType.FACE_TO_FACE,
+        )
+        await repo.save_analysis(
+            session,
+            consultation_id=consultation.id,
+            prompt="Assess fatigue",
+            result={"response": "Likely iron-deficiency anaemia."},
+        )
+        return consultation.id
+
+
+def _assert_within_budget(endpoint: str, stats) -> None:
+    max_queries, max_rows = BUDGETS[endpoint]
+    assert not stats.repeated(), f"{endpoint} repeated statements: {stats.repeated()}"
+    assert stats.queries <= max_queries, f"{endpoint} ran {stats.queries} statements (budget {max_queries})"
+    assert stats.rows <= max_rows, f"{endpoint} loaded {stats.rows} rows (budget {max_rows})"
+
+
+async def test_add_text_input(client, consultation_id):
+    with profile_queries() as stats:
+        resp = await client.post(
+            f"/api/consultations/{consultation_id}/inputs/text", json={"raw_text": "Tired for weeks"}
+        )
+    assert resp.status_code == 201
+    _assert_within_budget("add_text_input", stats)
+
+
+async def test_add_file_input(client, consultation_id):
+    with profile_queries() as stats:
+        resp = await client.post(
+            f"/api/consultations/{consultation_id}/inputs/file",
+            files={"file": ("chest.png", b"\x89PNG\r\n\x1a\n" + os.urandom(64), "image/png")},
+        )
+    assert resp.status_code == 201
+    _assert_within_budget("add_file_input", stats)
+
+
+async def test_create_follow_up(client, consultation_id):
+    body = {
+        "follow_up_type": "lab_check",
+        "description": "Ferritin",
+        "due_date": "2026-11-02T09:00:00+00:00",
+    }
+    with profile_queries() as stats:
+        resp = await client.post(f"/api/consultations/{consultation_id}/follow-ups", json=body)
+    assert resp.status_code == 201
+    _assert_within_budget("create_follow_up", stats)
+
+
+async def test_generate_follow_ups(client, consultation_id):
+    with profile_queries() as stats:
+        resp = await client.post(f"/api/consultations/{consultation_id}/follow-ups/generate")
+    assert resp.status_code == 200
+    assert resp.json()["generated"] == len(_FOLLOW_UPS)
+    _assert_within_budget("generate_follow_ups", stats)
+
+
+async def test_end(client, consultation_id):
+    with profile_queries() as stats:
+        resp = await client.patch(
+            f"/api/consultations/{consultation_id}", json={"generate_summary": True}
+        )
+    assert resp.status_code == 200
+    assert resp.json()["status"] == "completed"
+    _assert_within_budget("end", stats)